@@ -0,0 +1,54 @@
+"""
+Payload size and parse time of CBOR against JSON response bodies.
+
+Uses realistic submission and audit log lists and times the decoding path
+the client actually runs: validate_json on the raw body for JSON,
+cbor2.loads followed by validate_python for CBOR.
+
+Usage: PYTHONPATH=src python -m benchmarks.content_negotiation --rows 10000
+"""
+
+import argparse
+import json
+
+import cbor2
+
+from hearmypaper.audit.dto import ActionLogResponse
+from hearmypaper.shared.utils import decoders
+from hearmypaper.submission.dto import SubmissionResponse
+
+from .decoding import audit_row, measure, submission_row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    datasets = {
+        "submissions": (list[SubmissionResponse], submission_row),
+        "audit_logs": (list[ActionLogResponse], audit_row),
+    }
+
+    print(f"cbor2 C extension: {cbor2.loads.__module__ == '_cbor2'}")
+    for name, (tp, make_row) in datasets.items():
+        for rows in args.rows:
+            data = [make_row(i) for i in range(rows)]
+            bodies = {"json": json.dumps(data).encode(), "cbor": cbor2.dumps(data)}
+
+            json_s = measure(lambda: decoders.decode(bodies["json"], tp), args.repeat)
+            cbor_s = measure(
+                lambda: decoders.decode(bodies["cbor"], tp, cbor_data=True),
+                args.repeat,
+            )
+            print(
+                f"{name:<12} {rows:>6} rows"
+                f"  json {len(bodies['json']) / 1024:9.1f} KiB {json_s * 1e3:8.2f} ms"
+                f"  cbor {len(bodies['cbor']) / 1024:9.1f} KiB {cbor_s * 1e3:8.2f} ms"
+                f"  size {len(bodies['cbor']) / len(bodies['json']):5.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
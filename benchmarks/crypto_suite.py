@@ -0,0 +1,258 @@
+"""
+Latency and throughput of submission/crypto.py and the credential helpers.
+
+Runs headless (no GUI, no network) and writes JSON results. Public-key
+helpers are measured twice: "cold" with the derived-key cache cleared, so
+each call pays for PBKDF2, and "warm" with the key cached, which leaves the
+per-byte AES-GCM cost. The difference is reported as the one-time KDF cost.
+
+Usage:
+    PYTHONPATH=src python -m benchmarks.crypto_suite --output bench.json
+    PYTHONPATH=src python -m benchmarks.crypto_suite --max-size 1G \\
+        --compare bench.json --tolerance 0.15
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from typing import Callable
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from hearmypaper.auth import utils as auth_utils
+from hearmypaper.submission import crypto, stream_crypto
+from hearmypaper.submission.key_cache import derive_key_from_public_key, key_cache
+
+SIZES = {
+    "1K": 1 << 10,
+    "64K": 64 << 10,
+    "1M": 1 << 20,
+    "16M": 16 << 20,
+    "256M": 256 << 20,
+    "1G": 1 << 30,
+}
+
+# name -> factory(size) returning the callable to time
+Case = Callable[[int], Callable[[], object]]
+
+
+class Keys:
+    def __init__(self) -> None:
+        private_key = Ed25519PrivateKey.generate()
+        self.private = private_key.private_bytes_raw()
+        self.public = private_key.public_key().public_bytes_raw()
+        self.aes = os.urandom(32)
+
+
+def byte_cases(keys: Keys) -> dict[str, Case]:
+    """Cases whose cost grows with the payload size."""
+
+    def encrypt_public(size: int):
+        data = os.urandom(size)
+        return lambda: crypto.encrypt_file_with_public_key(data, keys.public)
+
+    def decrypt_private(size: int):
+        blob = crypto.encrypt_file_with_public_key(os.urandom(size), keys.public)
+        return lambda: crypto.decrypt_file_with_private_key(blob, keys.private)
+
+    def decrypt_private_into(size: int):
+        blob = crypto.encrypt_file_with_public_key(os.urandom(size), keys.public)
+        out = bytearray(size)
+        return lambda: crypto.decrypt_file_with_private_key_into(
+            blob, keys.private, out
+        )
+
+    def encrypt_aes(size: int):
+        data = os.urandom(size)
+        return lambda: crypto.encrypt_file_with_aes(data, keys.aes)
+
+    def encrypt_aes_into(size: int):
+        data = os.urandom(size)
+        out = bytearray(crypto.encrypted_size(size))
+        return lambda: crypto.encrypt_file_with_aes_into(data, keys.aes, out)
+
+    def decrypt_aes(size: int):
+        blob = crypto.encrypt_file_with_aes(os.urandom(size), keys.aes)
+        return lambda: crypto.decrypt_file_with_aes(blob, keys.aes)
+
+    def decrypt_aes_into(size: int):
+        blob = crypto.encrypt_file_with_aes(os.urandom(size), keys.aes)
+        out = bytearray(size)
+        return lambda: crypto.decrypt_file_with_aes_into(blob, keys.aes, out)
+
+    def stream_encrypt(size: int):
+        data = os.urandom(size)
+        workers = stream_crypto.parallel_workers(size)
+
+        def run() -> None:
+            for _ in stream_crypto.iter_encrypt_with_public_key(
+                io.BytesIO(data), keys.public, workers=workers
+            ):
+                pass
+
+        return run
+
+    def stream_decrypt(size: int):
+        blob = b"".join(
+            stream_crypto.iter_encrypt_with_public_key(
+                io.BytesIO(os.urandom(size)), keys.public
+            )
+        )
+        workers = stream_crypto.parallel_workers(size)
+
+        def run() -> None:
+            for _ in stream_crypto.iter_decrypt_with_private_key(
+                [blob], keys.private, workers=workers
+            ):
+                pass
+
+        return run
+
+    return {
+        "encrypt_file_with_public_key": encrypt_public,
+        "decrypt_file_with_private_key": decrypt_private,
+        "decrypt_file_with_private_key_into": decrypt_private_into,
+        "encrypt_file_with_aes": encrypt_aes,
+        "encrypt_file_with_aes_into": encrypt_aes_into,
+        "decrypt_file_with_aes": decrypt_aes,
+        "decrypt_file_with_aes_into": decrypt_aes_into,
+        "iter_encrypt_with_public_key": stream_encrypt,
+        "iter_decrypt_with_private_key": stream_decrypt,
+    }
+
+
+def fixed_cases(keys: Keys, workdir: str) -> dict[str, Callable[[], object]]:
+    """Cases with a fixed, small payload dominated by key derivation."""
+    token_path = os.path.join(workdir, "token.bin")
+    auth_utils.save_user_credentials("1", token_path, keys.private, "password")
+    wrapped_key = crypto.encrypt_aes_key_with_server_public_key(keys.aes, keys.public)
+
+    return {
+        "pbkdf2_derive_key": lambda: derive_key_from_public_key(keys.public),
+        "save_user_credentials": lambda: auth_utils.save_user_credentials(
+            "1", token_path, keys.private, "password"
+        ),
+        "get_user_credentials": lambda: auth_utils.get_user_credentials(
+            token_path, "password"
+        ),
+        "decrypt_aes_key_with_private_key": lambda: (
+            crypto.decrypt_aes_key_with_private_key(wrapped_key, keys.private)
+        ),
+        "encrypt_aes_key_with_server_public_key": lambda: (
+            crypto.encrypt_aes_key_with_server_public_key(keys.aes, keys.public)
+        ),
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int, cold: bool = False) -> float:
+    """Median seconds per call; `cold` clears the derived-key cache first."""
+    if cold:
+
+        def timed() -> object:
+            key_cache.clear()
+            return fn()
+    else:
+        key_cache.clear()
+        fn()
+        timed = fn
+
+    timer = timeit.Timer(timed)
+    number, _ = timer.autorange()
+    return statistics.median(t / number for t in timer.repeat(repeat, number))
+
+
+def run(sizes: list[str], repeat: int) -> dict:
+    keys = Keys()
+    results: dict[str, dict] = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, fn in fixed_cases(keys, workdir).items():
+            cold = measure(fn, repeat, cold=True)
+            warm = measure(fn, repeat)
+            results[name] = {"cold_s": cold, "warm_s": warm}
+            print(f"{name:<40} cold {cold * 1e3:9.3f} ms  warm {warm * 1e3:9.3f} ms")
+
+    for name, factory in byte_cases(keys).items():
+        for label in sizes:
+            size = SIZES[label]
+            fn = factory(size)
+            cold = measure(fn, repeat, cold=True)
+            warm = measure(fn, repeat)
+            results[f"{name}@{label}"] = {
+                "size": size,
+                "cold_s": cold,
+                "warm_s": warm,
+                "kdf_s": max(cold - warm, 0.0),
+                "aes_mb_s": size / warm / 1e6,
+            }
+            print(
+                f"{name + '@' + label:<40} cold {cold * 1e3:9.3f} ms"
+                f"  warm {warm * 1e3:9.3f} ms  {size / warm / 1e6:9.1f} MB/s"
+            )
+            del fn
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Names of results whose warm or cold time regressed beyond `tolerance`."""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for metric in ("warm_s", "cold_s"):
+            if result[metric] > base[metric] * (1 + tolerance):
+                change = result[metric] / base[metric] - 1
+                regressions.append(f"{name} {metric} +{change:.0%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Crypto micro-benchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--max-size", choices=SIZES, default="16M")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    labels = list(SIZES)
+    sizes = labels[: labels.index(args.max_size) + 1]
+    current = run(sizes, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
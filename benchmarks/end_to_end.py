@@ -0,0 +1,174 @@
+"""
+End-to-end latency of the service layer against the stand-in server.
+
+Starts the stand-in API with the given network conditions and dataset, logs
+in as the seeded instructor and calls the service functions the screens
+use, in a random mix. Reports latency percentiles per operation, including
+client-side crypto, decoding and retries of injected errors.
+
+Usage: PYTHONPATH=src python -m benchmarks.end_to_end --latency 50 --bandwidth 1024
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, cast
+
+from toga.paths import Paths
+
+from devserver import Dataset, NetworkConditions, StandInServer
+from hearmypaper.audit import service as audit_service
+from hearmypaper.auth import service as auth_service
+from hearmypaper.auth.utils import save_user_credentials
+from hearmypaper.project import service as project_service
+from hearmypaper.shared.utils.paging import PAGE_SIZE
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.submission import service as submission_service
+from hearmypaper.user import service as user_service
+
+PASSWORD = "benchmark"
+
+
+def percentile(samples: list[float], p: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[p - 1]
+
+
+def operations(
+    session: ApiSession, server: StandInServer, workdir: Path, upload_size: int
+) -> dict[str, Callable[[random.Random], Any]]:
+    state = server.state
+    key = state.instructor_private_key
+    credentials = workdir / "instructor.bin"
+    save_user_credentials("1", str(credentials), key, PASSWORD)
+    # The services only use app_paths.data
+    app_paths = cast(Paths, SimpleNamespace(data=workdir / "data"))
+    upload_path = workdir / "paper.pdf"
+    upload_path.write_bytes(os.urandom(upload_size))
+
+    def some(rows: dict[int, Any], rng: random.Random) -> int:
+        return rng.choice(list(rows))
+
+    def download(rng: random.Random) -> Any:
+        submission_id = some(state.submissions, rng)
+        result = submission_service.download_submission(
+            session, app_paths, submission_id, key
+        )
+        # Measure the transfer every time rather than the local file check
+        content_hash = state.submissions[submission_id]["content_hash"]
+        submission_service.submission_files(app_paths).discard(content_hash)
+        return result
+
+    return {
+        "login": lambda rng: auth_service.login(session, str(credentials), PASSWORD),
+        "projects.list": lambda rng: project_service.get_projects(
+            session, limit=PAGE_SIZE
+        ),
+        "projects.get": lambda rng: project_service.get_project(
+            session, some(state.projects, rng)
+        ),
+        "users.list": lambda rng: user_service.get_users(session, limit=PAGE_SIZE),
+        "users.get": lambda rng: user_service.get_user(session, some(state.users, rng)),
+        "submissions.list": lambda rng: submission_service.list_submissions(
+            session, limit=PAGE_SIZE
+        ),
+        "submissions.get": lambda rng: submission_service.get_submission(
+            session, some(state.submissions, rng)
+        ),
+        "submissions.download": download,
+        "submissions.upload": lambda rng: submission_service.upload_submission(
+            session, some(state.projects, rng), "Benchmark", str(upload_path)
+        ),
+        "audit.list": lambda rng: audit_service.get_audit_logs(
+            session, "", "\uffff", limit=PAGE_SIZE
+        ),
+        "pdf_to_audio": lambda rng: submission_service.convert_submission_to_audio(
+            session, app_paths, some(state.submissions, rng), key
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=20, help="Milliseconds")
+    parser.add_argument("--jitter", type=float, default=10, help="Milliseconds")
+    parser.add_argument(
+        "--bandwidth", type=int, default=0, help="KiB/s, 0 is unlimited"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--submission-size", type=int, default=256, help="KiB")
+    parser.add_argument("--audit-logs", type=int, default=2000)
+    parser.add_argument("--only", nargs="+", help="Operations to run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    conditions = NetworkConditions(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        bandwidth=args.bandwidth << 10,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    dataset = Dataset(
+        submissions=args.submissions,
+        submission_size=args.submission_size << 10,
+        audit_logs=args.audit_logs,
+        seed=args.seed,
+    )
+    rng = random.Random(args.seed)
+    samples: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, list[str]] = defaultdict(list)
+
+    with (
+        tempfile.TemporaryDirectory() as workdir,
+        StandInServer(conditions=conditions, dataset=dataset) as server,
+    ):
+        session = ApiSession(server.url, TransportPolicy())
+        ops = operations(session, server, Path(workdir), args.submission_size << 10)
+        names = args.only or list(ops)
+        ops["login"](rng).unwrap()
+
+        for _ in range(args.iterations):
+            name = rng.choice(names)
+            start = time.perf_counter()
+            result = ops[name](rng)
+            elapsed = time.perf_counter() - start
+            if result.is_err():
+                errors[name].append(str(result.unwrap_err()))
+            else:
+                samples[name].append(elapsed)
+
+    print(
+        f"latency {args.latency:g}±{args.jitter:g} ms, "
+        f"bandwidth {args.bandwidth or 'unlimited'} KiB/s, "
+        f"error rate {args.error_rate:.0%}, {args.iterations} calls"
+    )
+    print(
+        f"{'operation':<22}{'ok':>6}{'err':>6}"
+        f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    for name in sorted(set(samples) | set(errors)):
+        ok = sorted(samples[name])
+        row = f"{name:<22}{len(ok):>6}{len(errors.get(name, [])):>6}"
+        if ok:
+            row += (
+                "".join(f"{percentile(ok, p) * 1e3:>10.1f}" for p in (50, 90, 99))
+                + f"{ok[-1] * 1e3:>10.1f}"
+            )
+        print(row)
+    for name, messages in sorted(errors.items()):
+        print(f"first {name} error: {messages[0]}")
+
+
+if __name__ == "__main__":
+    main()
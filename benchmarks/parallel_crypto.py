@@ -0,0 +1,72 @@
+"""
+Throughput of the segmented (v2) submission cipher per worker count.
+
+Usage: PYTHONPATH=src python -m benchmarks.parallel_crypto --size-mb 256
+"""
+
+import argparse
+import io
+import os
+import time
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from hearmypaper.submission import stream_crypto
+
+
+def measure(fn, size: int, repeat: int) -> float:
+    """Best-of-`repeat` throughput of `fn` in MB/s."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return size / best / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=128)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8, os.cpu_count() or 1]
+    )
+    args = parser.parse_args()
+
+    private_key = Ed25519PrivateKey.generate()
+    private_key_bytes = private_key.private_bytes_raw()
+    public_key_bytes = private_key.public_key().public_bytes_raw()
+
+    size = args.size_mb << 20
+    plaintext = os.urandom(size)
+    encrypted = b"".join(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(plaintext), public_key_bytes
+        )
+    )
+
+    print(f"payload: {args.size_mb} MiB, cpus: {os.cpu_count()}")
+    print(f"{'workers':>8} {'encrypt MB/s':>14} {'decrypt MB/s':>14}")
+
+    for workers in sorted(set(args.workers)):
+
+        def encrypt() -> None:
+            for _ in stream_crypto.iter_encrypt_with_public_key(
+                io.BytesIO(plaintext), public_key_bytes, workers=workers
+            ):
+                pass
+
+        def decrypt() -> None:
+            for _ in stream_crypto.iter_decrypt_with_private_key(
+                [encrypted], private_key_bytes, workers=workers
+            ):
+                pass
+
+        print(
+            f"{workers:>8} {measure(encrypt, size, args.repeat):>14.1f}"
+            f" {measure(decrypt, size, args.repeat):>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
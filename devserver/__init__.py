@@ -0,0 +1,4 @@
+from .server import NetworkConditions, StandInServer
+from .state import Dataset
+
+__all__ = ["Dataset", "NetworkConditions", "StandInServer"]
@@ -0,0 +1,73 @@
+"""
+Run the stand-in API server in the foreground.
+
+Usage:
+    PYTHONPATH=src python -m devserver --port 8000
+    PYTHONPATH=src python -m devserver --latency 80 --bandwidth 2048 --submissions 500
+"""
+
+import argparse
+
+from .server import NetworkConditions, StandInServer
+from .state import Dataset
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stand-in HearMyPaper API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--no-multipart",
+        action="store_true",
+        help="Do not advertise the multipart upload protocol",
+    )
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds")
+    parser.add_argument("--jitter", type=float, default=0, help="Milliseconds")
+    parser.add_argument(
+        "--bandwidth", type=int, default=0, help="KiB/s, 0 is unlimited"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="Share of requests failing with 503"
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--submissions", type=int, default=50)
+    parser.add_argument("--submission-size", type=int, default=64, help="KiB")
+    parser.add_argument("--audit-logs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    conditions = NetworkConditions(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        bandwidth=args.bandwidth << 10,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    dataset = Dataset(
+        users=args.users,
+        projects=args.projects,
+        submissions=args.submissions,
+        submission_size=args.submission_size << 10,
+        audit_logs=args.audit_logs,
+        seed=args.seed,
+    )
+    server = StandInServer(
+        args.host,
+        args.port,
+        multipart=not args.no_multipart,
+        verbose=True,
+        conditions=conditions,
+        dataset=dataset,
+    )
+    print(f"Serving on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+In-memory stand-in for the HearMyPaper API, for offline tests, demos and
+benchmarks.
+
+Implements every endpoint the client calls, with the client's crypto
+conventions. Login checks the challenge signature and issues a bearer
+token, which only the PDF-to-audio endpoints require. The seeded
+instructor (user 1) owns the key pair every submission is encrypted for;
+its private half is exposed so tests and benchmarks can decrypt uploads
+and log in as the instructor. NetworkConditions add latency, limit
+bandwidth and inject 503 errors.
+"""
+
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+import cbor2
+from pydantic import BaseModel
+
+from .state import Dataset, State
+from .views import VIEWS, CborBody, HttpError
+
+# Responses at least this large are gzipped for clients that accept it
+GZIP_MIN_SIZE = 1 << 10
+# Bodies are written in slices of this size when bandwidth is limited
+THROTTLE_CHUNK = 16 << 10
+
+
+class NetworkConditions(BaseModel):
+    """Latency, bandwidth and failures applied to every request"""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Bytes per second in each direction; 0 means unlimited
+    bandwidth: int = 0
+    # Share of requests answered with 503 before reaching their endpoint
+    error_rate: float = 0.0
+    seed: int | None = None
+
+
+Route = tuple[str, re.Pattern, Callable[..., Any]]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; Nagle would hold the body back
+    disable_nagle_algorithm = True
+    server: "StandInServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.delay(len(body))
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        self.query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        # Extra headers a view wants on its response
+        self.response_headers: dict[str, str] = {}
+
+        try:
+            if self.server.inject_error():
+                raise HttpError(503, "Service Unavailable")
+            for route_method, pattern, view in ROUTES:
+                match = pattern.fullmatch(url.path)
+                if route_method == method and match:
+                    result = view(self, self.server.state, body, *match.groups())
+                    break
+            else:
+                raise HttpError(404, "Not Found")
+        except HttpError as e:
+            self._send(e.status, {"detail": e.detail})
+            return
+
+        if isinstance(result, bytes):
+            self._send_raw(200, result, "application/octet-stream")
+        else:
+            self._send(200, result)
+
+    def _send(self, status: int, data: Any) -> None:
+        accept = self.headers.get("Accept", "")
+        if isinstance(data, CborBody) or "application/cbor" in accept:
+            self._send_raw(status, cbor2.dumps(data), "application/cbor")
+        else:
+            self._send_raw(status, json.dumps(data).encode(), "application/json")
+
+    def _send_raw(self, status: int, payload: bytes, content_type: str) -> None:
+        headers = {"Content-Type": content_type, **self.response_headers}
+        if self.command == "GET" and status == 200:
+            etag = f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                status, payload = 304, b""
+
+        accepted = self.headers.get("Accept-Encoding", "")
+        compressible = content_type != "application/octet-stream"
+        if compressible and len(payload) >= GZIP_MIN_SIZE and "gzip" in accepted:
+            headers["Content-Encoding"] = "gzip"
+            payload = gzip.compress(payload, 6)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+
+        if not self.server.conditions.bandwidth:
+            self.wfile.write(payload)
+            return
+        view = memoryview(payload)
+        for start in range(0, len(view), THROTTLE_CHUNK):
+            chunk = view[start : start + THROTTLE_CHUNK]
+            self.server.delay(len(chunk), latency=False)
+            self.wfile.write(chunk)
+
+
+ROUTES: list[Route] = [(method, re.compile(path), view) for method, path, view in VIEWS]
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Threaded stand-in API server. Use as a context manager to serve on a
+    background thread; `url` is the base URL to hand to ApiSession.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        multipart: bool = True,
+        verbose: bool = False,
+        conditions: NetworkConditions | None = None,
+        dataset: Dataset | None = None,
+    ):
+        super().__init__((host, port), Handler)
+        self.state = State(multipart=multipart, dataset=dataset)
+        self.conditions = conditions or NetworkConditions()
+        self.verbose = verbose
+        self._random = random.Random(self.conditions.seed)
+        self._thread: threading.Thread | None = None
+
+    def delay(self, size: int, latency: bool = True) -> None:
+        """Sleep for the simulated latency and the transfer time of `size`."""
+        conditions = self.conditions
+        seconds = size / conditions.bandwidth if conditions.bandwidth else 0.0
+        if latency:
+            seconds += conditions.latency
+            seconds += self._random.uniform(0, conditions.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def inject_error(self) -> bool:
+        return self._random.random() < self.conditions.error_rate
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+    def __enter__(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,249 @@
+"""
+In-memory data of the stand-in server and the crypto it shares with the
+client. Keys are derived from Ed25519 public keys exactly as in
+hearmypaper.submission.crypto, but implemented separately here so the
+server keeps checking the client rather than mirroring it.
+"""
+
+import base64
+import hashlib
+import random
+import secrets
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from pydantic import BaseModel
+
+KDF_ITERATIONS = 65536
+INSTRUCTOR_ID = 1
+# Bookkeeping fields never sent to clients
+PRIVATE_FIELDS = {"content", "project_id", "public_key", "updated_at"}
+AUDIT_ACTIONS = ["LOGIN", "CREATE_PROJECT", "UPLOAD_SUBMISSION", "VIEW_SUBMISSION"]
+
+
+class Dataset(BaseModel):
+    """How much synthetic data the server starts with"""
+
+    users: int = 20
+    projects: int = 10
+    submissions: int = 50
+    submission_size: int = 64 << 10
+    audit_logs: int = 500
+    seed: int = 0
+
+
+class Upload:
+    def __init__(self, project_id: int, title: str, size: int, part_size: int):
+        self.project_id = project_id
+        self.title = title
+        self.size = size
+        self.part_size = part_size
+        self.parts: dict[int, bytes] = {}
+
+
+_derived: dict[bytes, AESGCM] = {}
+_derived_lock = threading.Lock()
+
+
+def cipher_for(public_key: bytes) -> AESGCM:
+    """AES-GCM keyed by the PBKDF2 derivation of an Ed25519 public key."""
+    with _derived_lock:
+        cipher = _derived.get(public_key)
+    if cipher is None:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=public_key[:16],
+            iterations=KDF_ITERATIONS,
+        )
+        cipher = AESGCM(kdf.derive(public_key))
+        with _derived_lock:
+            _derived[public_key] = cipher
+    return cipher
+
+
+def seal(cipher: AESGCM, data: bytes) -> bytes:
+    """[iv(12B) | ciphertext(N) | tag(16B)]"""
+    iv = secrets.token_bytes(12)
+    return iv + cipher.encrypt(iv, data, None)
+
+
+def unseal(cipher: AESGCM, data: bytes) -> bytes:
+    return cipher.decrypt(data[:12], data[12:], None)
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class State:
+    """Everything the stand-in server knows, guarded by one lock."""
+
+    def __init__(self, multipart: bool = True, dataset: Dataset | None = None):
+        # The seeded instructor (user 1) owns the key every submission is
+        # encrypted for, whatever its project; tests read the private half
+        instructor_key = Ed25519PrivateKey.generate()
+        self.instructor_private_key = instructor_key.private_bytes_raw()
+        self.instructor_public_key = instructor_key.public_key().public_bytes_raw()
+
+        server_key = Ed25519PrivateKey.generate()
+        self.server_public_key = server_key.public_key().public_bytes_raw()
+
+        self.multipart = multipart
+        # Part numbers whose PUT is answered with 503, to simulate failures
+        self.failing_parts: set[int] = set()
+        self.part_requests = 0
+        self.users: dict[int, dict[str, Any]] = {}
+        self.projects: dict[int, dict[str, Any]] = {}
+        self.students: dict[int, list[str]] = {}
+        self.submissions: dict[int, dict[str, Any]] = {}
+        self.uploads: dict[str, Upload] = {}
+        self.audit_logs: list[dict[str, Any]] = []
+        self.challenges: dict[int, str] = {}
+        self.tokens: dict[str, int] = {}
+        self.upload_keys: dict[int, bytes] = {}
+        self.lock = threading.Lock()
+
+        self.add_user(
+            "Ivan",
+            "Instructor",
+            "instructor@example.com",
+            self.instructor_public_key,
+        )
+        if dataset is not None:
+            self.seed(dataset)
+
+    def add_user(
+        self,
+        name: str,
+        surname: str,
+        email: str,
+        public_key: bytes,
+        confidentiality_level: int = 4,
+        integrity_levels: list[int] | None = None,
+        expires_at: str = "2030-01-01T00:00:00+00:00",
+    ) -> int:
+        with self.lock:
+            user_id = len(self.users) + 1
+            self.users[user_id] = {
+                "id": user_id,
+                "name": name,
+                "surname": surname,
+                "email": email,
+                "confidentiality_level": confidentiality_level,
+                "integrity_levels": integrity_levels or [1, 2, 3, 4],
+                "expires_at": expires_at,
+                "public_key": public_key,
+                "updated_at": now(),
+            }
+            return user_id
+
+    def add_project(self, fields: dict[str, Any]) -> int:
+        with self.lock:
+            project_id = len(self.projects) + 1
+            self.projects[project_id] = {
+                **fields,
+                "id": project_id,
+                "updated_at": now(),
+            }
+            self.students[project_id] = []
+            return project_id
+
+    def update(self, row: dict[str, Any], fields: dict[str, Any]) -> None:
+        with self.lock:
+            row.update(fields, updated_at=now())
+
+    def add_submission(self, project_id: int, title: str, content: bytes) -> int:
+        with self.lock:
+            submission_id = len(self.submissions) + 1
+            self.submissions[submission_id] = {
+                "id": submission_id,
+                "project_id": project_id,
+                "title": title,
+                "student_name": "Student",
+                "instructor_name": "Instructor",
+                "submitted_at": now(),
+                "content_hash": hashlib.sha256(content).hexdigest(),
+                "content": content,
+                "updated_at": now(),
+            }
+            return submission_id
+
+    def log(
+        self,
+        action: str,
+        user_id: int | None,
+        is_success: bool = True,
+        reason: str | None = None,
+        ip_address: str | None = "10.0.0.1",
+    ) -> None:
+        with self.lock:
+            user = self.users.get(user_id) if user_id is not None else None
+            self.audit_logs.append(
+                {
+                    "timestamp": now(),
+                    "action": action,
+                    "is_success": is_success,
+                    "reason": reason,
+                    "user_name": f"{user['name']} {user['surname']}" if user else None,
+                    "ip_address": ip_address,
+                }
+            )
+
+    def seed(self, dataset: Dataset) -> None:
+        """Add synthetic users, projects, submissions and audit logs."""
+        rng = random.Random(dataset.seed)
+
+        for i in range(dataset.users):
+            key = Ed25519PrivateKey.generate().public_key().public_bytes_raw()
+            self.add_user(f"Student{i}", "Seeded", f"student{i}@example.com", key)
+
+        for i in range(dataset.projects):
+            self.add_project(
+                {
+                    "title": f"Course project {i}",
+                    "syllabus_summary": "Seeded project",
+                    "description": "Generated by the stand-in server " * 8,
+                    "instructor_id": INSTRUCTOR_ID,
+                    "instructor_full_name": "Ivan Instructor",
+                    "instructor_email": "instructor@example.com",
+                    "deadline": "2030-01-01",
+                }
+            )
+
+        # One plaintext per submission would make seeding dominate start-up
+        cipher = cipher_for(self.instructor_public_key)
+        plaintext = rng.randbytes(dataset.submission_size)
+        for i in range(dataset.submissions):
+            project_id = i % max(dataset.projects, 1) + 1
+            self.add_submission(project_id, f"Paper {i}", seal(cipher, plaintext))
+
+        start = datetime.now(timezone.utc) - timedelta(hours=1)
+        for i in range(dataset.audit_logs):
+            self.audit_logs.append(
+                {
+                    "timestamp": (start + timedelta(seconds=i)).isoformat(),
+                    "action": rng.choice(AUDIT_ACTIONS),
+                    "is_success": rng.random() > 0.1,
+                    "reason": None,
+                    "user_name": f"Student{i % max(dataset.users, 1)} Seeded",
+                    "ip_address": f"10.0.{i // 256 % 256}.{i % 256}",
+                }
+            )
+
+    def user_for_token(self, authorization: str | None) -> dict[str, Any] | None:
+        token = (authorization or "").removeprefix("Bearer ")
+        with self.lock:
+            user_id = self.tokens.get(token)
+            return self.users.get(user_id) if user_id is not None else None
+
+    def new_challenge(self, user_id: int) -> str:
+        challenge = base64.b64encode(secrets.token_bytes(32)).decode()
+        with self.lock:
+            self.challenges[user_id] = challenge
+        return challenge
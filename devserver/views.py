@@ -0,0 +1,429 @@
+"""
+Endpoint implementations. Each view takes the request handler, the server
+state, the raw request body and the groups matched from the path, and
+returns the response data: a JSON/CBOR serialisable value, raw bytes for
+octet-stream bodies, or a CborBody for endpoints that only speak CBOR.
+"""
+
+import base64
+import hashlib
+import json
+import secrets
+import uuid
+from typing import TYPE_CHECKING, Any, Callable
+
+import cbor2
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from .state import (
+    INSTRUCTOR_ID,
+    PRIVATE_FIELDS,
+    State,
+    Upload,
+    cipher_for,
+    now,
+    seal,
+    unseal,
+)
+
+if TYPE_CHECKING:
+    from .server import Handler
+
+MIN_PART_SIZE = 1 << 10
+MAX_PARTS = 10000
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class CborBody(dict):
+    """A response sent as CBOR whatever the client Accepts."""
+
+
+def _json(body: bytes) -> dict:
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise HttpError(422, "Invalid JSON body")
+
+
+def _cbor(body: bytes) -> dict:
+    try:
+        return cbor2.loads(body)
+    except cbor2.CBORDecodeError:
+        raise HttpError(422, "Invalid CBOR body")
+
+
+def _public(row: dict[str, Any]) -> dict[str, Any]:
+    return {k: v for k, v in row.items() if k not in PRIVATE_FIELDS}
+
+
+def _changed(handler: "Handler", rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Rows updated after `updated_since`, if given. The X-Server-Time sent
+    back is taken before filtering, so the next delta overlaps this one
+    rather than missing rows updated meanwhile.
+    """
+    handler.response_headers["X-Server-Time"] = now()
+    since = handler.query.get("updated_since")
+    if since is None:
+        return rows
+    handler.response_headers["X-Updated-Since"] = since
+    return [row for row in rows if row["updated_at"] > since]
+
+
+def _page(handler: "Handler", rows: list[Any]) -> list[Any]:
+    if "limit" not in handler.query:
+        return rows
+    offset = int(handler.query.get("offset", 0))
+    return rows[offset : offset + int(handler.query["limit"])]
+
+
+def _current_user(handler: "Handler", state: State) -> dict[str, Any]:
+    user = state.user_for_token(handler.headers.get("Authorization"))
+    if user is None:
+        raise HttpError(401, "Not authenticated")
+    return user
+
+
+def _get(rows: dict[int, dict[str, Any]], row_id: str, name: str) -> dict[str, Any]:
+    row = rows.get(int(row_id))
+    if row is None:
+        raise HttpError(404, f"{name} not found")
+    return row
+
+
+def _get_upload(state: State, upload_id: str) -> Upload:
+    upload = state.uploads.get(upload_id)
+    if upload is None:
+        raise HttpError(404, "Upload not found")
+    return upload
+
+
+# Auth
+
+
+def request_challenge(handler: "Handler", state: State, body: bytes) -> Any:
+    user_id = _json(body)["user_id"]
+    if user_id not in state.users:
+        raise HttpError(404, "User not found")
+    return {"challenge": state.new_challenge(user_id)}
+
+
+def login(handler: "Handler", state: State, body: bytes) -> Any:
+    payload = _json(body)
+    user_id = payload["user_id"]
+    with state.lock:
+        expected = state.challenges.pop(user_id, None)
+        user = state.users.get(user_id)
+    if user is None or expected is None or expected != payload["challenge"]:
+        state.log("LOGIN", user_id, False, "Unknown challenge")
+        raise HttpError(401, "Unknown challenge")
+
+    try:
+        Ed25519PublicKey.from_public_bytes(user["public_key"]).verify(
+            base64.b64decode(payload["signature"]),
+            base64.b64decode(payload["challenge"]),
+        )
+    except (InvalidSignature, ValueError):
+        state.log("LOGIN", user_id, False, "Invalid signature")
+        raise HttpError(401, "Invalid signature")
+
+    token = secrets.token_hex(16)
+    with state.lock:
+        state.tokens[token] = user_id
+    state.log("LOGIN", user_id)
+    return {"token": token}
+
+
+# Users
+
+
+def list_users(handler: "Handler", state: State, body: bytes) -> Any:
+    users = [
+        {"id": u["id"], "full_name": f"{u['name']} {u['surname']}"}
+        for u in _changed(handler, list(state.users.values()))
+    ]
+    return _page(handler, users)
+
+
+def get_user(handler: "Handler", state: State, body: bytes, uid: str) -> Any:
+    return _public(_get(state.users, uid, "User"))
+
+
+def create_user(handler: "Handler", state: State, body: bytes) -> Any:
+    payload = _json(body)
+    user_id = state.add_user(
+        payload["name"],
+        payload["surname"],
+        payload["email"],
+        base64.b64decode(payload["public_key"]),
+        payload["confidentiality_level"],
+        payload["integrity_levels"],
+        payload["expires_at"],
+    )
+    return {"id": user_id}
+
+
+def update_user(handler: "Handler", state: State, body: bytes, uid: str) -> Any:
+    user = _get(state.users, uid, "User")
+    state.update(user, _json(body))
+    return _public(user)
+
+
+# Projects
+
+
+def _project_view(state: State, project: dict[str, Any]) -> dict[str, Any]:
+    return {**_public(project), "student_count": len(state.students[project["id"]])}
+
+
+def list_projects(handler: "Handler", state: State, body: bytes) -> Any:
+    projects = [
+        {
+            "id": p["id"],
+            "title": p["title"],
+            "instructor_full_name": p["instructor_full_name"],
+            "deadline": p["deadline"],
+        }
+        for p in _changed(handler, list(state.projects.values()))
+    ]
+    return _page(handler, projects)
+
+
+def get_project(handler: "Handler", state: State, body: bytes, pid: str) -> Any:
+    return _project_view(state, _get(state.projects, pid, "Project"))
+
+
+def create_project(handler: "Handler", state: State, body: bytes) -> Any:
+    payload = _json(body)
+    instructor = state.users[INSTRUCTOR_ID]
+    project_id = state.add_project(
+        {
+            **payload,
+            "instructor_id": INSTRUCTOR_ID,
+            "instructor_full_name": f"{instructor['name']} {instructor['surname']}",
+        }
+    )
+    state.log("CREATE_PROJECT", INSTRUCTOR_ID)
+    return {"id": project_id}
+
+
+def update_project(handler: "Handler", state: State, body: bytes, pid: str) -> Any:
+    project = _get(state.projects, pid, "Project")
+    state.update(project, _json(body))
+    return _project_view(state, project)
+
+
+def project_students(handler: "Handler", state: State, body: bytes, pid: str) -> Any:
+    project = _get(state.projects, pid, "Project")
+    return [{"email": email} for email in state.students[project["id"]]]
+
+
+def assign_students(handler: "Handler", state: State, body: bytes, pid: str) -> Any:
+    project = _get(state.projects, pid, "Project")
+    with state.lock:
+        state.students[project["id"]] = list(_json(body)["student_emails"])
+    return _project_view(state, project)
+
+
+# Audit
+
+
+def audit_logs(handler: "Handler", state: State, body: bytes) -> Any:
+    start = handler.query.get("start", "")
+    end = handler.query.get("end", "\uffff")
+    with state.lock:
+        logs = [log for log in state.audit_logs if start <= log["timestamp"] <= end]
+    return _page(handler, logs)
+
+
+# Submissions
+
+
+def list_submissions(handler: "Handler", state: State, body: bytes) -> Any:
+    submissions = _changed(handler, list(state.submissions.values()))
+    return _page(handler, [_public(s) for s in submissions])
+
+
+def create_submission(handler: "Handler", state: State, body: bytes) -> Any:
+    payload = _cbor(body)
+    submission_id = state.add_submission(
+        payload["project_id"], payload["title"], payload["encrypted_content"]
+    )
+    return {"id": submission_id}
+
+
+def instructor_key(handler: "Handler", state: State, body: bytes) -> Any:
+    return {"public_key": base64.b64encode(state.instructor_public_key).decode()}
+
+
+def get_submission(handler: "Handler", state: State, body: bytes, sid: str) -> Any:
+    return _public(_get(state.submissions, sid, "Submission"))
+
+
+def submission_hash(handler: "Handler", state: State, body: bytes, sid: str) -> Any:
+    return {"content_hash": _get(state.submissions, sid, "Submission")["content_hash"]}
+
+
+def submission_content(handler: "Handler", state: State, body: bytes, sid: str) -> Any:
+    return _get(state.submissions, sid, "Submission")["content"]
+
+
+def upload_capabilities(handler: "Handler", state: State, body: bytes) -> Any:
+    if not state.multipart:
+        raise HttpError(404, "Not Found")
+    return {"multipart": True, "min_part_size": MIN_PART_SIZE, "max_parts": MAX_PARTS}
+
+
+def initiate_upload(handler: "Handler", state: State, body: bytes) -> Any:
+    if not state.multipart:
+        raise HttpError(404, "Not Found")
+
+    payload = _json(body)
+    if payload["part_size"] < MIN_PART_SIZE:
+        raise HttpError(422, "Part size too small")
+
+    upload_id = uuid.uuid4().hex
+    with state.lock:
+        state.uploads[upload_id] = Upload(
+            payload["project_id"],
+            payload["title"],
+            payload["size"],
+            payload["part_size"],
+        )
+    return {"upload_id": upload_id}
+
+
+def upload_status(handler: "Handler", state: State, body: bytes, uid: str) -> Any:
+    upload = _get_upload(state, uid)
+    with state.lock:
+        parts = sorted(upload.parts.items())
+    return {
+        "upload_id": uid,
+        "parts": [
+            {"number": n, "sha256": hashlib.sha256(data).hexdigest()}
+            for n, data in parts
+        ],
+    }
+
+
+def upload_part(handler: "Handler", state: State, body: bytes, uid: str, n: str) -> Any:
+    upload = _get_upload(state, uid)
+    number = int(n)
+
+    with state.lock:
+        state.part_requests += 1
+        if number in state.failing_parts:
+            raise HttpError(503, "Service Unavailable")
+
+    sha256 = hashlib.sha256(body).hexdigest()
+    if handler.headers.get("X-Content-SHA256") != sha256:
+        raise HttpError(400, "Part checksum mismatch")
+    if len(body) > upload.part_size or number < 1:
+        raise HttpError(422, "Invalid part")
+
+    with state.lock:
+        upload.parts[number] = body
+    return {"number": number, "sha256": sha256}
+
+
+def complete_upload(handler: "Handler", state: State, body: bytes, uid: str) -> Any:
+    upload = _get_upload(state, uid)
+    expected = {p["number"]: p["sha256"] for p in _json(body)["parts"]}
+
+    with state.lock:
+        actual = {
+            n: hashlib.sha256(data).hexdigest() for n, data in upload.parts.items()
+        }
+        content = b"".join(data for _, data in sorted(upload.parts.items()))
+    if actual != expected or len(content) != upload.size:
+        raise HttpError(409, "Parts do not match the upload")
+
+    submission_id = state.add_submission(upload.project_id, upload.title, content)
+    with state.lock:
+        del state.uploads[uid]
+    return {"id": submission_id}
+
+
+# PDF to audio
+
+
+def server_public_key(handler: "Handler", state: State, body: bytes) -> Any:
+    return {"public_key": base64.b64encode(state.server_public_key).decode()}
+
+
+def upload_key(handler: "Handler", state: State, body: bytes) -> Any:
+    """A fresh AES key, encrypted for the key derived from the caller's."""
+    user = _current_user(handler, state)
+    aes_key = secrets.token_bytes(32)
+    with state.lock:
+        state.upload_keys[user["id"]] = aes_key
+    encrypted = seal(cipher_for(user["public_key"]), aes_key)
+    return {"encrypted_aes_key": base64.b64encode(encrypted).decode()}
+
+
+def pdf_to_audio(handler: "Handler", state: State, body: bytes) -> Any:
+    """
+    Decrypt the PDF with the AES key the client sealed for the server, and
+    answer with a stand-in "audio" track sealed under a new key, which is
+    itself sealed for the caller.
+    """
+    user = _current_user(handler, state)
+    payload = _cbor(body)
+    try:
+        aes_key = unseal(
+            cipher_for(state.server_public_key), payload["encrypted_aes_key"]
+        )
+        pdf = unseal(AESGCM(aes_key), payload["encrypted_file"])
+    except (InvalidTag, ValueError, KeyError):
+        raise HttpError(400, "Could not decrypt the file")
+
+    with state.lock:
+        issued = state.upload_keys.pop(user["id"], None)
+    if issued != aes_key:
+        raise HttpError(400, "Unknown upload key")
+
+    audio = b"RIFF" + hashlib.sha256(pdf).digest() + pdf
+    audio_key = secrets.token_bytes(32)
+    return CborBody(
+        encrypted_audio=seal(AESGCM(audio_key), audio),
+        encrypted_audio_key=seal(cipher_for(user["public_key"]), audio_key),
+    )
+
+
+VIEWS: list[tuple[str, str, Callable[..., Any]]] = [
+    ("POST", r"/auth/challenge", request_challenge),
+    ("POST", r"/auth/login", login),
+    ("GET", r"/auth/users", list_users),
+    ("POST", r"/auth/users", create_user),
+    ("GET", r"/auth/users/(\d+)", get_user),
+    ("PUT", r"/auth/users/(\d+)", update_user),
+    ("GET", r"/project/", list_projects),
+    ("POST", r"/project/", create_project),
+    ("GET", r"/project/(\d+)", get_project),
+    ("PUT", r"/project/(\d+)", update_project),
+    ("GET", r"/project/(\d+)/students", project_students),
+    ("PUT", r"/project/(\d+)/students", assign_students),
+    ("GET", r"/audit/", audit_logs),
+    ("GET", r"/submission/", list_submissions),
+    ("POST", r"/submission/", create_submission),
+    ("GET", r"/submission/instructor_key", instructor_key),
+    ("GET", r"/submission/(\d+)", get_submission),
+    ("GET", r"/submission/(\d+)/hash", submission_hash),
+    ("GET", r"/submission/(\d+)/content", submission_content),
+    ("GET", r"/submission/uploads/capabilities", upload_capabilities),
+    ("POST", r"/submission/uploads", initiate_upload),
+    ("GET", r"/submission/uploads/(\w+)", upload_status),
+    ("PUT", r"/submission/uploads/(\w+)/parts/(\d+)", upload_part),
+    ("POST", r"/submission/uploads/(\w+)/complete", complete_upload),
+    ("GET", r"/credentials/public-key", server_public_key),
+    ("GET", r"/pdf-to-audio/upload-key", upload_key),
+    ("POST", r"/pdf-to-audio/execute", pdf_to_audio),
+]
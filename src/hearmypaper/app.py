@@ -3,6 +3,7 @@ import toga
 from .audit.ui.catalog import audit_catalog_screen
 from .audit.ui.export_form import audit_export_form_screen
 from .shared.utils.navigator import Navigator
+from .shared.ui.diagnostics_screen import diagnostics_screen
 from .auth.ui.login_screen import login_screen
 from .shared.ui.resource_catalog import resource_catalog_screen
 from .user.ui.catalog import users_catalog_screen
@@ -19,12 +20,16 @@ from .submission.ui.upload_form import submission_upload_form_screen
 from .submission.ui.info import submission_info_screen
 from .submission.ui.open_form import submission_open_form_screen
 from .submission.ui.convert_form import submission_convert_form_screen
+from .submission import service as submission_service
 
 
 class HearMyPaper(toga.App):
     def startup(self):
         self.main_window = toga.MainWindow(title="HearMyPaper")
         self.navigator = Navigator(self.main_window, self.paths)
+        # Opens the decrypted file cache once, indexing files left by
+        # older versions, and applies the configured budget
+        submission_service.submission_files(self.paths, self.navigator.files_max_bytes)
 
         self.navigator.register_screen("login", login_screen)
         self.navigator.register_screen("resource_catalog", resource_catalog_screen)
@@ -58,9 +63,24 @@ class HearMyPaper(toga.App):
             "manage_students_form", manage_students_form_screen
         )
 
+        # Hidden from the screens themselves; only reachable by the command
+        self.navigator.register_screen("diagnostics", diagnostics_screen)
+        self.commands.add(
+            toga.Command(
+                self.on_diagnostics,
+                text="Diagnostics",
+                shortcut=toga.Key.MOD_1 + toga.Key.SHIFT + toga.Key.D,
+                group=toga.Group.HELP,
+            )
+        )
+
         self.navigator.navigate("login")
         self.main_window.show()
 
+    def on_diagnostics(self, command, **kwargs):
+        if self.navigator.current and self.navigator.current[0] != "diagnostics":
+            self.navigator.navigate("diagnostics", previous=self.navigator.current)
+
 
 def main():
     return HearMyPaper()
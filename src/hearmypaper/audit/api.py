@@ -1,16 +1,24 @@
 from result import Err
-from pydantic import TypeAdapter
 from .dto import ActionLogResponse
 from ..shared.utils.session import ApiSession
-from ..shared.utils.api import check_response
+from ..shared.utils.api import decode_response
+from ..shared.utils.paging import get_page
 
 
-def get_audit_logs(session: ApiSession, start: str, end: str):
+def get_audit_logs(
+    session: ApiSession,
+    start: str,
+    end: str,
+    limit: int | None = None,
+    offset: int = 0,
+):
+    def fetch(paging: dict[str, int]):
+        params: dict[str, str | int] = {"start": start, "end": end}
+        params.update(paging)
+        r = session.get("/audit/", params=params)
+        return decode_response(r, list[ActionLogResponse])
+
     try:
-        r = session.get("/audit/", params={"start": start, "end": end})
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(list[ActionLogResponse]).validate_python(data)
-        )
+        return get_page(fetch, limit, offset)
     except Exception as e:
         return Err(f"Network error: {e}")
@@ -0,0 +1,6 @@
+"""Awaitable versions of service.py, run off the UI event loop."""
+
+from ..shared.utils.background import to_async
+from . import service
+
+get_audit_logs = to_async(service.get_audit_logs)
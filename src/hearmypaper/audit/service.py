@@ -5,14 +5,18 @@ from . import api
 
 
 def get_audit_logs(
-    session: ApiSession, start: str, end: str
+    session: ApiSession,
+    start: str,
+    end: str,
+    limit: int | None = None,
+    offset: int = 0,
 ) -> Result[list[dict], str]:
     """
     Fetch audit logs and enrich them with location information based on IP addresses.
 
     Returns a Result containing a list of dictionaries with log data extended with a "Location" field.
     """
-    logs_result = api.get_audit_logs(session, start, end)
+    logs_result = api.get_audit_logs(session, start, end, limit, offset)
 
     if logs_result.is_err():
         return logs_result
@@ -1,11 +1,14 @@
 from textwrap import wrap
 
 from datetime import datetime, timedelta, timezone
+import toga
+
 from ...shared.ui.catalog_screen import catalog_screen
-from ..service import get_audit_logs
+from ...shared.utils.paging import PAGE_SIZE
+from ..async_service import get_audit_logs
 
 
-def audit_catalog_screen(navigator, date: datetime | None = None):
+async def audit_catalog_screen(navigator, date: datetime | None = None):
     if date is None:
         date = datetime.now(timezone.utc)
 
@@ -16,28 +19,53 @@ def audit_catalog_screen(navigator, date: datetime | None = None):
     start = date.replace(hour=0, minute=0, second=0, microsecond=0)
     end = start + timedelta(days=1) - timedelta(microseconds=1)
 
-    data = (
-        get_audit_logs(navigator.session, start.isoformat(), end.isoformat())
-        .map(
-            lambda logs: [
-                [
-                    str(log["timestamp"]),
-                    str(log["action"]),
-                    "✔" if log["is_success"] else "✖",
-                    "\n".join(wrap(str(log["reason"] or "-"), width=50)),
-                    str(log["user_name"] or "-"),
-                    str(log["ip_address"] or "-"),
-                    str(log["location"]),
+    # Rows loaded so far, in the order shown
+    logs_data: list[list[str]] = []
+    last_page_size = 0
+
+    async def load_page(offset: int):
+        nonlocal last_page_size
+        result = (
+            (
+                await get_audit_logs(
+                    navigator.session,
+                    start.isoformat(),
+                    end.isoformat(),
+                    limit=PAGE_SIZE,
+                    offset=offset,
+                )
+            )
+            .map(
+                lambda logs: [
+                    [
+                        str(log["timestamp"]),
+                        str(log["action"]),
+                        "✔" if log["is_success"] else "✖",
+                        "\n".join(wrap(str(log["reason"] or "-"), width=50)),
+                        str(log["user_name"] or "-"),
+                        str(log["ip_address"] or "-"),
+                        str(log["location"]),
+                    ]
+                    for log in logs
                 ]
-                for log in logs
-            ]
+            )
+            .map_err(lambda err: f"Error loading audit logs: {err}")
         )
-        .map_err(lambda err: f"Error loading audit logs: {err}")
-    )
+        if result.is_ok():
+            last_page_size = len(result.unwrap())
+            logs_data.extend(result.unwrap())
+        return result
 
-    logs_data = data.unwrap() if data.is_ok() else []
+    data = await load_page(0)
 
-    def on_export(widget):
+    async def on_export(widget):
+        # The export covers the whole day, not just the pages shown
+        while last_page_size >= PAGE_SIZE:
+            result = await load_page(len(logs_data))
+            if result.is_err():
+                dialog = toga.ErrorDialog(title="Error", message=result.unwrap_err())
+                await navigator.main_window.dialog(dialog)
+                return
         navigator.navigate("audit_export_form", logs_data=logs_data, date=date)
 
     def on_prev_day(widget):
@@ -71,4 +99,6 @@ def audit_catalog_screen(navigator, date: datetime | None = None):
         data=data,
         on_back=lambda w: navigator.navigate("resource_catalog"),
         actions=actions,
+        load_more=load_page,
+        page_size=PAGE_SIZE,
     )
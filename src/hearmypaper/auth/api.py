@@ -1,5 +1,4 @@
 from result import Result, Ok, Err
-from pydantic import TypeAdapter
 
 from .dto import (
     ChallengeRequest,
@@ -7,7 +6,7 @@ from .dto import (
     LoginRequest,
     LoginResponse,
 )
-from ..shared.utils.api import check_response
+from ..shared.utils.api import decode_response
 from ..shared.utils.session import ApiSession
 
 
@@ -16,10 +15,7 @@ def request_challenge(
 ) -> Result[ChallengeResponse, str]:
     try:
         r = session.post("/auth/challenge", json=req.model_dump())
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(ChallengeResponse).validate_python(data)
-        )
+        return decode_response(r, ChallengeResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
@@ -29,9 +25,9 @@ def submit_challenge(
 ) -> Result[LoginResponse, str]:
     try:
         r = session.post("/auth/login", json=req.model_dump())
-        result = check_response(r)
+        result = decode_response(r, LoginResponse)
         if result.is_ok():
-            response = TypeAdapter(LoginResponse).validate_python(result.unwrap())
+            response = result.unwrap()
             session.headers.update({"Authorization": f"Bearer {response.token}"})
             return Ok(response)
         return Err(result.unwrap_err())
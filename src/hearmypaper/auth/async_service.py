@@ -0,0 +1,9 @@
+"""Awaitable versions of service.py, run off the UI event loop."""
+
+from ..shared.utils.background import to_async
+from . import service, utils
+
+create_user_with_credentials = to_async(service.create_user_with_credentials)
+login = to_async(service.login)
+logout = to_async(service.logout)
+get_user_credentials = to_async(utils.get_user_credentials)
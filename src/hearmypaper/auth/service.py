@@ -16,6 +16,9 @@ from .utils import (
 )
 from .dto import ChallengeRequest, LoginRequest
 from ..user.dto import UserCreateDto, UserCreateResponse
+from ..submission.key_cache import key_cache
+from ..submission import repository as submission_repository
+from ..shared.utils.credential_agent import CredentialAgent
 
 
 def create_user_with_credentials(
@@ -64,15 +67,23 @@ def create_user_with_credentials(
         return Err(f"Unexpected error during user creation: {e}")
 
 
-def login(session: ApiSession, token_path: str, password: str) -> Result[None, str]:
+def login(
+    session: ApiSession,
+    token_path: str,
+    password: str,
+    agent: CredentialAgent | None = None,
+) -> Result[str, str]:
     """
     Authenticate user with credentials file.
 
     Args:
         session: HTTP session for API calls
+        agent: Credential agent to keep the unlocked private key for the session
 
     Returns:
-        Result containing None on success or error message on failure
+        Result containing the id of the logged in user or error message on
+        failure. The agent may already have locked again (idle TTL of 0),
+        so use this id rather than agent.user_id
     """
     try:
         user_id, private_key_bytes = get_user_credentials(token_path, password)
@@ -102,8 +113,27 @@ def login(session: ApiSession, token_path: str, password: str) -> Result[None, s
         if login_result.is_err():
             return Err(login_result.unwrap_err())
 
-        return Ok(None)
+        if agent is not None:
+            agent.unlock(user_id, private_key_bytes)
+
+        return Ok(user_id)
     except CredentialsRepoError as e:
         return Err(str(e))
     except Exception as e:
         return Err(f"Unexpected error during login: {e}")
+
+
+def logout(session: ApiSession, agent: CredentialAgent | None = None) -> None:
+    """
+    Forget the session token and drop key material cached during the session.
+
+    Args:
+        session: HTTP session for API calls
+        agent: Credential agent holding the unlocked private key
+    """
+    session.headers.pop("Authorization", None)
+    session.cache.clear()
+    submission_repository.for_session(session).clear()
+    key_cache.clear()
+    if agent is not None:
+        agent.lock()
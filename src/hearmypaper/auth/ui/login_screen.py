@@ -2,7 +2,7 @@ import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 
-from ..service import login
+from ..async_service import login
 
 
 def login_screen(navigator):
@@ -52,11 +52,18 @@ def login_screen(navigator):
             await navigator.main_window.dialog(dialog)
             return
 
-        result = login(navigator.session, token_path_input.value, password.value)
+        result = await login(
+            navigator.session,
+            token_path_input.value,
+            password.value,
+            agent=navigator.agent,
+        )
 
         if result.is_ok():
             # Store credentials path in navigator
             navigator.credentials_path = token_path_input.value
+            # Not agent.user_id: the agent drops it with the key when it locks
+            navigator.open_store(result.unwrap())
             navigator.navigate("resource_catalog")
             return
 
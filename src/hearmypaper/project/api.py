@@ -1,6 +1,5 @@
 from ..shared.utils.session import ApiSession
 from result import Result, Err
-from pydantic import TypeAdapter
 
 from .dto import (
     ProjectCreateRequest,
@@ -10,27 +9,40 @@ from .dto import (
     ProjectListResponse,
     StudentAssignmentRequest,
 )
-from ..shared.utils.api import check_response
+from ..shared.utils.api import check_response, decode_response
+from ..shared.utils.local_store import Delta, decode_delta, delta_params
+from ..shared.utils.paging import get_page
 
 
-def get_projects(session: ApiSession) -> Result[list[ProjectListResponse], str]:
+def get_projects(
+    session: ApiSession, limit: int | None = None, offset: int = 0
+) -> Result[list[ProjectListResponse], str]:
     try:
-        r = session.get("/project/")
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(list[ProjectListResponse]).validate_python(data)
+        return get_page(
+            lambda paging: decode_response(
+                session.get("/project/", params=paging), list[ProjectListResponse]
+            ),
+            limit,
+            offset,
         )
     except Exception as e:
         return Err(f"Network error: {e}")
 
 
+def get_project_changes(
+    session: ApiSession, updated_since: str | None = None
+) -> Result[Delta[ProjectListResponse], str]:
+    try:
+        r = session.get("/project/", params=delta_params(updated_since))
+        return decode_delta(r, ProjectListResponse, updated_since)
+    except Exception as e:
+        return Err(f"Network error: {e}")
+
+
 def get_project(session: ApiSession, project_id: int) -> Result[ProjectResponse, str]:
     try:
         r = session.get(f"/project/{project_id}")
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(ProjectResponse).validate_python(data)
-        )
+        return decode_response(r, ProjectResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
@@ -40,10 +52,7 @@ def create_project(
 ) -> Result[ProjectCreateResponse, str]:
     try:
         r = session.post("/project/", json=req.model_dump())
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(ProjectCreateResponse).validate_python(data)
-        )
+        return decode_response(r, ProjectCreateResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
@@ -53,10 +62,7 @@ def update_project(
 ) -> Result[ProjectResponse, str]:
     try:
         r = session.put(f"/project/{project_id}", json=req.model_dump())
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(ProjectResponse).validate_python(data)
-        )
+        return decode_response(r, ProjectResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
@@ -66,10 +72,7 @@ def assign_students(
 ) -> Result[ProjectResponse, str]:
     try:
         r = session.put(f"/project/{project_id}/students", json=req.model_dump())
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(ProjectResponse).validate_python(data)
-        )
+        return decode_response(r, ProjectResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
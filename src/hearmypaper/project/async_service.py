@@ -0,0 +1,12 @@
+"""Awaitable versions of service.py, run off the UI event loop."""
+
+from ..shared.utils.background import to_async
+from . import service
+
+create_project = to_async(service.create_project)
+update_project = to_async(service.update_project)
+get_project = to_async(service.get_project)
+get_projects = to_async(service.get_projects)
+assign_students = to_async(service.assign_students)
+get_project_students = to_async(service.get_project_students)
+sync_projects = to_async(service.sync_projects)
@@ -1,3 +1,5 @@
+from ..shared.utils import local_store
+from ..shared.utils.local_store import LocalStore
 from ..shared.utils.session import ApiSession
 from result import Result
 
@@ -31,8 +33,26 @@ def get_project(session: ApiSession, project_id: int) -> Result[ProjectView, str
     return api.get_project(session, project_id).map(ProjectView.from_response)
 
 
-def get_projects(session: ApiSession) -> Result[list[ProjectListResponse], str]:
-    return api.get_projects(session)
+def get_projects(
+    session: ApiSession, limit: int | None = None, offset: int = 0
+) -> Result[list[ProjectListResponse], str]:
+    return api.get_projects(session, limit, offset)
+
+
+def stored_projects(store: LocalStore) -> list[ProjectListResponse]:
+    return store.load("projects", ProjectListResponse)
+
+
+def sync_projects(
+    session: ApiSession, store: LocalStore
+) -> Result[list[ProjectListResponse], str]:
+    """Fetch the projects changed since the last sync and return all of them."""
+    return local_store.sync(
+        store,
+        "projects",
+        ProjectListResponse,
+        lambda since: api.get_project_changes(session, since),
+    )
 
 
 def assign_students(
@@ -1,24 +1,31 @@
+from result import Ok
+
 from hearmypaper.shared.ui.catalog_screen import catalog_screen
-from ..service import get_projects
+from ..async_service import sync_projects
+from ..service import stored_projects
 
 
-def projects_catalog_screen(navigator):
+async def projects_catalog_screen(navigator):
     def on_row_activate(row):
         navigator.navigate("project_info", row.id)
 
-    data = (
-        get_projects(navigator.session)
-        .map(lambda projects: [project.model_dump() for project in projects])
-        .map_err(lambda err: f"Error loading projects: {err}")
-    )
+    async def refresh():
+        return (
+            (await sync_projects(navigator.session, navigator.store))
+            .map(lambda projects: [project.model_dump() for project in projects])
+            .map_err(lambda err: f"Error syncing projects: {err}")
+        )
+
+    stored = [project.model_dump() for project in stored_projects(navigator.store)]
 
     actions = [("Create Project", lambda w: navigator.navigate("project_create_form"))]
 
     return catalog_screen(
         title="Projects",
         headings=["Title"],
-        data=data,
+        data=Ok(stored),
         on_back=lambda w: navigator.navigate("resource_catalog"),
         actions=actions,
         on_activate=on_row_activate,
+        refresh=refresh,
     )
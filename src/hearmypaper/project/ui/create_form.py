@@ -1,7 +1,7 @@
 import toga
 from datetime import datetime, timedelta
 
-from ..service import create_project
+from ..async_service import create_project
 from ..dto import ProjectCreateDto
 from ...shared.ui.components.datetime_picker import DateTimePicker
 
@@ -63,7 +63,7 @@ def project_create_form_screen(navigator):
         )
 
         try:
-            result = create_project(navigator.session, project_dto)
+            result = await create_project(navigator.session, project_dto)
 
             if result.is_ok():
                 response = result.unwrap()
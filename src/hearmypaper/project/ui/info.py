@@ -1,10 +1,10 @@
 from result import is_ok
 from hearmypaper.shared.ui.item_info_screen import item_info_screen
-from ..service import get_project
+from ..async_service import get_project
 
 
-def project_info_screen(navigator, project_id):
-    data = get_project(navigator.session, project_id).map(
+async def project_info_screen(navigator, project_id):
+    data = (await get_project(navigator.session, project_id)).map(
         lambda project: project.model_dump()
     )
 
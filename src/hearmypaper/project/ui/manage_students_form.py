@@ -1,10 +1,10 @@
 import toga
 
-from ..service import assign_students, get_project_students
+from ..async_service import assign_students, get_project_students
 from ..dto import StudentAssignmentDto
 
 
-def manage_students_form_screen(navigator, project_id):
+async def manage_students_form_screen(navigator, project_id):
     children = [
         toga.Label(
             "Manage Students",
@@ -19,7 +19,7 @@ def manage_students_form_screen(navigator, project_id):
     ]
 
     # Fetch existing student emails
-    existing_emails_result = get_project_students(navigator.session, project_id)
+    existing_emails_result = await get_project_students(navigator.session, project_id)
     initial_value = ""
     if existing_emails_result.is_ok():
         existing_emails = existing_emails_result.unwrap()
@@ -59,7 +59,9 @@ def manage_students_form_screen(navigator, project_id):
         assignment_dto = StudentAssignmentDto(student_emails=email_lines)
 
         try:
-            result = assign_students(navigator.session, project_id, assignment_dto)
+            result = await assign_students(
+                navigator.session, project_id, assignment_dto
+            )
 
             if result.is_ok():
                 success_dialog = toga.InfoDialog(
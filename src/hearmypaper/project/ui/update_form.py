@@ -1,7 +1,7 @@
 import toga
 from datetime import datetime
 
-from ..service import update_project
+from ..async_service import update_project
 from ..dto import ProjectUpdateDto
 from ...shared.ui.components.datetime_picker import DateTimePicker
 
@@ -76,7 +76,9 @@ def project_edit_form_screen(navigator, project_data):
                 deadline=deadline,
             )
 
-            result = update_project(navigator.session, project_data["id"], project_dto)
+            result = await update_project(
+                navigator.session, project_data["id"], project_dto
+            )
 
             if result.is_ok():
                 success_dialog = toga.InfoDialog(
@@ -1,10 +1,11 @@
+import asyncio
 import textwrap
 import toga
-from result import Result, is_err
+from result import Err, Result, is_err
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 
 def catalog_screen(
@@ -15,7 +16,17 @@ def catalog_screen(
     actions=None,
     on_back=None,
     on_activate=None,
+    load_more: Callable[[int], Awaitable[Result]] | None = None,
+    page_size: int | None = None,
+    refresh: Callable[[], Awaitable[Result]] | None = None,
 ):
+    """
+    With `load_more`, `data` is the first page of `page_size` rows and
+    further pages are fetched by offset when the user asks for them.
+
+    With `refresh`, `data` is shown at once (rows kept locally) and
+    replaced by the rows `refresh` returns once it completes.
+    """
     back_button = toga.Button(
         "<",
         on_press=on_back,
@@ -61,6 +72,61 @@ def catalog_screen(
     if on_activate:
         table.on_activate = on_row_activate
 
-    return toga.Box(
-        children=[header_box, table], style=Pack(direction=COLUMN, margin=20, gap=10)
-    )
+    children = [header_box, table]
+
+    if refresh is not None:
+        sync_label = toga.Label("Syncing...", style=Pack(color="#666666"))
+
+        async def on_refresh():
+            try:
+                result = await refresh()
+            except Exception as e:
+                result = Err(f"Sync failed: {e}")
+            # The rows shown stay as they are
+            if is_err(result):
+                sync_label.text = result.err_value
+                sync_label.style.color = "red"
+                return
+
+            table.data = result.unwrap()
+            sync_label.text = ""
+
+        asyncio.ensure_future(on_refresh())
+        children.append(sync_label)
+
+    if load_more is not None and page_size and len(data.unwrap()) >= page_size:
+        loaded = len(data.unwrap())
+        status_label = toga.Label("", style=Pack(color="red", flex=1))
+
+        async def on_load_more(widget):
+            nonlocal loaded
+            widget.enabled = False
+            result = await load_more(loaded)
+
+            if is_err(result):
+                status_label.text = result.err_value
+                widget.enabled = True
+                return
+
+            rows = result.unwrap()
+            for row in rows:
+                table.data.append(row)
+            loaded += len(rows)
+            status_label.text = ""
+
+            # A short page means there is nothing left to fetch
+            widget.enabled = len(rows) >= page_size
+            if not widget.enabled:
+                widget.text = "All loaded"
+
+        children.append(
+            toga.Box(
+                children=[
+                    status_label,
+                    toga.Button("Load more", on_press=on_load_more),
+                ],
+                style=Pack(direction=ROW, align_items="center"),
+            )
+        )
+
+    return toga.Box(children=children, style=Pack(direction=COLUMN, margin=20, gap=10))
@@ -0,0 +1,84 @@
+from result import Ok
+import toga
+
+from .catalog_screen import catalog_screen
+
+
+def _kib(size: int) -> str:
+    return f"{size / 1024:.1f} KiB"
+
+
+def diagnostics_screen(navigator, previous=None):
+    """
+    Request timings of the current session, per endpoint. Not linked from
+    any screen; opened with the Diagnostics command. `previous` is the
+    (name, args, kwargs) of the screen to go back to.
+    """
+    timings = navigator.session.timings()
+    rows = [
+        [
+            t.endpoint,
+            str(t.requests),
+            str(t.errors),
+            f"{t.phases['dns'].p50_ms:.0f}",
+            f"{t.phases['connect'].p50_ms:.0f}",
+            f"{t.phases['ttfb'].p50_ms:.0f}",
+            f"{t.phases['total'].p50_ms:.0f}",
+            f"{t.phases['total'].p95_ms:.0f}",
+            _kib(t.request_bytes),
+            _kib(t.response_bytes),
+        ]
+        for t in timings
+    ]
+
+    def on_back(widget):
+        name, args, kwargs = previous
+        navigator.navigate(name, *args, **kwargs)
+
+    def on_refresh(widget):
+        navigator.navigate("diagnostics", previous=previous)
+
+    def on_clear(widget):
+        navigator.session.telemetry.clear()
+        on_refresh(widget)
+
+    async def on_export(widget):
+        file_path = await navigator.main_window.save_file_dialog(
+            title="Save Request Timings",
+            suggested_filename="requests.jsonl",
+        )
+        if not file_path:
+            return
+
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                lines = navigator.session.telemetry.dump(f)
+            dialog = toga.InfoDialog(
+                title="Success", message=f"Wrote {lines} lines to {file_path}"
+            )
+        except OSError as e:
+            dialog = toga.ErrorDialog(title="Error", message=f"Export failed: {e}")
+        await navigator.main_window.dialog(dialog)
+
+    return catalog_screen(
+        title="Diagnostics (ms)",
+        headings=[
+            "Endpoint",
+            "Requests",
+            "Errors",
+            "DNS p50",
+            "Connect p50",
+            "TTFB p50",
+            "Total p50",
+            "Total p95",
+            "Sent",
+            "Received",
+        ],
+        data=Ok(rows),
+        on_back=on_back if previous else None,
+        actions=[
+            ("Refresh", on_refresh),
+            ("Clear", on_clear),
+            ("Export", on_export),
+        ],
+    )
@@ -0,0 +1,24 @@
+import toga
+from toga.style import Pack
+from toga.style.pack import COLUMN
+
+
+def placeholder_screen(message: str = "Loading...", error: bool = False):
+    """Shown while an async screen factory is still fetching its data."""
+    children = [
+        toga.Label(
+            message,
+            style=Pack(
+                color="red" if error else "#666666",
+                text_align="center",
+                margin=(10, 0),
+            ),
+        )
+    ]
+    if not error:
+        children.insert(0, toga.ActivityIndicator(running=True))
+
+    return toga.Box(
+        children=children,
+        style=Pack(direction=COLUMN, margin=20, gap=10, align_items="center"),
+    )
@@ -1,5 +1,6 @@
 from result import Ok
 from ...shared.ui.catalog_screen import catalog_screen
+from ...auth.service import logout
 
 
 def resource_catalog_screen(navigator):
@@ -11,6 +12,11 @@ def resource_catalog_screen(navigator):
     ]
 
     def on_row_activate(row):
+        # Catalogs render from the store, which only exists once logged in
+        if navigator.store is None:
+            navigator.navigate("login")
+            return
+
         match row.resource:
             case "Users":
                 navigator.navigate("users_catalog")
@@ -21,11 +27,17 @@ def resource_catalog_screen(navigator):
             case "Submissions":
                 navigator.navigate("submissions_catalog")
 
+    def on_logout(widget):
+        logout(navigator.session, navigator.agent)
+        navigator.credentials_path = None
+        navigator.close_store()
+        navigator.navigate("login")
+
     return catalog_screen(
         title="Resources",
         headings=["Resource"],
         data=Ok(resources),
         on_back=None,
-        actions=None,
+        actions=[("Logout", on_logout)],
         on_activate=on_row_activate,
     )
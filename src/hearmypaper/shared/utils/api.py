@@ -1,7 +1,29 @@
+from typing import TypeVar
+
 import cbor2
 import requests
 from result import Result, Ok, Err
 
+from . import decoders
+from .http_cache import memo
+
+T = TypeVar("T")
+
+CBOR_CONTENT_TYPE = "application/cbor"
+
+
+def is_cbor(r: requests.Response, cbor_data: bool = False) -> bool:
+    """
+    Whether the body is CBOR, going by the negotiated Content-Type;
+    `cbor_data` decides for servers that do not label their responses.
+    """
+    content_type = r.headers.get("Content-Type", "")
+    if content_type.startswith(CBOR_CONTENT_TYPE):
+        return True
+    if "json" in content_type:
+        return False
+    return cbor_data
+
 
 def check_response(
     r: requests.Response, raw_data: bool = False, cbor_data: bool = False
@@ -12,7 +34,7 @@ def check_response(
     Args:
         r: HTTP response
         raw_data: If True, return raw bytes instead of parsing
-        cbor_data: If True, parse response as CBOR instead of JSON
+        cbor_data: If True, parse unlabelled responses as CBOR instead of JSON
 
     Returns:
         Result with data (dict or bytes) or error message
@@ -34,10 +56,11 @@ def check_response(
             return Err(f"{r.status_code}: Request failed")
 
     try:
-        if cbor_data:
-            data = cbor2.loads(r.content)
+        # Cached responses are decoded once per representation
+        if is_cbor(r, cbor_data):
+            data = memo(r, "cbor", lambda: cbor2.loads(r.content))
         else:
-            data = r.json()
+            data = memo(r, "json", r.json)
     except (ValueError, cbor2.CBORDecodeError):
         return Err(f"{r.status_code}: Invalid response format")
 
@@ -54,3 +77,31 @@ def check_response(
     else:
         error_message = data.get("detail", data.get("error", "Something went wrong"))
         return Err(f"{r.status_code}: {error_message}")
+
+
+def decode_response(
+    r: requests.Response,
+    tp: type[T],
+    cbor_data: bool = False,
+    trusted: bool = False,
+) -> Result[T, str]:
+    """
+    Check HTTP response and decode its body straight into `tp`.
+
+    Uses a cached TypeAdapter and validates the raw body; `trusted` builds
+    the models without validation (see decoders.construct). Responses
+    served from the HTTP cache are decoded once.
+    """
+    if r.status_code not in [200, 201]:
+        return Err(check_response(r, cbor_data=cbor_data).unwrap_err())
+
+    try:
+        return Ok(
+            memo(
+                r,
+                ("dto", tp, trusted),
+                lambda: decoders.decode(r.content, tp, is_cbor(r, cbor_data), trusted),
+            )
+        )
+    except (ValueError, TypeError, KeyError, cbor2.CBORDecodeError):
+        return Err(f"{r.status_code}: Invalid response format")
@@ -0,0 +1,28 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Enough for a few concurrent requests without starving the CPU-bound crypto
+MAX_WORKERS = 4
+
+executor = ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="hmp-service")
+
+
+def to_async(fn: Callable[P, T]) -> Callable[P, Awaitable[T]]:
+    """
+    Wrap a blocking function so it runs on the shared service executor.
+    The wrapper must be awaited from a running event loop (the Toga one).
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    return wrapper
@@ -0,0 +1,108 @@
+import struct
+from typing import Any, BinaryIO, Iterable, Iterator, cast
+
+import cbor2
+
+CHUNK_SIZE = 256 << 10
+
+MAJOR_BYTES = 2
+MAJOR_MAP = 5
+
+Buffer = bytes | bytearray | memoryview
+
+
+def encode_head(major_type: int, length: int) -> bytes:
+    """Encode a CBOR initial byte with its length argument."""
+    if length < 24:
+        return bytes([major_type << 5 | length])
+    if length < 1 << 8:
+        return struct.pack(">BB", major_type << 5 | 24, length)
+    if length < 1 << 16:
+        return struct.pack(">BH", major_type << 5 | 25, length)
+    if length < 1 << 32:
+        return struct.pack(">BI", major_type << 5 | 26, length)
+    return struct.pack(">BQ", major_type << 5 | 27, length)
+
+
+class ByteStream:
+    """
+    A CBOR byte string of known length whose content is produced lazily.
+
+    `source` is a buffer, a readable binary file positioned at the start of
+    the content, or an iterable of chunks. Buffers and seekable files can be
+    iterated more than once; plain iterables only once.
+    """
+
+    def __init__(
+        self,
+        source: Buffer | BinaryIO | Iterable[bytes],
+        length: int | None = None,
+    ):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            length = len(source) if length is None else length
+        elif length is None:
+            raise ValueError("length is required for file and iterable sources")
+
+        self.source = source
+        self.length = length
+        self._start = cast(BinaryIO, source).tell() if hasattr(source, "seek") else None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes | memoryview]:
+        produced = 0
+        for chunk in self._chunks():
+            produced += len(chunk)
+            if produced > self.length:
+                raise ValueError("Byte stream is longer than declared")
+            yield chunk
+
+        if produced != self.length:
+            raise ValueError("Byte stream is shorter than declared")
+
+    def _chunks(self) -> Iterator[bytes | memoryview]:
+        source = self.source
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source)
+            for start in range(0, len(view), CHUNK_SIZE):
+                yield view[start : start + CHUNK_SIZE]
+        elif hasattr(source, "read"):
+            file = cast(BinaryIO, source)
+            if self._start is not None:
+                file.seek(self._start)
+            yield from iter(lambda: file.read(CHUNK_SIZE), b"")
+        else:
+            yield from source
+
+
+class CborStreamBody:
+    """
+    Request body encoding a CBOR map without materialising it.
+
+    Values wrapped in ByteStream are emitted as a definite-length byte string
+    header followed by their content in chunks; other values are encoded
+    with cbor2. Field order is preserved, so for plain values the output is
+    identical to cbor2.dumps(fields). len() gives the exact encoded size,
+    which requests uses as the Content-Length.
+    """
+
+    def __init__(self, fields: dict[str, Any]):
+        self._parts: list[bytes | ByteStream] = [encode_head(MAJOR_MAP, len(fields))]
+        for key, value in fields.items():
+            self._parts.append(cbor2.dumps(key))
+            if isinstance(value, ByteStream):
+                self._parts.append(encode_head(MAJOR_BYTES, len(value)))
+                self._parts.append(value)
+            else:
+                self._parts.append(cbor2.dumps(value))
+
+    def __len__(self) -> int:
+        return sum(len(part) for part in self._parts)
+
+    def __iter__(self) -> Iterator[bytes | memoryview]:
+        for part in self._parts:
+            if isinstance(part, ByteStream):
+                yield from part
+            else:
+                yield part
@@ -0,0 +1,82 @@
+import threading
+import time
+
+DEFAULT_IDLE_TTL_SECONDS = 15 * 60
+
+
+class CredentialAgent:
+    """
+    Keeps the unlocked private key in memory for the current session.
+
+    The key is wiped after `idle_ttl_seconds` without use, on lock() and on
+    logout. Callers receive short-lived copies that Python cannot wipe, so
+    they should not hold on to them.
+    """
+
+    def __init__(self, idle_ttl_seconds: float = DEFAULT_IDLE_TTL_SECONDS):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._user_id: str | None = None
+        self._private_key: bytearray | None = None
+        self._expires_at = 0.0
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_unlocked(self) -> bool:
+        with self._lock:
+            return self._private_key is not None and not self._expired()
+
+    @property
+    def user_id(self) -> str | None:
+        with self._lock:
+            return None if self._expired() else self._user_id
+
+    def unlock(self, user_id: str, private_key_bytes: bytes) -> None:
+        """Store the unlocked key, replacing (and wiping) any previous one."""
+        with self._lock:
+            self._wipe()
+            self._user_id = user_id
+            self._private_key = bytearray(private_key_bytes)
+            self._touch()
+
+    def private_key(self) -> bytes | None:
+        """Return the unlocked key and restart the idle timer, or None if locked."""
+        with self._lock:
+            if self._private_key is None or self._expired():
+                self._wipe()
+                return None
+            self._touch()
+            return bytes(self._private_key)
+
+    def lock(self) -> None:
+        """Wipe the key immediately."""
+        with self._lock:
+            self._wipe()
+
+    def _expired(self) -> bool:
+        return time.monotonic() >= self._expires_at
+
+    def _touch(self) -> None:
+        self._expires_at = time.monotonic() + self.idle_ttl_seconds
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.idle_ttl_seconds, self._auto_lock)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _auto_lock(self) -> None:
+        with self._lock:
+            if self._expired():
+                self._wipe()
+
+    def _wipe(self) -> None:
+        if self._private_key is not None:
+            self._private_key[:] = bytes(len(self._private_key))
+        self._private_key = None
+        self._user_id = None
+        self._expires_at = 0.0
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,44 @@
+import functools
+import json
+from typing import Any, get_args, get_origin
+
+import cbor2
+from pydantic import BaseModel, TypeAdapter
+
+
+@functools.cache
+def adapter(tp: Any) -> TypeAdapter:
+    """The TypeAdapter for `tp`, built (and its validator compiled) once."""
+    return TypeAdapter(tp)
+
+
+def decode(
+    content: bytes, tp: Any, cbor_data: bool = False, trusted: bool = False
+) -> Any:
+    """
+    Decode a response body into `tp`.
+
+    JSON is validated straight from the bytes, without building an
+    intermediate dict first. `trusted` skips validation entirely, see
+    construct().
+    """
+    if trusted:
+        return construct(tp, cbor2.loads(content) if cbor_data else json.loads(content))
+    if cbor_data:
+        return adapter(tp).validate_python(cbor2.loads(content))
+    return adapter(tp).validate_json(content)
+
+
+def construct(tp: Any, data: Any) -> Any:
+    """
+    Build a model, or a list of models, with model_construct: no type checks
+    or coercion. Only for flat DTOs whose fields arrive in their final
+    JSON types, from a server we trust. Note that validate_json runs in
+    pydantic-core and is usually faster; see benchmarks/decoding.py.
+    """
+    if get_origin(tp) is list:
+        (model,) = get_args(tp)
+        return [model.model_construct(**row) for row in data]
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        return tp.model_construct(**data)
+    raise TypeError(f"Cannot construct {tp!r} without validation")
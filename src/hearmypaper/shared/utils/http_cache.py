@@ -0,0 +1,161 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from pydantic import BaseModel
+from requests.structures import CaseInsensitiveDict
+
+T = TypeVar("T")
+
+MAX_ENTRIES = 256
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class CacheEntry:
+    """A validated 200 response and the values parsed from it."""
+
+    def __init__(self, response: requests.Response):
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.url = response.url
+        self.content = response.content
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.encoding = response.encoding
+        self.parsed: dict[Hashable, Any] = {}
+        self.lock = threading.Lock()
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, request: requests.PreparedRequest) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.content
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        response.url = self.url
+        response.request = request
+        return response
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    invalidations: int
+    size: int
+
+
+# Responses served or stored by a cache, so parsing can be memoised per entry
+_entries: "weakref.WeakKeyDictionary[requests.Response, CacheEntry]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def memo(response: requests.Response, key: Hashable, build: Callable[[], T]) -> T:
+    """
+    Parse `response` with `build` once per cached representation.
+
+    On a 304 the value built for the stored 200 is returned as is, so
+    pydantic validation is not repeated. Callers must treat it as shared
+    and not mutate it. Uncached responses are simply parsed.
+    """
+    entry = _entries.get(response)
+    if entry is None:
+        return build()
+
+    with entry.lock:
+        if key not in entry.parsed:
+            entry.parsed[key] = build()
+        return entry.parsed[key]
+
+
+class ResponseCache:
+    """
+    Conditional-request cache for GET responses carrying an ETag or a
+    Last-Modified validator. Writes (PUT, POST, PATCH, DELETE) drop every
+    entry under the same top-level path, e.g. /project/ for PUT /project/3.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, url: str) -> CacheEntry | None:
+        """The entry to validate a request with; pass it on to `resolve`."""
+        with self._lock:
+            return self._entries.get(url)
+
+    def resolve(
+        self, url: str, response: requests.Response, entry: CacheEntry | None
+    ) -> requests.Response:
+        """
+        Store a fresh 200, or turn a 304 into the response of `entry`, the
+        one the request was validated with. A write may have dropped it from
+        the cache meanwhile; the 304 still vouches for that snapshot.
+        """
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self._hits += 1
+                if self._entries.get(url) is entry:
+                    self._entries.move_to_end(url)
+            cached = entry.to_response(response.request)
+            _entries[cached] = entry
+            return cached
+
+        with self._lock:
+            self._misses += 1
+            self._entries.pop(url, None)
+            if response.status_code != 200:
+                return response
+            if (
+                "ETag" not in response.headers
+                and "Last-Modified" not in response.headers
+            ):
+                return response
+
+        entry = CacheEntry(response)
+        with self._lock:
+            self._entries[url] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        _entries[response] = entry
+        return response
+
+    def invalidate(self, url: str) -> None:
+        """Drop entries sharing the first path segment of `url`."""
+        prefix = _collection(url)
+        with self._lock:
+            stale = [key for key in self._entries if _collection(key) == prefix]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                invalidations=self._invalidations,
+                size=len(self._entries),
+            )
+
+
+def _collection(url: str) -> tuple[str, str]:
+    parts = urlsplit(url)
+    return (parts.netloc, parts.path.strip("/").split("/", 1)[0])
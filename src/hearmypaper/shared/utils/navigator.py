@@ -1,16 +1,28 @@
+import asyncio
+import inspect
 import toml
 import toga
 from toga.paths import Paths
-from typing import Callable, Any
+from typing import Awaitable, Callable
 
+from ..ui.placeholder_screen import placeholder_screen
+from .credential_agent import CredentialAgent, DEFAULT_IDLE_TTL_SECONDS
+from .local_store import DEFAULT_MAX_BYTES, LocalStore
 from .session import ApiSession
+from .transport import TransportPolicy
 
 
 class Navigator:
     def __init__(self, main_window: toga.MainWindow, app_paths: Paths):
         self.main_window = main_window
         self.app_paths = app_paths
-        self.screens: dict[str, Callable[[Any], toga.Widget]] = {}
+        self.screens: dict[
+            str, Callable[..., toga.Widget | Awaitable[toga.Widget]]
+        ] = {}
+        # Name and arguments of the screen shown last, to come back to it
+        self.current: tuple[str, tuple, dict] | None = None
+        self._navigation = 0
+        self._pending: asyncio.Future | None = None
 
         # Load config from resources
         config_path = app_paths.app / "resources/config.toml"
@@ -20,8 +32,44 @@ class Navigator:
         self.api_base_url = config.get("api", {}).get(
             "base_url", "http://localhost:8000"
         )
-        self.session = ApiSession(base_url=self.api_base_url)
+        self.session = ApiSession(
+            base_url=self.api_base_url,
+            policy=TransportPolicy.model_validate(config.get("transport", {})),
+        )
         self.credentials_path: str | None = None
+        self.agent = CredentialAgent(
+            idle_ttl_seconds=config.get("agent", {}).get(
+                "idle_ttl_seconds", DEFAULT_IDLE_TTL_SECONDS
+            )
+        )
+        self.store_max_bytes = config.get("store", {}).get(
+            "max_bytes", DEFAULT_MAX_BYTES
+        )
+        # Catalog rows of the logged in user, kept across launches
+        self.store: LocalStore | None = None
+        self.prefetch_config: dict = config.get("prefetch", {})
+        # Budget of the decrypted submissions kept on disk, if configured
+        self.files_max_bytes: int | None = config.get("files", {}).get("max_bytes")
+        # Called once when the user leaves the current screen
+        self._on_leave: list[Callable[[], None]] = []
+
+    def open_store(self, user_id: str) -> None:
+        self.close_store()
+        self.store = LocalStore.for_user(
+            self.app_paths.data / "metadata",
+            self.api_base_url,
+            user_id,
+            self.store_max_bytes,
+        )
+
+    def close_store(self) -> None:
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def on_leave(self, callback: Callable[[], None]) -> None:
+        """Run `callback` when the next screen is navigated to."""
+        self._on_leave.append(callback)
 
     def register_screen(self, name, screen_factory):
         self.screens[name] = screen_factory
@@ -30,5 +78,38 @@ class Navigator:
         if name not in self.screens:
             raise ValueError(f"Screen '{name}' not registered")
 
+        callbacks, self._on_leave = self._on_leave, []
+        for callback in callbacks:
+            callback()
+
+        self.current = (name, args, kwargs)
+        self._navigation += 1
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
         widget = self.screens[name](self, *args, **kwargs)
-        self.main_window.content = widget
+        if inspect.isawaitable(widget):
+            # Async factories load their data off the event loop; show a
+            # placeholder now and swap the screen in once it is ready
+            self.main_window.content = placeholder_screen()
+            self._pending = asyncio.ensure_future(
+                self._show_when_ready(self._navigation, widget)
+            )
+        else:
+            self.main_window.content = widget
+
+    async def _show_when_ready(
+        self, navigation: int, screen: Awaitable[toga.Widget]
+    ) -> None:
+        try:
+            widget = await screen
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            widget = placeholder_screen(f"Failed to load screen: {e}", error=True)
+
+        # Ignore screens finished after the user navigated elsewhere
+        if navigation == self._navigation:
+            self.main_window.content = widget
+            self._pending = None
@@ -0,0 +1,52 @@
+from typing import Callable, TypeVar
+
+from result import Ok, Result
+
+T = TypeVar("T")
+
+PAGE_SIZE = 50
+
+
+def page_params(limit: int | None, offset: int = 0) -> dict[str, int]:
+    """Query parameters for one page; none when paging is not requested."""
+    if limit is None:
+        return {}
+    return {"limit": limit, "offset": offset}
+
+
+def trim_page(items: list[T], limit: int | None, offset: int = 0) -> list[T]:
+    """
+    Servers without paging support ignore the parameters and return the
+    whole collection; cut the requested page out of it locally.
+    """
+    if limit is None or len(items) <= limit:
+        return items
+    return items[offset : offset + limit]
+
+
+def get_page(
+    fetch: Callable[[dict[str, int]], Result[list[T], str]],
+    limit: int | None,
+    offset: int = 0,
+) -> Result[list[T], str]:
+    """
+    One page from `fetch`, which is called with the paging parameters.
+
+    A server ignoring them returns the whole collection. Longer than a page
+    it is cut locally; otherwise, past the first page, the answer is also
+    what a paging server would send, so a one-row request tells them apart.
+    A whole collection that has not grown gives an empty page, not repeats.
+    """
+    result = fetch(page_params(limit, offset))
+    if limit is None or result.is_err():
+        return result
+
+    items = result.unwrap()
+    if 0 < offset <= len(items) <= limit:
+        probe = fetch(page_params(1))
+        if probe.is_err():
+            return probe
+        # A paging server answers with the first row, not the page's
+        if probe.unwrap()[:1] == items[:1]:
+            return Ok(items[offset : offset + limit])
+    return Ok(trim_page(items, limit, offset))
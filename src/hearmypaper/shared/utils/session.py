@@ -1,12 +1,107 @@
-from requests import Session
+from requests import Request, Response, Session
 from urllib.parse import urljoin
 
+from .http_cache import SAFE_METHODS, ResponseCache
+from .telemetry import EndpointTimings, Telemetry
+from .transport import (
+    EndpointStats,
+    PooledAdapter,
+    PoolStats,
+    TransferStats,
+    TransportPolicy,
+    compress_body,
+)
+
+ACCEPT_CBOR = "application/cbor, application/json;q=0.9, */*;q=0.1"
+
 
 class ApiSession(Session):
-    def __init__(self, base_url=None):
+    def __init__(self, base_url=None, policy: TransportPolicy | None = None):
         self.base_url = base_url
+        self.policy = policy or TransportPolicy()
+        self.cache = ResponseCache()
+        self.transfers = TransferStats()
+        self.telemetry = Telemetry()
         super().__init__()
 
+        self.headers["Accept-Encoding"] = self.policy.accept_encoding
+        if self.policy.prefer_cbor:
+            self.headers["Accept"] = ACCEPT_CBOR
+
+        for prefix in ("https://", "http://"):
+            self.mount(prefix, PooledAdapter(self.policy))
+
     def request(self, method, url, *args, **kwargs):
         joined_url = urljoin(self.base_url, url)
-        return super().request(method, joined_url, *args, **kwargs)
+        # A stalled socket fails the request instead of hanging the caller
+        kwargs.setdefault("timeout", self.policy.timeout)
+
+        method = method.upper()
+        if method not in SAFE_METHODS:
+            response = self._send(method, joined_url, *args, **kwargs)
+            self.cache.invalidate(joined_url)
+            return response
+
+        if method != "GET" or kwargs.get("stream"):
+            return self._send(method, joined_url, *args, **kwargs)
+
+        key = Request(method, joined_url, params=kwargs.get("params")).prepare().url
+        entry = self.cache.get(key)
+        kwargs["headers"] = {
+            **(entry.conditional_headers() if entry else {}),
+            **(kwargs.get("headers") or {}),
+        }
+        response = self._send(method, joined_url, *args, **kwargs)
+        return self.cache.resolve(key, response, entry)
+
+    def _send(self, method, url, *args, **kwargs) -> Response:
+        request_bytes = compress_body(self.policy, kwargs)
+        request_bytes_sent = len(kwargs["data"]) if request_bytes else 0
+
+        with self.telemetry.measure(method, url) as sample:
+            response = super().request(method, url, *args, **kwargs)
+
+            response_bytes = response_bytes_received = 0
+            if not kwargs.get("stream") and response.raw is not None:
+                response_bytes = len(response.content)
+                # Bytes read off the socket, before content decoding
+                response_bytes_received = response.raw.tell()
+
+            sample.status = response.status_code
+            # Streamed bodies (uploads and downloads) report their length
+            sample.request_bytes = request_bytes_sent or _body_size(kwargs)
+            sample.response_bytes = response_bytes_received or int(
+                response.headers.get("Content-Length", 0)
+            )
+
+        self.transfers.record(
+            method,
+            url,
+            request_bytes,
+            request_bytes_sent,
+            response_bytes,
+            response_bytes_received,
+        )
+        return response
+
+    def pool_stats(self) -> list[PoolStats]:
+        """Connection reuse per host across every mounted adapter."""
+        return [
+            stats
+            for adapter in self.adapters.values()
+            if isinstance(adapter, PooledAdapter)
+            for stats in adapter.pool_stats()
+        ]
+
+    def transfer_stats(self) -> dict[str, EndpointStats]:
+        """Bytes before and after content encoding, per endpoint."""
+        return self.transfers.snapshot()
+
+    def timings(self) -> list[EndpointTimings]:
+        """DNS, connect, first-byte and total time histograms per endpoint."""
+        return self.telemetry.snapshot()
+
+
+def _body_size(kwargs) -> int:
+    data = kwargs.get("data")
+    return len(data) if hasattr(data, "__len__") else 0
@@ -0,0 +1,50 @@
+import queue
+import threading
+from typing import Generator, Iterable, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def prefetch(iterable: Iterable[T], depth: int = 8) -> Generator[T, None, None]:
+    """
+    Pull items from `iterable` on a background thread, staying up to `depth`
+    items ahead of the consumer, so producing (e.g. network reads) overlaps
+    with consuming (e.g. decryption). Exceptions are re-raised in the
+    consumer; closing the iterator early stops the producer.
+    """
+    items: queue.Queue = queue.Queue(depth)
+    stop = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as e:
+            put((_DONE, e))
+
+    producer = threading.Thread(target=produce, name="hmp-prefetch", daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
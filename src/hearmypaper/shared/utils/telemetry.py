@@ -0,0 +1,290 @@
+"""
+Per-request timing of ApiSession traffic.
+
+Connections opened through PooledAdapter report DNS, connect (TCP and TLS)
+and time-to-first-byte into the sample of the request running on the same
+thread. Samples are folded into per-endpoint histograms and the latest ones
+are kept for export as JSON lines.
+"""
+
+import bisect
+import re
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import IO, Iterator
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.response import HTTPResponse
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family
+
+# Upper bounds of the histogram buckets, in milliseconds; phases that did
+# not happen (no new connection, say) land in the 0 bucket
+BUCKETS_MS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+PHASES = ("dns", "connect", "ttfb", "total")
+MAX_SAMPLES = 1000
+
+
+class RequestSample(BaseModel):
+    """One request as seen by the client; times are in seconds"""
+
+    timestamp: str
+    method: str
+    endpoint: str
+    status: int = 0
+    dns: float = 0.0
+    connect: float = 0.0
+    ttfb: float = 0.0
+    total: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+
+class Histogram:
+    """Durations counted in fixed buckets, with exact count, sum and max."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile, in ms."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> "PhaseSummary":
+        return PhaseSummary(
+            count=self.count,
+            mean_ms=self.total_ms / self.count if self.count else 0.0,
+            p50_ms=self.percentile(50),
+            p95_ms=self.percentile(95),
+            p99_ms=self.percentile(99),
+            max_ms=self.max_ms,
+            buckets=dict(zip([*map(str, BUCKETS_MS), "inf"], self.counts)),
+        )
+
+
+class PhaseSummary(BaseModel):
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    buckets: dict[str, int]
+
+
+class EndpointTimings(BaseModel):
+    endpoint: str
+    requests: int
+    errors: int
+    statuses: dict[int, int]
+    request_bytes: int
+    response_bytes: int
+    phases: dict[str, PhaseSummary]
+
+
+class _Endpoint:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.statuses: dict[int, int] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.histograms = {phase: Histogram() for phase in PHASES}
+
+
+_current = threading.local()
+
+
+def endpoint_path(url: str) -> str:
+    """URL path with numeric ids folded, e.g. /project/{id}/students."""
+    return re.sub(r"/\d+(?=/|$)", "/{id}", urlsplit(url).path)
+
+
+def current_sample() -> RequestSample | None:
+    """The sample of the request this thread is sending, if measured."""
+    return getattr(_current, "sample", None)
+
+
+class Telemetry:
+    """Request timings per "METHOD /templated/path" endpoint."""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self._endpoints: dict[str, _Endpoint] = {}
+        self._samples: deque[RequestSample] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, method: str, url: str) -> Iterator[RequestSample]:
+        """
+        Time the request sent inside the block. The caller fills in status
+        and sizes; a request that raises is recorded with status 0.
+        """
+        sample = RequestSample(
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            method=method,
+            endpoint=endpoint_path(url),
+        )
+        _current.sample = sample
+        _current.started = time.perf_counter()
+        try:
+            yield sample
+        finally:
+            sample.total = time.perf_counter() - _current.started
+            _current.sample = None
+            self.record(sample)
+
+    def record(self, sample: RequestSample) -> None:
+        key = f"{sample.method} {sample.endpoint}"
+        with self._lock:
+            endpoint = self._endpoints.setdefault(key, _Endpoint())
+            endpoint.requests += 1
+            endpoint.errors += not 0 < sample.status < 400
+            endpoint.statuses[sample.status] = (
+                endpoint.statuses.get(sample.status, 0) + 1
+            )
+            endpoint.request_bytes += sample.request_bytes
+            endpoint.response_bytes += sample.response_bytes
+            for phase in PHASES:
+                endpoint.histograms[phase].add(getattr(sample, phase))
+            self._samples.append(sample)
+
+    def snapshot(self) -> list[EndpointTimings]:
+        """Per-endpoint summaries, slowest median total time first."""
+        with self._lock:
+            timings = [
+                EndpointTimings(
+                    endpoint=key,
+                    requests=endpoint.requests,
+                    errors=endpoint.errors,
+                    statuses=dict(endpoint.statuses),
+                    request_bytes=endpoint.request_bytes,
+                    response_bytes=endpoint.response_bytes,
+                    phases={
+                        phase: histogram.summary()
+                        for phase, histogram in endpoint.histograms.items()
+                    },
+                )
+                for key, endpoint in self._endpoints.items()
+            ]
+        return sorted(timings, key=lambda t: -t.phases["total"].p50_ms)
+
+    def samples(self) -> list[RequestSample]:
+        with self._lock:
+            return list(self._samples)
+
+    def dump(self, f: IO[str]) -> int:
+        """
+        Write one JSON line per endpoint summary ("kind": "endpoint") and
+        per retained request ("kind": "request"). Returns the line count.
+        """
+        lines = [
+            '{"kind":"endpoint",' + timings.model_dump_json()[1:]
+            for timings in self.snapshot()
+        ]
+        lines += [
+            '{"kind":"request",' + sample.model_dump_json()[1:]
+            for sample in self.samples()
+        ]
+        f.writelines(line + "\n" for line in lines)
+        return len(lines)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._samples.clear()
+
+
+class _TimedConnection(HTTPConnection):
+    """Reports DNS, connect and first-byte times to the current sample."""
+
+    def _new_conn(self) -> socket.socket:
+        sample = current_sample()
+        if sample is None:
+            return super()._new_conn()
+
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(
+                self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM
+            )
+        except OSError:
+            # Let urllib3 resolve again and raise its own error
+            return super()._new_conn()
+        sample.dns += time.perf_counter() - start
+
+        # Try each resolved address in order, as urllib3 would; TLS still
+        # uses the host name
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        host = self._dns_host
+        try:
+            for address in addresses[:-1]:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    continue
+            self._dns_host = addresses[-1]
+            return super()._new_conn()
+        finally:
+            self._dns_host = host
+
+    def connect(self) -> None:
+        sample = current_sample()
+        if sample is None:
+            return super().connect()
+
+        dns = sample.dns
+        start = time.perf_counter()
+        super().connect()
+        sample.connect += time.perf_counter() - start - (sample.dns - dns)
+
+    def getresponse(self) -> HTTPResponse:  # type: ignore[override]
+        response = super().getresponse()
+        sample = current_sample()
+        if sample is not None:
+            sample.ttfb = time.perf_counter() - _current.started
+        return response
+
+
+class TimedHTTPConnection(_TimedConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+POOL_CLASSES = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
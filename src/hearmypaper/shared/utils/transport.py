@@ -0,0 +1,201 @@
+import gzip
+import json
+import threading
+from typing import Any
+
+import urllib3.response
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .telemetry import POOL_CLASSES, endpoint_path
+
+# Bodies that are worth compressing; ciphertext (octet-stream) never is
+COMPRESSIBLE_TYPES = ("application/json", "application/cbor")
+
+
+class TransportPolicy(BaseModel):
+    """Connection pooling, timeout and retry settings for ApiSession"""
+
+    pool_connections: int = 4
+    pool_maxsize: int = 10
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_jitter: float = 0.25
+    backoff_max: float = 30.0
+    retry_statuses: list[int] = [429, 502, 503, 504]
+    respect_retry_after: bool = True
+    # Ask for CBOR bodies; servers without CBOR support keep answering JSON
+    prefer_cbor: bool = True
+    # Response encodings to offer, in order of preference, if available
+    accept_encodings: list[str] = ["zstd", "br", "gzip", "deflate"]
+    # Gzip JSON/CBOR request bodies; the server must accept Content-Encoding
+    compress_requests: bool = False
+    compress_min_size: int = 1024
+
+    @property
+    def accept_encoding(self) -> str:
+        supported = supported_encodings()
+        offered = [e for e in self.accept_encodings if e in supported]
+        return ", ".join(offered) or "identity"
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+    @property
+    def long_timeout(self) -> tuple[float, None]:
+        """For calls the server works on at length before it answers"""
+        return (self.connect_timeout, None)
+
+    def retry(self) -> Retry:
+        """
+        Retries for idempotent methods only (never POST or PATCH), with
+        jittered exponential backoff. The final failed response is
+        returned instead of raised, so check_response can report it.
+        """
+        return Retry(
+            total=self.retries,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            status_forcelist=self.retry_statuses,
+            backoff_factor=self.backoff_factor,
+            backoff_jitter=self.backoff_jitter,
+            backoff_max=self.backoff_max,
+            respect_retry_after_header=self.respect_retry_after,
+            raise_on_status=False,
+        )
+
+
+class PoolStats(BaseModel):
+    host: str
+    connections_opened: int
+    requests: int
+    idle_connections: int
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of requests served on an already open connection"""
+        if not self.requests:
+            return 0.0
+        return 1 - self.connections_opened / self.requests
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter configured from a TransportPolicy."""
+
+    def __init__(self, policy: TransportPolicy):
+        super().__init__(
+            pool_connections=policy.pool_connections,
+            pool_maxsize=policy.pool_maxsize,
+            max_retries=policy.retry(),
+        )
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        # Timed connections feed the request telemetry of ApiSession
+        self.poolmanager.pool_classes_by_scheme = POOL_CLASSES
+
+    def pool_stats(self) -> list[PoolStats]:
+        pools = self.poolmanager.pools
+        stats = []
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats.append(
+                PoolStats(
+                    host=f"{pool.scheme}://{pool.host}:{pool.port}",
+                    connections_opened=pool.num_connections,
+                    requests=pool.num_requests,
+                    idle_connections=pool.pool.qsize() if pool.pool else 0,
+                )
+            )
+        return stats
+
+
+def supported_encodings() -> set[str]:
+    """Content encodings urllib3 can decode with the installed packages."""
+    encodings = {"gzip", "deflate"}
+    if getattr(urllib3.response, "HAS_ZSTD", False):
+        encodings.add("zstd")
+    if getattr(urllib3.response, "brotli", None) is not None:
+        encodings.add("br")
+    return encodings
+
+
+def compress_body(policy: TransportPolicy, kwargs: dict[str, Any]) -> int:
+    """
+    Gzip a JSON or CBOR request body in `kwargs` in place when the policy
+    allows it and the body is large enough. Returns the uncompressed size.
+    """
+    headers = dict(kwargs.get("headers") or {})
+    if kwargs.get("json") is not None:
+        body = json.dumps(kwargs.pop("json"), allow_nan=False).encode()
+        headers["Content-Type"] = "application/json"
+    elif isinstance(kwargs.get("data"), (bytes, bytearray)):
+        body = bytes(kwargs["data"])
+    else:
+        return 0
+
+    content_type = headers.get("Content-Type", "")
+    if (
+        policy.compress_requests
+        and len(body) >= policy.compress_min_size
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+    ):
+        headers["Content-Encoding"] = "gzip"
+        kwargs["data"] = gzip.compress(body, 6)
+    else:
+        kwargs["data"] = body
+
+    kwargs["headers"] = headers
+    return len(body)
+
+
+class EndpointStats(BaseModel):
+    requests: int = 0
+    request_bytes: int = 0
+    request_bytes_sent: int = 0
+    response_bytes: int = 0
+    response_bytes_received: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return (
+            self.request_bytes
+            - self.request_bytes_sent
+            + self.response_bytes
+            - self.response_bytes_received
+        )
+
+
+class TransferStats:
+    """Body sizes before and after content encoding, per endpoint."""
+
+    def __init__(self) -> None:
+        self._endpoints: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request_bytes: int,
+        request_bytes_sent: int,
+        response_bytes: int,
+        response_bytes_received: int,
+    ) -> None:
+        endpoint = f"{method} {endpoint_path(url)}"
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.requests += 1
+            stats.request_bytes += request_bytes
+            stats.request_bytes_sent += request_bytes_sent
+            stats.response_bytes += response_bytes
+            stats.response_bytes_received += response_bytes_received
+
+    def snapshot(self) -> dict[str, EndpointStats]:
+        with self._lock:
+            return {k: v.model_copy() for k, v in self._endpoints.items()}
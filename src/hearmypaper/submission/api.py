@@ -1,36 +1,144 @@
-import cbor2
-from result import Result, Err
+import requests
+from result import Result, Ok, Err
 from typing import Any
-from pydantic import TypeAdapter
 
 from ..shared.utils import api as api_utils
+from ..shared.utils.cbor_stream import ByteStream, CborStreamBody
+from ..shared.utils.local_store import Delta, decode_delta, delta_params
+from ..shared.utils.paging import get_page
 from ..shared.utils.session import ApiSession
 from . import dto
 
 
-def list_submissions(session: ApiSession) -> Result[list[dto.SubmissionResponse], str]:
-    response = session.get("/submission/")
-    result = api_utils.check_response(response)
+def list_submissions(
+    session: ApiSession, limit: int | None = None, offset: int = 0
+) -> Result[list[dto.SubmissionResponse], str]:
+    try:
+        return get_page(
+            lambda paging: api_utils.decode_response(
+                session.get("/submission/", params=paging),
+                list[dto.SubmissionResponse],
+            ),
+            limit,
+            offset,
+        )
+    except requests.RequestException as e:
+        return Err(f"Network error: {e}")
 
-    return result.map(
-        lambda d: TypeAdapter(list[dto.SubmissionResponse]).validate_python(d)
-    )
+
+def list_submission_changes(
+    session: ApiSession, updated_since: str | None = None
+) -> Result[Delta[dto.SubmissionResponse], str]:
+    try:
+        response = session.get("/submission/", params=delta_params(updated_since))
+        return decode_delta(response, dto.SubmissionResponse, updated_since)
+    except requests.RequestException as e:
+        return Err(f"Network error: {e}")
+
+
+def get_submission(
+    session: ApiSession, submission_id: int
+) -> Result[dto.SubmissionResponse | None, str]:
+    """
+    None on 404 or 405: either there is no such submission or the server
+    has no per-id route. The repository tells the two apart.
+    """
+    try:
+        response = session.get(f"/submission/{submission_id}")
+    except requests.RequestException as e:
+        return Err(f"Network error: {e}")
+
+    if response.status_code in [404, 405]:
+        return Ok(None)
+    return api_utils.decode_response(response, dto.SubmissionResponse)
 
 
 def upload_submission(
-    session: ApiSession, project_id: int, title: str, encrypted_content: bytes
+    session: ApiSession,
+    project_id: int,
+    title: str,
+    encrypted_content: bytes | bytearray | ByteStream,
 ) -> Result[int, str]:
+    if not isinstance(encrypted_content, ByteStream):
+        encrypted_content = ByteStream(encrypted_content)
+
     payload: dict[str, Any] = {
         "project_id": project_id,
         "title": title,
         "encrypted_content": encrypted_content,
     }
-    cbor_bytes = cbor2.dumps(payload)
 
+    # Streamed with an exact Content-Length instead of a full-size CBOR copy;
+    # the server stores all of it before answering, so no read timeout
     response = session.post(
         "/submission/",
         headers={"Content-Type": "application/cbor"},
-        data=cbor_bytes,
+        data=CborStreamBody(payload),
+        timeout=session.policy.long_timeout,
+    )
+
+    result = api_utils.check_response(response)
+    return result.map(lambda d: d["id"] if isinstance(d, dict) and "id" in d else 0)
+
+
+def get_upload_capabilities(session: ApiSession) -> Result[dto.UploadCapabilities, str]:
+    """Servers without multipart support answer 404, which means single POST."""
+    response = session.get("/submission/uploads/capabilities")
+    if response.status_code == 404:
+        return Ok(dto.UploadCapabilities())
+
+    return api_utils.decode_response(response, dto.UploadCapabilities)
+
+
+def initiate_upload(
+    session: ApiSession, project_id: int, title: str, size: int, part_size: int
+) -> Result[str, str]:
+    response = session.post(
+        "/submission/uploads",
+        json={
+            "project_id": project_id,
+            "title": title,
+            "size": size,
+            "part_size": part_size,
+        },
+    )
+
+    result = api_utils.check_response(response)
+    return result.map(lambda d: d["upload_id"] if isinstance(d, dict) else "")
+
+
+def get_upload_status(
+    session: ApiSession, upload_id: str
+) -> Result[dto.UploadStatus, str]:
+    response = session.get(f"/submission/uploads/{upload_id}")
+
+    return api_utils.decode_response(response, dto.UploadStatus)
+
+
+def upload_part(
+    session: ApiSession, upload_id: str, number: int, data: bytes, sha256: str
+) -> Result[str, str]:
+    """Upload one part; the server rejects it if `sha256` does not match."""
+    response = session.put(
+        f"/submission/uploads/{upload_id}/parts/{number}",
+        headers={
+            "Content-Type": "application/octet-stream",
+            "X-Content-SHA256": sha256,
+        },
+        data=data,
+    )
+
+    result = api_utils.check_response(response)
+    return result.map(lambda d: d["sha256"] if isinstance(d, dict) else "")
+
+
+def complete_upload(
+    session: ApiSession, upload_id: str, parts: list[dto.UploadPart]
+) -> Result[int, str]:
+    response = session.post(
+        f"/submission/uploads/{upload_id}/complete",
+        json={"parts": [part.model_dump() for part in parts]},
+        timeout=session.policy.long_timeout,
     )
 
     result = api_utils.check_response(response)
@@ -49,12 +157,11 @@ def get_instructor_key(session: ApiSession, project_id: int) -> Result[str, str]
 def get_submission_hash(
     session: ApiSession, submission_id: int
 ) -> Result[dto.SubmissionHashResponse, str]:
-    response = session.get(f"/submission/{submission_id}/hash")
-
-    result = api_utils.check_response(response)
-    return result.map(
-        lambda d: TypeAdapter(dto.SubmissionHashResponse).validate_python(d)
-    )
+    try:
+        response = session.get(f"/submission/{submission_id}/hash")
+        return api_utils.decode_response(response, dto.SubmissionHashResponse)
+    except requests.RequestException as e:
+        return Err(f"Network error: {e}")
 
 
 def download_submission_content(
@@ -67,6 +174,24 @@ def download_submission_content(
     return result.map(lambda d: d if isinstance(d, bytes) else b"")
 
 
+def open_submission_content(
+    session: ApiSession, submission_id: int
+) -> Result[requests.Response, str]:
+    """
+    Start streaming the encrypted content of a submission.
+    The caller reads the body with iter_content and must close the response.
+    """
+    try:
+        response = session.get(f"/submission/{submission_id}/content", stream=True)
+    except requests.RequestException as e:
+        return Err(f"Network error: {e}")
+    if response.status_code in [200, 201]:
+        return Ok(response)
+
+    with response:
+        return Err(api_utils.check_response(response, raw_data=True).unwrap_err())
+
+
 def get_server_public_key(session: ApiSession) -> Result[str, str]:
     try:
         response = session.get("/credentials/public-key")
@@ -79,10 +204,7 @@ def get_server_public_key(session: ApiSession) -> Result[str, str]:
 def get_upload_key(session: ApiSession) -> Result[dto.UploadKeyResponse, str]:
     try:
         response = session.get("/pdf-to-audio/upload-key")
-        result = api_utils.check_response(response)
-        return result.map(
-            lambda data: TypeAdapter(dto.UploadKeyResponse).validate_python(data)
-        )
+        return api_utils.decode_response(response, dto.UploadKeyResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
@@ -92,23 +214,20 @@ def execute_pdf_to_audio(
 ) -> Result[dto.PdfToAudioResponse, str]:
     try:
         payload = {
-            "encrypted_file": req.encrypted_file,
+            "encrypted_file": ByteStream(req.encrypted_file),
             "encrypted_aes_key": req.encrypted_aes_key,
             "speed": req.speed,
         }
-        cbor_bytes = cbor2.dumps(payload)
 
+        # Text to speech over a whole PDF; it is never retried either
         response = session.post(
             "/pdf-to-audio/execute",
-            headers={
-                "Content-Type": "application/cbor",
-                "Content-Length": str(len(cbor_bytes)),
-            },
-            data=cbor_bytes,
+            headers={"Content-Type": "application/cbor"},
+            data=CborStreamBody(payload),
+            timeout=session.policy.long_timeout,
         )
-        result = api_utils.check_response(response, cbor_data=True)
-        return result.map(
-            lambda data: TypeAdapter(dto.PdfToAudioResponse).validate_python(data)
+        return api_utils.decode_response(
+            response, dto.PdfToAudioResponse, cbor_data=True
         )
     except Exception as e:
         return Err(f"Network error: {e}")
@@ -0,0 +1,12 @@
+"""Awaitable versions of service.py, run off the UI event loop."""
+
+from ..shared.utils.background import to_async
+from . import service
+
+upload_submission = to_async(service.upload_submission)
+download_submission = to_async(service.download_submission)
+open_submission = to_async(service.open_submission)
+list_submissions = to_async(service.list_submissions)
+get_submission = to_async(service.get_submission)
+convert_submission_to_audio = to_async(service.convert_submission_to_audio)
+sync_submissions = to_async(service.sync_submissions)
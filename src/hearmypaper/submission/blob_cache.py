@@ -0,0 +1,151 @@
+"""
+Encrypted submission content on disk, keyed by content_hash.
+
+Ciphertext can be fetched and kept without the instructor's private key,
+so it can be downloaded ahead of time; opening it only needs a local
+decrypt. GCM tags are checked at that point, so a corrupt or mismatched
+blob fails the decrypt instead of producing a wrong file.
+"""
+
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from pydantic import BaseModel
+
+DEFAULT_MAX_BYTES = 256 << 20
+SUFFIX = ".bin"
+
+_HASH = re.compile(r"[0-9a-f]{16,128}")
+
+
+class BlobCacheStats(BaseModel):
+    entries: int
+    size: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class BlobCache:
+    """
+    Files under `<directory>/<first two hash chars>/<hash>.bin`. Reads
+    refresh a file's mtime; past `max_bytes` the least recently used files
+    are deleted. The index is rebuilt from the directory on start.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        found = []
+        for path in directory.glob(f"??/*{SUFFIX}"):
+            stat = path.stat()
+            found.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, content_hash, size in sorted(found):
+            self._entries[content_hash] = size
+            self._size += size
+
+    def path(self, content_hash: str) -> Path:
+        if not _HASH.fullmatch(content_hash):
+            raise ValueError(f"Invalid content hash: {content_hash!r}")
+        return self.directory / content_hash[:2] / f"{content_hash}{SUFFIX}"
+
+    def get(self, content_hash: str) -> Path | None:
+        """Path of the cached blob, marked as just used, or None."""
+        path = self.path(content_hash)
+        with self._lock:
+            if content_hash not in self._entries:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(content_hash)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.discard(content_hash)
+            return None
+        return path
+
+    def __contains__(self, content_hash: str) -> bool:
+        with self._lock:
+            return content_hash in self._entries
+
+    def free_bytes(self) -> int:
+        with self._lock:
+            return max(0, self.max_bytes - self._size)
+
+    @contextmanager
+    def writer(self, content_hash: str) -> Iterator[BinaryIO]:
+        """
+        A file to write the blob into. It is added to the cache only if the
+        block completes; otherwise the partial file is removed.
+        """
+        path = self.path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+                size = f.tell()
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+        with self._lock:
+            self._size += size - self._entries.pop(content_hash, 0)
+            self._entries[content_hash] = size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            content_hash, size = self._entries.popitem(last=False)
+            self._size -= size
+            self._evictions += 1
+            self.path(content_hash).unlink(missing_ok=True)
+
+    def discard(self, content_hash: str) -> None:
+        with self._lock:
+            self._size -= self._entries.pop(content_hash, 0)
+        self.path(content_hash).unlink(missing_ok=True)
+
+    def stats(self) -> BlobCacheStats:
+        with self._lock:
+            return BlobCacheStats(
+                entries=len(self._entries),
+                size=self._size,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+_caches: dict[Path, BlobCache] = {}
+_caches_lock = threading.Lock()
+
+
+def for_directory(directory: Path, max_bytes: int | None = None) -> BlobCache:
+    """The cache shared by everything using `directory`; sets its cap if given."""
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = BlobCache(
+                directory, max_bytes or DEFAULT_MAX_BYTES
+            )
+        elif max_bytes is not None:
+            cache.max_bytes = max_bytes
+        return cache
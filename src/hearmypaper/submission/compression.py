@@ -0,0 +1,144 @@
+import lzma
+import struct
+import zlib
+from typing import BinaryIO, Iterable, Iterator, Protocol
+
+NONE = 0
+ZLIB = 1
+LZMA = 2
+
+NAMES = {NONE: "none", ZLIB: "zlib", LZMA: "lzma"}
+
+SAMPLE_SIZE = 64 << 10
+CHUNK_SIZE = 256 << 10
+# Compress only when the sample shrinks to at most this fraction of its size
+MAX_USEFUL_RATIO = 0.9
+# Prefer the slower lzma only when it beats zlib by a clear margin
+LZMA_ADVANTAGE = 0.85
+# Plaintext size written ahead of the compressed stream, so readers can
+# stop inflating data that claims to be smaller than it is
+SIZE_PREFIX = struct.Struct(">Q")
+# Upper bound on inflated output, whatever size a container declares
+MAX_INFLATED_SIZE = 1 << 30
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes, /) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+def choose(sample: bytes) -> int:
+    """
+    Pick a compression algorithm from a sample of the data.
+    Returns NONE when the sample is too small or looks incompressible.
+    """
+    if len(sample) < 512:
+        return NONE
+
+    zlib_ratio = len(zlib.compress(sample, 1)) / len(sample)
+    if zlib_ratio > MAX_USEFUL_RATIO:
+        return NONE
+
+    lzma_ratio = len(lzma.compress(sample, preset=1)) / len(sample)
+    return LZMA if lzma_ratio < zlib_ratio * LZMA_ADVANTAGE else ZLIB
+
+
+def _new_compressor(algorithm: int) -> _Compressor:
+    if algorithm == ZLIB:
+        return zlib.compressobj(6)
+    if algorithm == LZMA:
+        return lzma.LZMACompressor(preset=6)
+    raise ValueError(f"Unsupported compression: {algorithm}")
+
+
+class CompressingReader:
+    """Readable stream yielding `prefix` and then the compressed form of `src`."""
+
+    def __init__(self, src: BinaryIO, algorithm: int, prefix: bytes = b""):
+        self.src = src
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._compressor = _new_compressor(algorithm)
+        self._buffer = bytearray(prefix)
+        self._eof = False
+
+    def read(self, size: int = -1) -> bytes:
+        while (size < 0 or len(self._buffer) < size) and not self._eof:
+            chunk = self.src.read(CHUNK_SIZE)
+            if chunk:
+                self.bytes_in += len(chunk)
+                self._buffer += self._compressor.compress(chunk)
+            else:
+                self._buffer += self._compressor.flush()
+                self._eof = True
+
+        size = len(self._buffer) if size < 0 else size
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.bytes_out += len(data)
+        return data
+
+
+def iter_decompress(
+    chunks: Iterable[bytes], algorithm: int, max_size: int = MAX_INFLATED_SIZE
+) -> Iterator[bytes]:
+    """
+    Inflate compressed chunks, yielding at most CHUNK_SIZE bytes at a time.
+    Raises ValueError as soon as the output would exceed `max_size`, so a
+    decompression bomb never gets further than that.
+    """
+    if algorithm == ZLIB:
+        inflated = _iter_inflate_zlib(chunks, max_size)
+    elif algorithm == LZMA:
+        inflated = _iter_inflate_lzma(chunks, max_size)
+    else:
+        raise ValueError(f"Unsupported compression: {algorithm}")
+
+    total = 0
+    for out in inflated:
+        total += len(out)
+        if total > max_size:
+            raise ValueError("Invalid compressed data: larger than declared")
+        yield out
+
+
+def _iter_inflate_zlib(chunks: Iterable[bytes], max_size: int) -> Iterator[bytes]:
+    decompressor = zlib.decompressobj()
+    total = 0
+    for chunk in chunks:
+        data = chunk
+        while data:
+            # One byte past the limit is enough to tell it was exceeded
+            out = decompressor.decompress(data, min(CHUNK_SIZE, max_size - total + 1))
+            if out:
+                total += len(out)
+                yield out
+            data = decompressor.unconsumed_tail
+
+    # Only what inflate held back for lack of output space, at most a match
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+    if not decompressor.eof or decompressor.unused_data:
+        raise ValueError("Invalid compressed data")
+
+
+def _iter_inflate_lzma(chunks: Iterable[bytes], max_size: int) -> Iterator[bytes]:
+    decompressor = lzma.LZMADecompressor()
+    total = 0
+    for chunk in chunks:
+        if decompressor.eof:
+            raise ValueError("Invalid compressed data")
+        data = chunk
+        while True:
+            out = decompressor.decompress(data, min(CHUNK_SIZE, max_size - total + 1))
+            data = b""
+            if out:
+                total += len(out)
+                yield out
+            if decompressor.needs_input or decompressor.eof:
+                break
+
+    if not decompressor.eof or decompressor.unused_data:
+        raise ValueError("Invalid compressed data")
@@ -1,10 +1,13 @@
 import secrets
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 
+from . import stream_crypto
+from .key_cache import key_cache
+
+Buffer = bytes | bytearray | memoryview
+
 
 def encrypt_file_with_public_key(file_bytes: bytes, public_key_bytes: bytes) -> bytes:
     """
@@ -13,24 +16,12 @@ def encrypt_file_with_public_key(file_bytes: bytes, public_key_bytes: bytes) ->
 
     Format: [iv(12B) | ciphertext(N) | tag(16B)]
     """
-    # Derive AES key from public key
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=public_key_bytes[:16],
-        iterations=65536,
-        backend=default_backend(),
-    )
-    aes_key = kdf.derive(public_key_bytes)
+    # AES key derived from public key (cached)
+    derived = key_cache.get(public_key_bytes)
 
-    # Encrypt with AES-GCM
+    # Encrypt with AES-GCM, output is ciphertext followed by the tag
     iv = secrets.token_bytes(12)
-    encryptor = Cipher(
-        algorithms.AES(aes_key), modes.GCM(iv), backend=default_backend()
-    ).encryptor()
-
-    ciphertext = encryptor.update(file_bytes) + encryptor.finalize()
-    return iv + ciphertext + encryptor.tag
+    return iv + derived.cipher.encrypt(iv, file_bytes, None)
 
 
 def decrypt_file_with_private_key(
@@ -40,8 +31,17 @@ def decrypt_file_with_private_key(
     Decrypt file with instructor's private key using AES-GCM.
     The AES key is derived from the public key.
 
-    Format: [iv(12B) | ciphertext(N) | tag(16B)]
+    Format: [iv(12B) | ciphertext(N) | tag(16B)] or a v2 segmented container
     """
+    if stream_crypto.is_v2(encrypted_bytes):
+        return b"".join(
+            stream_crypto.iter_decrypt_with_private_key(
+                [encrypted_bytes],
+                private_key_bytes,
+                workers=stream_crypto.parallel_workers(len(encrypted_bytes)),
+            )
+        )
+
     if len(encrypted_bytes) < 12 + 16:
         raise ValueError("Invalid encrypted data: too short")
 
@@ -49,26 +49,12 @@ def decrypt_file_with_private_key(
     private_key = Ed25519PrivateKey.from_private_bytes(private_key_bytes)
     public_key_bytes = private_key.public_key().public_bytes_raw()
 
-    # Derive AES key from public key
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=public_key_bytes[:16],
-        iterations=65536,
-        backend=default_backend(),
-    )
-    aes_key = kdf.derive(public_key_bytes)
-
-    # Decrypt with AES-GCM
-    iv = encrypted_bytes[:12]
-    tag = encrypted_bytes[-16:]
-    ciphertext = encrypted_bytes[12:-16]
-
-    decryptor = Cipher(
-        algorithms.AES(aes_key), modes.GCM(iv, tag), backend=default_backend()
-    ).decryptor()
+    # AES key derived from public key (cached)
+    derived = key_cache.get(public_key_bytes)
 
-    return decryptor.update(ciphertext) + decryptor.finalize()
+    # Decrypt with AES-GCM, input is ciphertext followed by the tag
+    view = memoryview(encrypted_bytes)
+    return derived.cipher.decrypt(view[:12], view[12:], None)
 
 
 def decrypt_aes_key_with_private_key(
@@ -83,29 +69,15 @@ def decrypt_aes_key_with_private_key(
     private_key = Ed25519PrivateKey.from_private_bytes(private_key_bytes)
     public_key_bytes = private_key.public_key().public_bytes_raw()
 
-    # Derive decryption key from public key
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=public_key_bytes[:16],
-        iterations=65536,
-        backend=default_backend(),
-    )
-    derived_key = kdf.derive(public_key_bytes)
+    # Decryption key derived from public key (cached)
+    derived = key_cache.get(public_key_bytes)
 
     # Decrypt AES key
     if len(encrypted_key_bytes) < 12 + 16:
         raise ValueError("Invalid encrypted data: too short")
 
     iv = encrypted_key_bytes[:12]
-    tag = encrypted_key_bytes[-16:]
-    ciphertext = encrypted_key_bytes[12:-16]
-
-    decryptor = Cipher(
-        algorithms.AES(derived_key), modes.GCM(iv, tag), backend=default_backend()
-    ).decryptor()
-
-    return decryptor.update(ciphertext) + decryptor.finalize()
+    return derived.cipher.decrypt(iv, encrypted_key_bytes[12:], None)
 
 
 def encrypt_file_with_aes(file_bytes: bytes, aes_key: bytes) -> bytes:
@@ -132,15 +104,105 @@ def decrypt_file_with_aes(encrypted_data_bytes: bytes, aes_key: bytes) -> bytes:
     if len(encrypted_data_bytes) < 12 + 16:
         raise ValueError("Invalid encrypted data: too short")
 
-    iv = encrypted_data_bytes[:12]
-    tag = encrypted_data_bytes[-16:]
-    ciphertext = encrypted_data_bytes[12:-16]
+    view = memoryview(encrypted_data_bytes)
+    iv = bytes(view[:12])
+    tag = bytes(view[-16:])
 
     decryptor = Cipher(
         algorithms.AES(aes_key), modes.GCM(iv, tag), backend=default_backend()
     ).decryptor()
 
-    return decryptor.update(ciphertext) + decryptor.finalize()
+    return decryptor.update(view[12:-16]) + decryptor.finalize()
+
+
+def encrypted_size(plaintext_size: int) -> int:
+    """Size of [iv(12B) | ciphertext(N) | tag(16B)] for N bytes of plaintext."""
+    return 12 + plaintext_size + 16
+
+
+def decrypted_size(encrypted_data: Buffer) -> int:
+    """Plaintext size of a v1 blob or v2 container."""
+    if stream_crypto.is_v2(encrypted_data):
+        return stream_crypto.plaintext_size(encrypted_data)
+    if len(encrypted_data) < 12 + 16:
+        raise ValueError("Invalid encrypted data: too short")
+    return len(encrypted_data) - 12 - 16
+
+
+def encrypt_file_with_aes_into(file_data: Buffer, aes_key: bytes, out: Buffer) -> int:
+    """
+    Encrypt with AES-256-GCM straight into a caller-supplied buffer.
+    `out` must hold encrypted_size(len(file_data)) bytes; the IV and tag are
+    written in place. `file_data` may be the view out[12:12 + N] itself, in
+    which case the plaintext is encrypted in place.
+
+    Format: [iv(12B) | ciphertext(N) | tag(16B)]
+    Returns the number of bytes written.
+    """
+    size = len(file_data)
+    out_view = memoryview(out)
+    if len(out_view) < encrypted_size(size):
+        raise ValueError("Output buffer too small")
+
+    iv = secrets.token_bytes(12)
+    encryptor = Cipher(
+        algorithms.AES(aes_key), modes.GCM(iv), backend=default_backend()
+    ).encryptor()
+
+    # The tag slot gives update_into the slack it may need past the ciphertext
+    encryptor.update_into(file_data, out_view[12:])
+    encryptor.finalize()
+    out_view[:12] = iv
+    out_view[12 + size : 12 + size + 16] = encryptor.tag
+
+    return encrypted_size(size)
+
+
+def decrypt_file_with_aes_into(
+    encrypted_data: Buffer, aes_key: bytes, out: Buffer
+) -> int:
+    """
+    Decrypt AES-256-GCM data straight into a caller-supplied buffer.
+    `out` must hold decrypted_size(encrypted_data) bytes.
+
+    Format: [iv(12B) | ciphertext(N) | tag(16B)]
+    Returns the number of bytes written.
+    """
+    view = memoryview(encrypted_data)
+    if len(view) < 12 + 16:
+        raise ValueError("Invalid encrypted data: too short")
+
+    size = len(view) - 12 - 16
+    out_view = memoryview(out)
+    if len(out_view) < size:
+        raise ValueError("Output buffer too small")
+
+    decryptor = Cipher(
+        algorithms.AES(aes_key),
+        modes.GCM(bytes(view[:12]), bytes(view[-16:])),
+        backend=default_backend(),
+    ).decryptor()
+
+    written = decryptor.update_into(view[12:-16], out_view[:size])
+    decryptor.finalize()
+    return written
+
+
+def decrypt_file_with_private_key_into(
+    encrypted_data: Buffer, private_key_bytes: bytes, out: Buffer
+) -> int:
+    """
+    Decrypt a v1 blob or v2 container with instructor's private key straight
+    into a caller-supplied buffer of decrypted_size(encrypted_data) bytes.
+    Returns the number of bytes written.
+    """
+    private_key = Ed25519PrivateKey.from_private_bytes(private_key_bytes)
+    public_key_bytes = private_key.public_key().public_bytes_raw()
+    aes_key = key_cache.get(public_key_bytes).key
+
+    if stream_crypto.is_v2(encrypted_data):
+        return stream_crypto.decrypt_v2_into(encrypted_data, aes_key, out)
+    return decrypt_file_with_aes_into(encrypted_data, aes_key, out)
 
 
 def encrypt_aes_key_with_server_public_key(
@@ -150,23 +212,9 @@ def encrypt_aes_key_with_server_public_key(
     Encrypt AES key with server's public key and return encrypted bytes.
     Uses the same derivation approach as the server.
     """
-    # Derive encryption key from server's public key
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=server_public_key_bytes[:16],
-        iterations=65536,
-        backend=default_backend(),
-    )
-    derived_key = kdf.derive(server_public_key_bytes)
+    # Encryption key derived from server's public key (cached)
+    derived = key_cache.get(server_public_key_bytes)
 
     # Encrypt AES key
     iv = secrets.token_bytes(12)
-    encryptor = Cipher(
-        algorithms.AES(derived_key), modes.GCM(iv), backend=default_backend()
-    ).encryptor()
-
-    ciphertext = encryptor.update(aes_key) + encryptor.finalize()
-    encrypted_data = iv + ciphertext + encryptor.tag
-
-    return encrypted_data
+    return iv + derived.cipher.encrypt(iv, aes_key, None)
@@ -27,3 +27,37 @@ class PdfToAudioRequest(BaseModel):
 class PdfToAudioResponse(BaseModel):
     encrypted_audio: bytes
     encrypted_audio_key: bytes
+
+
+class UploadCapabilities(BaseModel):
+    """Upload protocols advertised by the server"""
+
+    multipart: bool = False
+    min_part_size: int = 5 << 20
+    max_parts: int = 10000
+
+
+class UploadPart(BaseModel):
+    number: int
+    sha256: str
+
+
+class UploadStatus(BaseModel):
+    upload_id: str
+    parts: list[UploadPart] = []
+
+
+class UploadSummary(BaseModel):
+    """Outcome of an upload, including how well the file compressed"""
+
+    id: int
+    original_size: int
+    stored_size: int
+    compression: str
+    parts: int = 1
+    resumed_parts: int = 0
+
+    @property
+    def ratio(self) -> float:
+        """Stored (encrypted) size relative to the original file size"""
+        return self.stored_size / self.original_size if self.original_size else 1.0
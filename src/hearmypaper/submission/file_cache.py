@@ -0,0 +1,472 @@
+"""
+Decrypted submission files on disk, each distinct content stored once.
+
+The server's content_hash is a hash of the ciphertext, and encryption is
+randomised, so the same file submitted twice has two content hashes.
+Objects are therefore keyed by the SHA-256 of the decrypted content (the
+digest) under `<directory>/objects/<first two digest chars>/`, and each
+content hash is an alias of the digest it decrypted to. Each submission
+id gets a view of its current content hash under
+`<directory>/<first two hash chars>/`, named after the submission. A view
+is a hard link to the object, or a symlink or copy where links are
+unavailable. A content hash already seen under another id is not
+downloaded again; a new content hash is downloaded and decrypted once,
+and stored only if its digest is new.
+
+A SQLite index records the objects, with their size, number of views and
+last access, the digest of each content hash, and the content hash each
+submission id points at. Past the byte budget the least recently opened
+objects are deleted together with their views. A new hash for a
+submission id replaces its view, and objects left without views are
+deleted.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+DEFAULT_MAX_BYTES = 512 << 20
+INDEX_NAME = "index.sqlite3"
+OBJECTS_NAME = "objects"
+# Decrypted content waiting for `add` to file it under its digest
+INCOMING_NAME = "incoming"
+CHUNK_SIZE = 1 << 20
+
+_HASH = re.compile(r"[0-9a-f]{16,128}")
+_VIEW_NAME = re.compile(r"submission_(\d+)_([0-9a-f]{16,128})\.pdf")
+
+# Append only: user_version is the number of migrations applied
+MIGRATIONS = [
+    """
+    CREATE TABLE files (
+        submission_id INTEGER PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX files_accessed_at ON files (accessed_at);
+    """,
+    # files become views: size is what the view itself takes on disk
+    # (0 for links), and the content moves to objects
+    """
+    CREATE TABLE objects (
+        content_hash TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        refs INTEGER NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX objects_accessed_at ON objects (accessed_at);
+    CREATE INDEX files_content_hash ON files (content_hash);
+    INSERT INTO objects
+        SELECT content_hash, MAX(size), COUNT(*), MAX(accessed_at)
+        FROM files GROUP BY content_hash;
+    UPDATE files SET size = 0;
+    """,
+    # objects are keyed by the digest of their decrypted content, which
+    # SQL cannot compute: the index is rebuilt from the views on disk
+    """
+    DROP TABLE objects;
+    CREATE TABLE objects (
+        digest TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        refs INTEGER NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX objects_accessed_at ON objects (accessed_at);
+    CREATE TABLE aliases (
+        content_hash TEXT PRIMARY KEY,
+        digest TEXT NOT NULL
+    );
+    CREATE INDEX aliases_digest ON aliases (digest);
+    DELETE FROM files;
+    """,
+]
+
+
+class FileCacheStats(BaseModel):
+    objects: int
+    views: int
+    # Bytes on disk, and bytes the views would take without deduplication
+    size: int
+    logical_size: int
+    max_bytes: int
+    evicted: int
+    superseded: int
+    # Views served from content stored for another submission id
+    deduplicated: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.logical_size - self.size
+
+
+class FileCache:
+    """
+    Safe to use from the UI thread and the service executor. Views are
+    shared with other submissions of the same content and must be treated
+    as read-only. Files still open elsewhere that cannot be deleted (on
+    Windows) are left for the next eviction.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evicted = 0
+        self.superseded = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+        directory.mkdir(parents=True, exist_ok=True)
+        index = directory / INDEX_NAME
+        try:
+            self._db, version = self._open(index)
+        except sqlite3.DatabaseError:
+            # Start over; the files are indexed again below
+            index.unlink(missing_ok=True)
+            self._db, version = self._open(index)
+        self._adopt_files(rescan=version < len(MIGRATIONS))
+
+    def _open(self, path: Path) -> tuple[sqlite3.Connection, int]:
+        """The connection and the schema version it had before migrating."""
+        db = sqlite3.connect(path, check_same_thread=False)
+        try:
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if version > len(MIGRATIONS):
+                raise sqlite3.DatabaseError(f"Unknown schema version {version}")
+            for number, script in enumerate(MIGRATIONS[version:], version + 1):
+                db.executescript(
+                    f"BEGIN; {script} PRAGMA user_version = {number}; COMMIT;"
+                )
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db, version
+
+    def _adopt_files(self, rescan: bool) -> None:
+        """
+        Index files of the old flat layout and, after a migration or on a
+        new index, every view on disk. A file whose content has no object
+        yet becomes the object; files of hashes an id no longer points at,
+        and objects nothing points at, are deleted.
+        """
+        paths = list(self.directory.glob("submission_*.pdf"))
+        if rescan:
+            paths += self.directory.glob("??/submission_*.pdf")
+
+        found = []
+        for path in paths:
+            match = _VIEW_NAME.fullmatch(path.name)
+            if match is None:
+                continue
+            submission_id, content_hash = int(match[1]), match[2]
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT content_hash FROM files WHERE submission_id = ?",
+                    (submission_id,),
+                ).fetchone()
+            if row is not None and row[0] != content_hash:
+                path.unlink(missing_ok=True)
+                continue
+
+            try:
+                accessed_at = path.lstat().st_mtime
+                # A symlinked view points at the file that holds the content
+                source = path.resolve() if path.is_symlink() else path
+                digest = _digest(source)
+            except OSError:
+                path.unlink(missing_ok=True)
+                continue
+            target = self._object(digest)
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                source.replace(target)
+            elif path.parent == self.directory:
+                path.unlink()
+            found.append((accessed_at, submission_id, content_hash, digest))
+
+        # Oldest first, so the newest hash of an id supersedes the others
+        for accessed_at, submission_id, content_hash, digest in sorted(found):
+            if self._object(digest).exists():
+                with self._lock, self._db:
+                    self._index(submission_id, content_hash, digest, accessed_at)
+
+        if rescan:
+            with self._lock:
+                known = {
+                    digest
+                    for (digest,) in self._db.execute("SELECT digest FROM objects")
+                }
+            for path in self.directory.glob(f"{OBJECTS_NAME}/??/*.pdf"):
+                if path.stem not in known:
+                    path.unlink(missing_ok=True)
+            for path in self.directory.glob(f"{INCOMING_NAME}/*.pdf"):
+                path.unlink(missing_ok=True)
+
+    def _object(self, digest: str) -> Path:
+        if not _HASH.fullmatch(digest):
+            raise ValueError(f"Invalid digest: {digest!r}")
+        return self.directory / OBJECTS_NAME / digest[:2] / f"{digest}.pdf"
+
+    def _view(self, submission_id: int, content_hash: str) -> Path:
+        if not _HASH.fullmatch(content_hash):
+            raise ValueError(f"Invalid content hash: {content_hash!r}")
+        name = f"submission_{submission_id}_{content_hash}.pdf"
+        return self.directory / content_hash[:2] / name
+
+    def _digest_of(self, content_hash: str) -> str | None:
+        row = self._db.execute(
+            "SELECT digest FROM aliases WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def path(self, content_hash: str) -> Path:
+        """
+        A new empty file to write the decrypted content of this hash to for
+        `add`. Each call gets its own name, so two downloads of one hash at
+        once do not write to or move away each other's file.
+        """
+        if not _HASH.fullmatch(content_hash):
+            raise ValueError(f"Invalid content hash: {content_hash!r}")
+        incoming = self.directory / INCOMING_NAME
+        incoming.mkdir(exist_ok=True)
+        fd, name = tempfile.mkstemp(
+            dir=incoming, prefix=f"{content_hash}-", suffix=".pdf"
+        )
+        os.close(fd)
+        return Path(name)
+
+    def get(self, submission_id: int, content_hash: str) -> Path | None:
+        """
+        The view of this submission and hash, marked as just opened, or None.
+        Content already stored for another submission id gets a new view.
+        """
+        view = self._view(submission_id, content_hash)
+        with self._lock, self._db:
+            digest = self._digest_of(content_hash)
+            if digest is None:
+                return None
+            if not self._object(digest).exists():
+                self._drop(digest)
+                return None
+
+            current = self._db.execute(
+                "SELECT content_hash FROM files WHERE submission_id = ?",
+                (submission_id,),
+            ).fetchone()
+            if current is None or current[0] != content_hash:
+                self.deduplicated += 1
+                self._attach(submission_id, content_hash, digest)
+            elif not view.exists():
+                self._attach(submission_id, content_hash, digest)
+            self._db.execute(
+                "UPDATE objects SET accessed_at = ? WHERE digest = ?",
+                (time.time(), digest),
+            )
+            self._evict(keep=digest)
+        return view
+
+    def add(self, submission_id: int, content_hash: str, incoming: Path) -> Path:
+        """
+        Index the content just written to `incoming`, a file from
+        `path(content_hash)`, and return the view of it for `submission_id`.
+        Content already stored, under this hash or another, is not kept
+        twice.
+        """
+        digest = _digest(incoming)
+        with self._lock, self._db:
+            target = self._object(digest)
+            exists = self._db.execute(
+                "SELECT 1 FROM objects WHERE digest = ?", (digest,)
+            ).fetchone()
+            if exists and target.exists():
+                incoming.unlink()
+                self.deduplicated += 1
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                incoming.replace(target)
+            self._index(submission_id, content_hash, digest, time.time())
+            self._evict(keep=digest)
+        return self._view(submission_id, content_hash)
+
+    def _index(
+        self, submission_id: int, content_hash: str, digest: str, accessed_at: float
+    ) -> None:
+        """Record the object of `digest`, its alias, and the view of the id."""
+        size = self._object(digest).stat().st_size
+        self._db.execute(
+            "INSERT INTO objects VALUES (?, ?, 0, ?) ON CONFLICT (digest)"
+            " DO UPDATE SET accessed_at = MAX(accessed_at, excluded.accessed_at)",
+            (digest, size, accessed_at),
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO aliases VALUES (?, ?)", (content_hash, digest)
+        )
+        self._attach(submission_id, content_hash, digest)
+
+    def _attach(self, submission_id: int, content_hash: str, digest: str) -> None:
+        """Point `submission_id` at `content_hash`, (re)creating its view."""
+        row = self._db.execute(
+            "SELECT content_hash FROM files WHERE submission_id = ?",
+            (submission_id,),
+        ).fetchone()
+        if row is None or row[0] != content_hash:
+            # Counted first, so detaching an old hash of the same content
+            # does not drop the object
+            self._db.execute(
+                "UPDATE objects SET refs = refs + 1 WHERE digest = ?", (digest,)
+            )
+            if row is not None:
+                self._detach(submission_id, row[0])
+                self.superseded += 1
+
+        view = self._view(submission_id, content_hash)
+        view.parent.mkdir(exist_ok=True)
+        size = _link(self._object(digest), view)
+        self._db.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+            (submission_id, content_hash, size, time.time()),
+        )
+
+    def _detach(self, submission_id: int, content_hash: str) -> None:
+        try:
+            self._view(submission_id, content_hash).unlink(missing_ok=True)
+        except OSError:
+            pass
+        self._db.execute("DELETE FROM files WHERE submission_id = ?", (submission_id,))
+        digest = self._digest_of(content_hash)
+        self._db.execute(
+            "UPDATE objects SET refs = refs - 1 WHERE digest = ?", (digest,)
+        )
+        refs = self._db.execute(
+            "SELECT refs FROM objects WHERE digest = ?", (digest,)
+        ).fetchone()
+        if digest is not None and refs is not None and refs[0] <= 0:
+            self._drop(digest)
+
+    def _drop(self, digest: str) -> bool:
+        """Delete an object, its aliases and views; False if one is in use."""
+        views = self._db.execute(
+            "SELECT submission_id, content_hash FROM files"
+            " JOIN aliases USING (content_hash) WHERE digest = ?",
+            (digest,),
+        ).fetchall()
+        try:
+            self._object(digest).unlink(missing_ok=True)
+            for submission_id, content_hash in views:
+                self._view(submission_id, content_hash).unlink(missing_ok=True)
+        except OSError:
+            return False
+        self._db.execute(
+            "DELETE FROM files WHERE content_hash IN"
+            " (SELECT content_hash FROM aliases WHERE digest = ?)",
+            (digest,),
+        )
+        self._db.execute("DELETE FROM aliases WHERE digest = ?", (digest,))
+        self._db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+        return True
+
+    def discard(self, content_hash: str) -> None:
+        """Delete the content of a hash and every view of it."""
+        with self._lock, self._db:
+            digest = self._digest_of(content_hash)
+            if digest is not None:
+                self._drop(digest)
+
+    def _size(self) -> int:
+        return self._db.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM objects)"
+            " + (SELECT COALESCE(SUM(size), 0) FROM files)"
+        ).fetchone()[0]
+
+    def _evict(self, keep: str) -> None:
+        excess = self._size() - self.max_bytes
+        if excess <= 0:
+            return
+
+        for digest, size in self._db.execute(
+            "SELECT digest, size FROM objects WHERE digest != ? ORDER BY accessed_at",
+            (keep,),
+        ).fetchall():
+            if excess <= 0:
+                break
+            copies = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM files"
+                " JOIN aliases USING (content_hash) WHERE digest = ?",
+                (digest,),
+            ).fetchone()[0]
+            if self._drop(digest):
+                self.evicted += 1
+                excess -= size + copies
+
+    def size(self) -> int:
+        with self._lock:
+            return self._size()
+
+    def stats(self) -> FileCacheStats:
+        with self._lock:
+            objects, views, logical_size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(refs), 0),"
+                " COALESCE(SUM(size * refs), 0) FROM objects"
+            ).fetchone()
+            size = self._size()
+        return FileCacheStats(
+            objects=objects,
+            views=views,
+            size=size,
+            logical_size=logical_size,
+            max_bytes=self.max_bytes,
+            evicted=self.evicted,
+            superseded=self.superseded,
+            deduplicated=self.deduplicated,
+        )
+
+
+def _digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link(source: Path, view: Path) -> int:
+    """Make `view` show `source`; returns the bytes the view itself takes."""
+    if view.exists() and os.path.samefile(source, view):
+        return 0
+    view.unlink(missing_ok=True)
+    try:
+        os.link(source, view)
+        return 0
+    except OSError:
+        pass
+    try:
+        view.symlink_to(source)
+        return 0
+    except OSError:
+        pass
+    shutil.copyfile(source, view)
+    return view.stat().st_size
+
+
+_caches: dict[Path, FileCache] = {}
+_caches_lock = threading.Lock()
+
+
+def for_directory(directory: Path, max_bytes: int | None = None) -> FileCache:
+    """The cache shared by everything using `directory`; sets its budget if given."""
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = FileCache(
+                directory, max_bytes or DEFAULT_MAX_BYTES
+            )
+        elif max_bytes is not None:
+            cache.max_bytes = max_bytes
+        return cache
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from pydantic import BaseModel
+
+KDF_ITERATIONS = 65536
+DEFAULT_MAX_ENTRIES = 16
+DEFAULT_TTL_SECONDS = 15 * 60
+
+
+def derive_key_from_public_key(public_key_bytes: bytes) -> bytes:
+    """
+    Derive the AES-256 key bound to a public key.
+    Uses the same derivation approach as the server.
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=public_key_bytes[:16],
+        iterations=KDF_ITERATIONS,
+        backend=default_backend(),
+    )
+    return kdf.derive(public_key_bytes)
+
+
+class DerivedKey:
+    """
+    A derived key with its AES-GCM cipher. Immutable, so it stays valid
+    after the cache entry is evicted or cleared.
+    """
+
+    def __init__(self, key: bytes, cipher: AESGCM):
+        self.key = key
+        self.cipher = cipher
+
+
+class _Entry:
+    def __init__(self, key: bytes, expires_at: float):
+        self.derived = DerivedKey(key, AESGCM(key))
+        self.expires_at = expires_at
+
+
+class KeyCacheStats(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class KeyCache:
+    """
+    Size-bounded LRU cache of keys derived from public keys.
+
+    Entries expire `ttl_seconds` after they were derived. Evicting or
+    clearing an entry only drops the cache's reference: the key is not
+    wiped, since Python bytes and OpenSSL cipher contexts cannot be, and
+    callers still using it keep it alive.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, public_key_bytes: bytes) -> DerivedKey:
+        """Return the derived key for `public_key_bytes`, deriving it on a miss."""
+        cache_key = bytes(public_key_bytes)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(cache_key)
+                self._hits += 1
+                return entry.derived
+            if entry is not None:
+                self._evict(cache_key)
+            self._misses += 1
+
+        # PBKDF2 runs outside the lock so other keys are not blocked meanwhile
+        entry = _Entry(derive_key_from_public_key(cache_key), now + self.ttl_seconds)
+
+        with self._lock:
+            if cache_key in self._entries:
+                self._evict(cache_key)
+            self._entries[cache_key] = entry
+            self._purge(now)
+            return entry.derived
+
+    def clear(self) -> None:
+        """Drop every cached key, e.g. on logout."""
+        with self._lock:
+            for cache_key in list(self._entries):
+                self._evict(cache_key)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> KeyCacheStats:
+        with self._lock:
+            return KeyCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
+
+    def _purge(self, now: float) -> None:
+        expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+        for cache_key in expired:
+            self._evict(cache_key)
+
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, cache_key: bytes) -> None:
+        del self._entries[cache_key]
+        self._evictions += 1
+
+
+key_cache = KeyCache()
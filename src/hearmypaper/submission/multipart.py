@@ -0,0 +1,258 @@
+"""
+Resumable multipart upload of an encrypted submission.
+
+The ciphertext is spooled to `<journal_dir>/<key>.bin` next to a JSON
+journal holding the server-side upload id and the SHA-256 of every part the
+server has acknowledged. Encryption is randomised, so a resumed upload
+reuses the spooled ciphertext instead of encrypting again, and only the
+parts the server is missing are sent again.
+
+Each part is sent once per attempt: the session's transport retries
+connection failures and 429/5xx answers, so there is no retry loop here.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import requests
+from pydantic import BaseModel
+from result import Err, Result
+
+from ..shared.utils.session import ApiSession
+from . import api
+from . import dto
+
+PART_SIZE = 8 << 20
+# Smaller files go through the single POST, where a retry is cheap anyway
+MULTIPART_THRESHOLD = 32 << 20
+UPLOAD_WORKERS = 4
+# Journals left longer than this are dropped with their spool; servers
+# expire unfinished uploads well before
+JOURNAL_MAX_AGE = 7 * 24 * 3600
+
+
+class UploadJournal(BaseModel):
+    project_id: int
+    title: str
+    source_path: str
+    source_size: int
+    source_mtime_ns: int
+    part_size: int
+    compression: str = "none"
+    size: int = 0
+    upload_id: str | None = None
+    parts: dict[int, str] = {}
+
+    @property
+    def part_count(self) -> int:
+        return max(1, -(-self.size // self.part_size))
+
+
+def part_size_for(size: int, capabilities: dto.UploadCapabilities) -> int:
+    """Smallest allowed part size that keeps `size` within the part limit."""
+    return max(
+        PART_SIZE, capabilities.min_part_size, -(-size // capabilities.max_parts)
+    )
+
+
+class UploadJob:
+    """A journalled multipart upload of one file to one project."""
+
+    def __init__(self, journal_dir: Path, journal: UploadJournal):
+        key = hashlib.sha256(
+            f"{journal.project_id}\0{journal.title}\0{journal.source_path}".encode()
+        ).hexdigest()[:32]
+        self.journal_path = journal_dir / f"{key}.json"
+        self.spool_path = journal_dir / f"{key}.bin"
+        self.journal = journal
+        self.resumed_parts = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def new(
+        cls,
+        journal_dir: Path,
+        project_id: int,
+        title: str,
+        file_path: str,
+        part_size: int,
+    ) -> "UploadJob":
+        stat = os.stat(file_path)
+        journal = UploadJournal(
+            project_id=project_id,
+            title=title,
+            source_path=os.path.abspath(file_path),
+            source_size=stat.st_size,
+            source_mtime_ns=stat.st_mtime_ns,
+            part_size=part_size,
+        )
+        return cls(journal_dir, journal)
+
+    @classmethod
+    def find(
+        cls, journal_dir: Path, project_id: int, title: str, file_path: str
+    ) -> "UploadJob | None":
+        """
+        Return the job left by an interrupted upload of this file, if any.
+        Journals for a file that changed since are discarded.
+        """
+        job = cls.new(journal_dir, project_id, title, file_path, PART_SIZE)
+        current = job.journal
+        try:
+            journal = UploadJournal.model_validate_json(job.journal_path.read_bytes())
+        except (OSError, ValueError):
+            job.discard()
+            return None
+
+        spooled = (
+            job.spool_path.exists() and job.spool_path.stat().st_size == journal.size
+        )
+        unchanged = (journal.source_size, journal.source_mtime_ns) == (
+            current.source_size,
+            current.source_mtime_ns,
+        )
+        if not (spooled and unchanged and journal.size):
+            job.discard()
+            return None
+
+        job.journal = journal
+        return job
+
+    def spool(self, chunks: Iterable[bytes], compression: str) -> None:
+        """Write the ciphertext to disk and record it in the journal."""
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        # Journal first, so a spool being written is never taken for an orphan
+        self.save()
+        size = 0
+        with open(self.spool_path, "wb") as f:
+            for chunk in chunks:
+                size += f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.journal.size = size
+        self.journal.compression = compression
+        self.save()
+
+    def save(self) -> None:
+        tmp_path = self.journal_path.with_suffix(".json.tmp")
+        tmp_path.write_text(self.journal.model_dump_json())
+        os.replace(tmp_path, self.journal_path)
+
+    def discard(self) -> None:
+        self.journal_path.unlink(missing_ok=True)
+        self.spool_path.unlink(missing_ok=True)
+
+    def read_part(self, number: int) -> bytes:
+        with open(self.spool_path, "rb") as f:
+            f.seek((number - 1) * self.journal.part_size)
+            return f.read(self.journal.part_size)
+
+    def record_part(self, number: int, sha256: str) -> None:
+        with self._lock:
+            self.journal.parts[number] = sha256
+            self.save()
+
+    def missing_parts(self) -> list[int]:
+        return [
+            number
+            for number in range(1, self.journal.part_count + 1)
+            if number not in self.journal.parts
+        ]
+
+
+def upload(
+    session: ApiSession, job: UploadJob, workers: int = UPLOAD_WORKERS
+) -> Result[int, str]:
+    """
+    Send the spooled ciphertext as parts over up to `workers` connections
+    and complete the upload. On failure the journal is kept for a later
+    resume; on success it is removed along with the spooled ciphertext.
+    """
+    journal = job.journal
+
+    if journal.upload_id is not None:
+        status_result = api.get_upload_status(session, journal.upload_id)
+        if status_result.is_ok():
+            # The server is the source of truth for which parts survived
+            confirmed = {
+                part.number: part.sha256 for part in status_result.unwrap().parts
+            }
+            journal.parts = {
+                number: sha256
+                for number, sha256 in journal.parts.items()
+                if confirmed.get(number) == sha256
+            }
+            job.resumed_parts = len(journal.parts)
+        else:
+            journal.upload_id = None
+
+    if journal.upload_id is None:
+        init_result = api.initiate_upload(
+            session, journal.project_id, journal.title, journal.size, journal.part_size
+        )
+        if init_result.is_err():
+            return Err(init_result.unwrap_err())
+        journal.upload_id = init_result.unwrap()
+        journal.parts = {}
+    job.save()
+
+    def send(number: int) -> str | None:
+        data = job.read_part(number)
+        sha256 = hashlib.sha256(data).hexdigest()
+        try:
+            result = api.upload_part(
+                session, journal.upload_id or "", number, data, sha256
+            )
+        except requests.RequestException as e:
+            return f"part {number}: {e}"
+
+        if result.is_ok() and result.unwrap() == sha256:
+            job.record_part(number, sha256)
+            return None
+        error = result.unwrap_err() if result.is_err() else "checksum mismatch"
+        return f"part {number}: {error}"
+
+    missing = job.missing_parts()
+    with ThreadPoolExecutor(max(1, min(workers, len(missing)))) as pool:
+        errors = [e for e in pool.map(send, missing) if e is not None]
+    if errors:
+        return Err(f"Upload interrupted, it will resume on retry ({errors[0]})")
+
+    parts = [
+        dto.UploadPart(number=number, sha256=sha256)
+        for number, sha256 in sorted(journal.parts.items())
+    ]
+    complete_result = api.complete_upload(session, journal.upload_id, parts)
+    if complete_result.is_ok():
+        job.discard()
+        remove_stale(job.journal_path.parent)
+    return complete_result
+
+
+def remove_stale(journal_dir: Path, max_age: float = JOURNAL_MAX_AGE) -> None:
+    """
+    Delete spooled ciphertext whose journal is gone, and journals (with
+    their spool) untouched for `max_age` seconds.
+    """
+    cutoff = time.time() - max_age
+    try:
+        paths = list(journal_dir.iterdir())
+    except FileNotFoundError:
+        return
+
+    for path in paths:
+        try:
+            if path.suffix == ".bin" and not path.with_suffix(".json").exists():
+                path.unlink()
+            elif path.stat().st_mtime < cutoff:
+                path.unlink()
+                if path.suffix == ".json":
+                    path.with_suffix(".bin").unlink(missing_ok=True)
+        except FileNotFoundError:
+            continue
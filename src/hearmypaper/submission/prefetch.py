@@ -0,0 +1,134 @@
+"""
+Background download of submission ciphertext into a BlobCache, so opening
+a listed submission only costs a local decrypt.
+
+Needs no private key: blobs stay encrypted until they are opened, and are
+kept only if their SHA-256 matches the listed content_hash. One thread
+fetches one blob at a time under a bandwidth cap, and never evicts cached
+blobs to make room for speculative ones. A failed blob is counted and
+skipped; the rest are still fetched.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Iterable
+
+from pydantic import BaseModel
+
+from . import api, dto
+from .blob_cache import DEFAULT_MAX_BYTES, BlobCache
+
+CHUNK_SIZE = 64 << 10
+
+
+class PrefetchPolicy(BaseModel):
+    """The [prefetch] config section"""
+
+    enabled: bool = True
+    # Catalog rows, from the top, whose content is fetched
+    rows: int = 20
+    # Bytes per second, 0 is unlimited
+    bandwidth: int = 1 << 20
+    # Size of the ciphertext cache, shared with opened submissions
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+
+class PrefetchStats(BaseModel):
+    fetched: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes: int = 0
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class Prefetcher:
+    """
+    Fetches the content of the submissions given to `start` into `cache`.
+    Starting again cancels the previous run; after `close` nothing starts.
+    Cancelling discards the blob being written.
+    """
+
+    def __init__(self, session, cache: BlobCache, bandwidth: int = 0):
+        self.session = session
+        self.cache = cache
+        self.bandwidth = bandwidth
+        self.stats = PrefetchStats()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    def start(self, submissions: Iterable[dto.SubmissionResponse]) -> None:
+        self._stop.set()
+        if self._closed:
+            return
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(list(submissions), self._stop),
+            name="hmp-blob-prefetch",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self._closed = True
+        self._stop.set()
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(
+        self, submissions: list[dto.SubmissionResponse], stop: threading.Event
+    ) -> None:
+        started = time.monotonic()
+        sent = 0
+        for submission in submissions:
+            if stop.is_set():
+                return
+            if submission.content_hash in self.cache:
+                self.stats.skipped += 1
+                continue
+
+            result = api.open_submission_content(self.session, submission.id)
+            if result.is_err():
+                self.stats.failed += 1
+                continue
+
+            with result.unwrap() as response:
+                size = int(response.headers.get("Content-Length", 0))
+                if size > self.cache.free_bytes():
+                    # Full of blobs that were opened or fetched earlier
+                    return
+                before = sent
+                try:
+                    with self.cache.writer(submission.content_hash) as f:
+                        digest = hashlib.sha256()
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                            digest.update(chunk)
+                            sent += len(chunk)
+                            # Sleep until the average rate is back under the cap
+                            delay = 0.0
+                            if self.bandwidth:
+                                delay = sent / self.bandwidth - (
+                                    time.monotonic() - started
+                                )
+                            if stop.wait(max(delay, 0)):
+                                raise _Cancelled()
+                        # Changed since it was listed, or damaged on the way
+                        if digest.hexdigest() != submission.content_hash:
+                            raise ValueError("content hash mismatch")
+                except _Cancelled:
+                    return
+                except Exception:
+                    self.stats.failed += 1
+                    continue
+
+            self.stats.fetched += 1
+            self.stats.bytes += sent - before
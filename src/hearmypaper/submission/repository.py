@@ -0,0 +1,158 @@
+import threading
+import weakref
+from typing import Iterable
+
+from result import Ok, Err, Result
+
+from ..shared.utils import background
+from ..shared.utils.session import ApiSession
+from ..shared.utils.single_flight import SingleFlight
+from . import api
+from . import dto
+
+
+class SubmissionRepository:
+    """
+    Submissions seen by one session, indexed by id.
+
+    Every list call refreshes the index, so opening a submission picked from
+    the catalog needs no request. Misses use the per-id endpoint. The first
+    404 or 405 is answered from a list call, which also settles whether the
+    server has that endpoint at all; servers without it are only listed
+    from then on. Other errors, such as an expired login or no connection,
+    are returned as they are. Identical concurrent requests are collapsed
+    into one.
+
+    Content hashes confirmed by the server this session are remembered, so
+    a cached file whose hash is confirmed is opened with no request at all.
+    """
+
+    def __init__(self, session: ApiSession):
+        self.session = session
+        self._index: dict[int, dto.SubmissionResponse] = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._verified: dict[int, str] = {}
+        self._revalidating: set[int] = set()
+        # Whether the server has the per-id route; None until a 404 or 405
+        # is told apart from a missing submission
+        self._per_id: bool | None = None
+
+    def list(
+        self, limit: int | None = None, offset: int = 0
+    ) -> Result[list[dto.SubmissionResponse], str]:
+        """A full list replaces the index; a page only adds to it."""
+        result = self._flights.do(
+            ("list", limit, offset),
+            lambda: api.list_submissions(self.session, limit, offset),
+        )
+        if result.is_ok():
+            found = {s.id: s for s in result.unwrap()}
+            with self._lock:
+                if limit is None:
+                    self._index = found
+                else:
+                    self._index.update(found)
+        return result
+
+    def get(self, submission_id: int) -> Result[dto.SubmissionResponse, str]:
+        with self._lock:
+            submission = self._index.get(submission_id)
+        if submission is not None:
+            return Ok(submission)
+
+        if self._per_id is not False:
+            result = self._flights.do(
+                ("get", submission_id),
+                lambda: api.get_submission(self.session, submission_id),
+            )
+            if result.is_err():
+                return Err(result.unwrap_err())
+            submission = result.unwrap()
+            if submission is not None:
+                self._per_id = True
+                with self._lock:
+                    self._index[submission_id] = submission
+                return Ok(submission)
+            if self._per_id:
+                return Err("Submission not found")
+
+        list_result = self.list()
+        if list_result.is_err():
+            return Err(list_result.unwrap_err())
+
+        with self._lock:
+            submission = self._index.get(submission_id)
+            known = next(iter(self._index), None)
+        if self._per_id is None:
+            if submission is not None:
+                # A listed submission the per-id route did not find
+                self._per_id = False
+            elif known is not None:
+                probe = api.get_submission(self.session, known)
+                if probe.is_ok():
+                    self._per_id = probe.unwrap() is not None
+        return Ok(submission) if submission else Err("Submission not found")
+
+    def add(self, submissions: Iterable[dto.SubmissionResponse]) -> None:
+        """Index submissions fetched some other way, e.g. by a store sync."""
+        with self._lock:
+            self._index.update((s.id, s) for s in submissions)
+
+    def known_hash(self, submission_id: int) -> str | None:
+        """The content hash from the last listing, without a request."""
+        with self._lock:
+            submission = self._index.get(submission_id)
+        return submission.content_hash if submission else None
+
+    def is_verified(self, submission_id: int, content_hash: str) -> bool:
+        with self._lock:
+            return self._verified.get(submission_id) == content_hash
+
+    def mark_verified(self, submission_id: int, content_hash: str) -> None:
+        """Record the hash the server just reported, updating the index."""
+        with self._lock:
+            self._verified[submission_id] = content_hash
+            submission = self._index.get(submission_id)
+            if submission is not None and submission.content_hash != content_hash:
+                self._index[submission_id] = submission.model_copy(
+                    update={"content_hash": content_hash}
+                )
+
+    def revalidate(self, submission_id: int) -> None:
+        """Confirm the hash of a submission on the service executor."""
+        with self._lock:
+            if submission_id in self._revalidating:
+                return
+            self._revalidating.add(submission_id)
+        background.executor.submit(self._revalidate, submission_id)
+
+    def _revalidate(self, submission_id: int) -> None:
+        try:
+            result = api.get_submission_hash(self.session, submission_id)
+            # On failure nothing is marked, so the next open tries again
+            if result.is_ok():
+                self.mark_verified(submission_id, result.unwrap().content_hash)
+        finally:
+            with self._lock:
+                self._revalidating.discard(submission_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index.clear()
+            self._verified.clear()
+
+
+_repositories: "weakref.WeakKeyDictionary[ApiSession, SubmissionRepository]" = (
+    weakref.WeakKeyDictionary()
+)
+_repositories_lock = threading.Lock()
+
+
+def for_session(session: ApiSession) -> SubmissionRepository:
+    """The repository shared by everything using `session`."""
+    with _repositories_lock:
+        repository = _repositories.get(session)
+        if repository is None:
+            repository = _repositories[session] = SubmissionRepository(session)
+        return repository
@@ -1,27 +1,115 @@
 import base64
+import os
 import subprocess
 import platform
+import tempfile
+from contextlib import closing
+from functools import partial
 from pathlib import Path
+from typing import Iterable
 from toga.paths import Paths
 from result import Ok, Err, Result
 
+from ..shared.utils import local_store, streams
+from ..shared.utils.cbor_stream import ByteStream
 from . import api
+from . import blob_cache
+from . import compression
 from . import crypto as submission_crypto
+from . import dto
+from . import file_cache
+from . import multipart
+from . import repository
+from . import stream_crypto
 
+DOWNLOAD_CHUNK_SIZE = 256 << 10
+UPLOAD_SPOOL_MEMORY = 8 << 20
 
-def get_submission_path(
-    app_paths: Paths, submission_id: int, content_hash: str
-) -> Path:
-    """Get path for submission file in resources directory."""
-    submissions_dir = app_paths.data / "submissions"
-    submissions_dir.mkdir(parents=True, exist_ok=True)
-    return submissions_dir / f"submission_{submission_id}_{content_hash}.pdf"
+
+def submission_files(
+    app_paths: Paths, max_bytes: int | None = None
+) -> file_cache.FileCache:
+    """
+    Decrypted submissions, stored once per content hash and shown per id,
+    within a byte budget.
+    """
+    return file_cache.for_directory(app_paths.data / "submissions", max_bytes)
+
+
+def ciphertext_cache(
+    app_paths: Paths, max_bytes: int | None = None
+) -> blob_cache.BlobCache:
+    """Prefetched submission content, still encrypted, keyed by content_hash."""
+    return blob_cache.for_directory(app_paths.data / "ciphertext", max_bytes)
+
+
+def decrypt_to_file(
+    chunks: Iterable[bytes],
+    private_key_bytes: bytes,
+    file_path: Path,
+    workers: int = 1,
+) -> None:
+    """
+    Decrypt streamed ciphertext into `file_path`.
+
+    Plaintext goes to a temporary file in the same directory, which only
+    replaces `file_path` once every GCM tag has verified, so a failed or
+    tampered download never leaves a partial file behind.
+    """
+    fd, tmp_name = tempfile.mkstemp(
+        dir=file_path.parent, prefix=f".{file_path.stem}-", suffix=".part"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in stream_crypto.iter_decrypt_with_private_key(
+                chunks, private_key_bytes, workers=workers
+            ):
+                f.write(chunk)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
 
 
 def upload_submission(
-    session, project_id: int, title: str, file_path: str
-) -> Result[int, str]:
+    session,
+    project_id: int,
+    title: str,
+    file_path: str,
+    compress: bool = True,
+    journal_dir: Path | None = None,
+) -> Result[dto.UploadSummary, str]:
+    """
+    Encrypt a file for the project instructor and upload it.
+
+    When `compress` is set, a sample of the file decides whether it is
+    deflated (zlib or lzma) before encryption; incompressible files are
+    uploaded as is.
+
+    With a `journal_dir`, large files use the resumable multipart protocol
+    when the server supports it, and an interrupted upload of the same file
+    picks up where it stopped.
+    """
     try:
+        original_size = os.path.getsize(file_path)
+
+        job = None
+        if journal_dir is not None:
+            multipart.remove_stale(journal_dir)
+        if journal_dir is not None and original_size >= multipart.MULTIPART_THRESHOLD:
+            job = multipart.UploadJob.find(journal_dir, project_id, title, file_path)
+            if job is not None:
+                return _upload_multipart(session, job, original_size)
+
+            capabilities = api.get_upload_capabilities(session)
+            if capabilities.is_ok() and capabilities.unwrap().multipart:
+                part_size = multipart.part_size_for(
+                    stream_crypto.encrypted_size(original_size), capabilities.unwrap()
+                )
+                job = multipart.UploadJob.new(
+                    journal_dir, project_id, title, file_path, part_size
+                )
+
         key_result = api.get_instructor_key(session, project_id)
         if key_result.is_err():
             return Err(f"Failed to get public key: {key_result.unwrap_err()}")
@@ -29,48 +117,165 @@ def upload_submission(
         public_key_b64 = key_result.unwrap()
         public_key = base64.b64decode(public_key_b64)
 
-        with open(file_path, "rb") as f:
-            content = f.read()
+        workers = stream_crypto.parallel_workers(original_size)
+        with (
+            open(file_path, "rb") as f,
+            tempfile.SpooledTemporaryFile(UPLOAD_SPOOL_MEMORY) as spool,
+        ):
+            algorithm = compression.NONE
+            # Readers refuse to inflate more than MAX_INFLATED_SIZE
+            if compress and original_size <= compression.MAX_INFLATED_SIZE:
+                algorithm = compression.choose(f.read(compression.SAMPLE_SIZE))
+                f.seek(0)
+
+            encrypted_chunks = stream_crypto.iter_encrypt_with_public_key(
+                f, public_key, workers=workers, compression_algorithm=algorithm
+            )
+
+            if job is not None:
+                job.spool(encrypted_chunks, compression.NAMES[algorithm])
+                return _upload_multipart(session, job, original_size)
 
-        encrypted = submission_crypto.encrypt_file_with_public_key(content, public_key)
+            if algorithm == compression.NONE:
+                # Size is known up front, so ciphertext is produced while sending
+                encrypted = ByteStream(
+                    encrypted_chunks, stream_crypto.encrypted_size(original_size)
+                )
+            else:
+                # Compressed size is only known afterwards, so spool it first
+                for chunk in encrypted_chunks:
+                    spool.write(chunk)
+                encrypted = ByteStream(spool, spool.tell())
+                spool.seek(0)
+
+            result = api.upload_submission(session, project_id, title, encrypted)
 
-        result = api.upload_submission(session, project_id, title, encrypted)
         if result.is_err():
             return Err(f"Upload failed: {result.unwrap_err()}")
 
-        return Ok(result.unwrap())
+        return Ok(
+            dto.UploadSummary(
+                id=result.unwrap(),
+                original_size=original_size,
+                stored_size=len(encrypted),
+                compression=compression.NAMES[algorithm],
+            )
+        )
     except Exception as e:
         return Err(f"Upload failed: {e}")
 
 
+def _upload_multipart(
+    session, job: multipart.UploadJob, original_size: int
+) -> Result[dto.UploadSummary, str]:
+    result = multipart.upload(session, job)
+    if result.is_err():
+        return Err(f"Upload failed: {result.unwrap_err()}")
+
+    return Ok(
+        dto.UploadSummary(
+            id=result.unwrap(),
+            original_size=original_size,
+            stored_size=job.journal.size,
+            compression=job.journal.compression,
+            parts=job.journal.part_count,
+            resumed_parts=job.resumed_parts,
+        )
+    )
+
+
+def _decrypt_cached_blob(
+    app_paths: Paths, content_hash: str, private_key_bytes: bytes, file_path: Path
+) -> bool:
+    """
+    Decrypt the cached ciphertext of `content_hash` into `file_path`, if
+    there is one. A blob that fails to decrypt is damaged or stale, and is
+    dropped so the caller downloads instead.
+    """
+    cache = ciphertext_cache(app_paths)
+    blob_path = cache.get(content_hash)
+    if blob_path is None:
+        return False
+    try:
+        with open(blob_path, "rb") as f:
+            decrypt_to_file(
+                iter(partial(f.read, DOWNLOAD_CHUNK_SIZE), b""),
+                private_key_bytes,
+                file_path,
+                workers=stream_crypto.parallel_workers(blob_path.stat().st_size),
+            )
+    except Exception:
+        cache.discard(content_hash)
+        return False
+    return True
+
+
 def download_submission(
-    session, app_paths: Paths, submission_id: int, private_key_bytes: bytes
+    session,
+    app_paths: Paths,
+    submission_id: int,
+    private_key_bytes: bytes,
+    content_hash: str | None = None,
 ) -> Result[Path, str]:
+    """
+    Path of the decrypted submission, downloading it if needed.
+
+    With a known `content_hash` (given, or from the last listing) a cached
+    file is returned without any request. Hashes not yet confirmed this
+    session are checked in the background, so a submission changed on the
+    server is served stale at most once. Misses always ask the server.
+    """
     try:
+        submissions = repository.for_session(session)
+        files = submission_files(app_paths)
+
+        known_hash = content_hash or submissions.known_hash(submission_id)
+        if known_hash is not None:
+            cached = files.get(submission_id, known_hash)
+            if cached is not None:
+                if not submissions.is_verified(submission_id, known_hash):
+                    submissions.revalidate(submission_id)
+                return Ok(cached)
+
         hash_result = api.get_submission_hash(session, submission_id)
         if hash_result.is_err():
             return Err(f"Failed to get submission hash: {hash_result.unwrap_err()}")
 
         content_hash = hash_result.unwrap().content_hash
-        file_path = get_submission_path(app_paths, submission_id, content_hash)
-
-        if file_path.exists():
-            return Ok(file_path)
-
-        download_result = api.download_submission_content(session, submission_id)
-        if download_result.is_err():
-            return Err(f"Failed to download: {download_result.unwrap_err()}")
-
-        encrypted_content = download_result.unwrap()
-
-        decrypted_content = submission_crypto.decrypt_file_with_private_key(
-            encrypted_content, private_key_bytes
-        )
-
-        with open(file_path, "wb") as f:
-            f.write(decrypted_content)
-
-        return Ok(file_path)
+        submissions.mark_verified(submission_id, content_hash)
+        cached = files.get(submission_id, content_hash)
+        if cached is not None:
+            return Ok(cached)
+
+        file_path = files.path(content_hash)
+        try:
+            if _decrypt_cached_blob(
+                app_paths, content_hash, private_key_bytes, file_path
+            ):
+                return Ok(files.add(submission_id, content_hash, file_path))
+
+            download_result = api.open_submission_content(session, submission_id)
+            if download_result.is_err():
+                return Err(f"Failed to download: {download_result.unwrap_err()}")
+
+            with (
+                download_result.unwrap() as response,
+                closing(
+                    streams.prefetch(response.iter_content(DOWNLOAD_CHUNK_SIZE))
+                ) as chunks,
+            ):
+                size = int(response.headers.get("Content-Length", 0))
+                decrypt_to_file(
+                    chunks,
+                    private_key_bytes,
+                    file_path,
+                    workers=stream_crypto.parallel_workers(size),
+                )
+
+            return Ok(files.add(submission_id, content_hash, file_path))
+        finally:
+            # Left over only when the content was not added
+            file_path.unlink(missing_ok=True)
 
     except Exception as e:
         return Err(f"Download failed: {e}")
@@ -92,8 +297,6 @@ def open_submission(
         if system == "Darwin":
             subprocess.run(["open", str(file_path)], check=True)
         elif system == "Windows":
-            import os
-
             if hasattr(os, "startfile"):
                 os.startfile(str(file_path))  # type: ignore
             else:
@@ -111,20 +314,48 @@ def open_submission(
         return Err(f"Failed to open submission: {e}")
 
 
-def list_submissions(session) -> Result[list, str]:
-    result = api.list_submissions(session)
+def list_submissions(
+    session, limit: int | None = None, offset: int = 0
+) -> Result[list, str]:
+    result = repository.for_session(session).list(limit, offset)
     if result.is_err():
         return Err(result.unwrap_err())
     return Ok(result.unwrap())
 
 
+def stored_submissions(store: local_store.LocalStore) -> list[dto.SubmissionResponse]:
+    return store.load("submissions", dto.SubmissionResponse)
+
+
+def sync_submissions(
+    session, store: local_store.LocalStore
+) -> Result[list[dto.SubmissionResponse], str]:
+    """
+    Fetch the submissions changed since the last sync and return all of
+    them; they are indexed for get_submission as well.
+    """
+    result = local_store.sync(
+        store,
+        "submissions",
+        dto.SubmissionResponse,
+        lambda since: api.list_submission_changes(session, since),
+    )
+    result.map(repository.for_session(session).add)
+    return result
+
+
+def get_submission(session, submission_id: int) -> Result[dto.SubmissionResponse, str]:
+    """Served from the ids indexed by the last list call when possible."""
+    return repository.for_session(session).get(submission_id)
+
+
 def convert_submission_to_audio(
     session,
     app_paths: Paths,
     submission_id: int,
     private_key_bytes: bytes,
     speed: int = 140,
-) -> Result[bytes, str]:
+) -> Result[bytearray, str]:
     """
     Convert submission PDF to audio using secure encrypted file transfer.
     Downloads submission if needed, then converts to audio.
@@ -137,7 +368,7 @@ def convert_submission_to_audio(
         speed: Speech rate in words per minute (80-300)
 
     Returns:
-        Result containing audio bytes or error message
+        Result containing audio bytes (a bytearray) or error message
     """
     try:
         # First, download/get the submission file
@@ -168,17 +399,22 @@ def convert_submission_to_audio(
             base64.b64decode(upload_key_response.encrypted_aes_key), private_key_bytes
         )
 
+        # Read the PDF straight into the payload slot and encrypt it in place
+        pdf_size = os.path.getsize(pdf_file_path)
+        encrypted_file = bytearray(submission_crypto.encrypted_size(pdf_size))
+        pdf_view = memoryview(encrypted_file)[12 : 12 + pdf_size]
         with open(pdf_file_path, "rb") as f:
-            pdf_bytes = f.read()
+            if f.readinto(pdf_view) != pdf_size:
+                return Err("Failed to read submission file")
 
-        encrypted_file = submission_crypto.encrypt_file_with_aes(pdf_bytes, aes_key)
+        submission_crypto.encrypt_file_with_aes_into(pdf_view, aes_key, encrypted_file)
+        pdf_view.release()
         encrypted_aes_key = submission_crypto.encrypt_aes_key_with_server_public_key(
             aes_key, server_public_key_bytes
         )
 
-        from . import dto
-
-        request = dto.PdfToAudioRequest(
+        # model_construct keeps the buffer as is instead of copying it to bytes
+        request = dto.PdfToAudioRequest.model_construct(
             encrypted_file=encrypted_file,
             encrypted_aes_key=encrypted_aes_key,
             speed=speed,
@@ -196,8 +432,10 @@ def convert_submission_to_audio(
             response.encrypted_audio_key, private_key_bytes
         )
 
-        audio_bytes = submission_crypto.decrypt_file_with_aes(
-            response.encrypted_audio, audio_aes_key
+        audio_size = len(response.encrypted_audio) - submission_crypto.encrypted_size(0)
+        audio_bytes = bytearray(max(audio_size, 0))
+        submission_crypto.decrypt_file_with_aes_into(
+            response.encrypted_audio, audio_aes_key, audio_bytes
         )
 
         return Ok(audio_bytes)
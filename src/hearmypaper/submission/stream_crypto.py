@@ -0,0 +1,429 @@
+"""
+Segmented submission container (v2).
+
+Format: [header(17B) | segment_0 | ... | segment_n]
+Header: magic(4B) | version(1B) | flags(1B) | segment_size(4B) | nonce_prefix(7B)
+Segment: AES-GCM(plaintext(<= segment_size)) | tag(16B)
+
+The low two flag bits name the compression applied to the plaintext stream
+before it was segmented (0 none, 1 zlib, 2 lzma). Bit 2 marks a compressed
+stream preceded by its inflated size (8B, big endian), which readers
+enforce. Other bits are reserved.
+
+Each segment is sealed with nonce = nonce_prefix | counter(4B) | last(1B) and
+the header as associated data (STREAM construction), so reordered, dropped or
+truncated segments fail authentication. Only the final segment may be shorter
+than segment_size.
+
+Legacy v1 blobs ([iv(12B) | ciphertext(N) | tag(16B)]) have no header and are
+recognised by the missing magic.
+"""
+
+import io
+import itertools
+import os
+import secrets
+import struct
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, TypeVar, cast
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from . import compression
+from .key_cache import key_cache
+
+MAGIC = b"HMPS"
+VERSION = 2
+HEADER = struct.Struct(">4sBBI7s")
+HEADER_SIZE = HEADER.size
+NONCE_PREFIX_SIZE = 7
+IV_SIZE = 12
+TAG_SIZE = 16
+SEGMENT_SIZE = 1 << 20
+MAX_SEGMENT_SIZE = 64 << 20
+READ_CHUNK_SIZE = 256 << 10
+MAX_SEGMENTS = 1 << 32
+FLAG_COMPRESSION_MASK = 0x03
+FLAG_SIZE_DECLARED = 0x04
+MAX_WORKERS = 8
+PARALLEL_THRESHOLD = 4 * SEGMENT_SIZE
+
+T = TypeVar("T")
+
+
+def is_v2(data: bytes | bytearray | memoryview) -> bool:
+    """Check whether data starts with a v2 container header."""
+    return bytes(data[:5]) == MAGIC + bytes([VERSION])
+
+
+def encrypted_size(plaintext_size: int, segment_size: int = SEGMENT_SIZE) -> int:
+    """Size of the v2 container produced for `plaintext_size` bytes of input."""
+    segments = max(1, -(-plaintext_size // segment_size))
+    return HEADER_SIZE + plaintext_size + segments * TAG_SIZE
+
+
+def segment_nonce(nonce_prefix: bytes, counter: int, last: bool) -> bytes:
+    if counter >= MAX_SEGMENTS:
+        raise ValueError("Invalid encrypted data: too many segments")
+    return nonce_prefix + counter.to_bytes(4, "big") + (b"\x01" if last else b"\x00")
+
+
+def is_compressed(data: bytes | bytearray | memoryview) -> bool:
+    """Check whether data is a v2 container with a compressed plaintext."""
+    return is_v2(data) and len(data) >= HEADER_SIZE and bool(_parse_header(data)[2])
+
+
+def plaintext_size(data: bytes | bytearray | memoryview) -> int:
+    """
+    Plaintext size of a complete, uncompressed v2 container.
+    The size of a compressed plaintext is only known after inflating it.
+    """
+    _, _, flags, segment_size, _ = _parse_header(data)
+    if flags & FLAG_COMPRESSION_MASK:
+        raise ValueError("Compressed container: size unknown until decrypted")
+    body_size = len(data) - HEADER_SIZE
+    segments = max(1, -(-body_size // (segment_size + TAG_SIZE)))
+    size = body_size - segments * TAG_SIZE
+    if size < 0:
+        raise ValueError("Invalid encrypted data: truncated")
+    return size
+
+
+def parallel_workers(size: int) -> int:
+    """Number of crypto workers worth using for a payload of `size` bytes."""
+    if size < PARALLEL_THRESHOLD:
+        return 1
+    return max(1, min(os.cpu_count() or 1, MAX_WORKERS))
+
+
+def iter_encrypt_with_public_key(
+    src: BinaryIO,
+    public_key_bytes: bytes,
+    segment_size: int = SEGMENT_SIZE,
+    workers: int = 1,
+    compression_algorithm: int = compression.NONE,
+) -> Iterator[bytes]:
+    """
+    Encrypt a readable binary stream into the v2 container.
+    Yields the header followed by one sealed segment at a time.
+
+    With `workers` > 1 segments are sealed concurrently on a thread pool;
+    the output is identical in format to the sequential path. A non-zero
+    `compression_algorithm` deflates the stream before it is segmented and
+    is recorded in the header flags.
+    """
+    if not 0 < segment_size <= MAX_SEGMENT_SIZE:
+        raise ValueError(f"Invalid segment size: {segment_size}")
+    if compression_algorithm not in compression.NAMES:
+        raise ValueError(f"Unsupported compression: {compression_algorithm}")
+
+    flags = compression_algorithm
+    if compression_algorithm != compression.NONE:
+        start = src.tell()
+        size = src.seek(0, io.SEEK_END) - start
+        src.seek(start)
+        if size > compression.MAX_INFLATED_SIZE:
+            # Readers would refuse to inflate it
+            raise ValueError(f"Too large to compress: {size}")
+        src = cast(
+            BinaryIO,
+            compression.CompressingReader(
+                src, compression_algorithm, compression.SIZE_PREFIX.pack(size)
+            ),
+        )
+        flags |= FLAG_SIZE_DECLARED
+
+    cipher = key_cache.get(public_key_bytes).cipher
+    nonce_prefix = secrets.token_bytes(NONCE_PREFIX_SIZE)
+    header = HEADER.pack(MAGIC, VERSION, flags, segment_size, nonce_prefix)
+    yield header
+
+    def seal(item: tuple[int, bytes, bool]) -> bytes:
+        counter, segment, last = item
+        nonce = segment_nonce(nonce_prefix, counter, last)
+        return cipher.encrypt(nonce, segment, header)
+
+    yield from ordered_map(seal, _split_plaintext(src, segment_size), workers)
+
+
+def iter_decrypt_with_private_key(
+    chunks: Iterable[bytes], private_key_bytes: bytes, workers: int = 1
+) -> Iterator[bytes]:
+    """
+    Decrypt a v2 container or a legacy v1 blob arriving as arbitrary chunks.
+
+    v2 plaintext is yielded one authenticated segment at a time, opening up
+    to `workers` segments concurrently. v1 plaintext is a single GCM stream,
+    always decrypted sequentially and only authenticated once the final tag
+    has been checked, so callers must not trust the output until the
+    iterator is exhausted.
+    """
+    private_key = Ed25519PrivateKey.from_private_bytes(private_key_bytes)
+    public_key_bytes = private_key.public_key().public_bytes_raw()
+    derived = key_cache.get(public_key_bytes)
+
+    chunk_iter = iter(chunks)
+    buffer = bytearray()
+    for chunk in chunk_iter:
+        buffer += chunk
+        if len(buffer) >= HEADER_SIZE:
+            break
+
+    if is_v2(buffer) and len(buffer) >= HEADER_SIZE:
+        yield from _iter_decrypt_v2(buffer, chunk_iter, derived.cipher, workers)
+    else:
+        yield from _iter_decrypt_v1(buffer, chunk_iter, derived.key)
+
+
+def ordered_map(
+    fn: Callable[[T], bytes], items: Iterable[T], workers: int
+) -> Iterator[bytes]:
+    """
+    Apply `fn` to `items` on up to `workers` threads, yielding in input order.
+    At most two results per worker are kept in flight to bound memory use.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="hmp-crypto") as pool:
+        pending: deque[Future[bytes]] = deque()
+        try:
+            for item in items:
+                pending.append(pool.submit(fn, item))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def encrypt_stream_with_public_key(
+    src: BinaryIO,
+    dst: BinaryIO,
+    public_key_bytes: bytes,
+    segment_size: int = SEGMENT_SIZE,
+    workers: int = 1,
+) -> int:
+    """Encrypt `src` into `dst` as a v2 container, returning bytes written."""
+    written = 0
+    for chunk in iter_encrypt_with_public_key(
+        src, public_key_bytes, segment_size, workers
+    ):
+        dst.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def decrypt_stream_with_private_key(
+    src: BinaryIO, dst: BinaryIO, private_key_bytes: bytes, workers: int = 1
+) -> int:
+    """Decrypt a v1 or v2 blob from `src` into `dst`, returning bytes written."""
+    chunks = iter(lambda: src.read(READ_CHUNK_SIZE), b"")
+    written = 0
+    for chunk in iter_decrypt_with_private_key(chunks, private_key_bytes, workers):
+        dst.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def decrypt_v2_into(
+    data: bytes | bytearray | memoryview,
+    aes_key: bytes,
+    out: bytes | bytearray | memoryview,
+) -> int:
+    """
+    Decrypt a complete v2 container into a caller-supplied buffer of
+    plaintext_size(data) bytes without intermediate copies.
+    Returns the number of bytes written.
+    """
+    header, _, _, segment_size, nonce_prefix = _parse_header(data)
+    size = plaintext_size(data)  # rejects compressed containers
+    view = memoryview(data)[HEADER_SIZE:]
+    out_view = memoryview(out)
+    if len(out_view) < size:
+        raise ValueError("Output buffer too small")
+
+    sealed_size = segment_size + TAG_SIZE
+    written = 0
+    for counter, start in enumerate(range(0, max(len(view), 1), sealed_size)):
+        sealed = view[start : start + sealed_size]
+        last = start + sealed_size >= len(view)
+        segment_end = len(sealed) - TAG_SIZE
+        if segment_end < 0:
+            raise ValueError("Invalid encrypted data: truncated")
+
+        decryptor = Cipher(
+            algorithms.AES(aes_key),
+            modes.GCM(
+                segment_nonce(nonce_prefix, counter, last),
+                bytes(sealed[segment_end:]),
+            ),
+        ).decryptor()
+        decryptor.authenticate_additional_data(header)
+        written += decryptor.update_into(
+            sealed[:segment_end], out_view[written : written + segment_end]
+        )
+        decryptor.finalize()
+
+    return written
+
+
+def read_exact(src: BinaryIO, size: int) -> bytes:
+    """Read up to `size` bytes, only returning less at end of stream."""
+    data = src.read(size)
+    if len(data) == size or not data:
+        return data
+
+    parts = [data]
+    remaining = size - len(data)
+    while remaining:
+        part = src.read(remaining)
+        if not part:
+            break
+        parts.append(part)
+        remaining -= len(part)
+    return b"".join(parts)
+
+
+def _parse_header(
+    data: bytes | bytearray | memoryview,
+) -> tuple[bytes, int, int, int, bytes]:
+    if len(data) < HEADER_SIZE or not is_v2(data):
+        raise ValueError("Invalid encrypted data: missing v2 header")
+
+    header = bytes(data[:HEADER_SIZE])
+    _, version, flags, segment_size, nonce_prefix = HEADER.unpack(header)
+    algorithm = flags & FLAG_COMPRESSION_MASK
+    if (
+        flags & ~(FLAG_COMPRESSION_MASK | FLAG_SIZE_DECLARED)
+        or algorithm not in compression.NAMES
+        or (flags & FLAG_SIZE_DECLARED and algorithm == compression.NONE)
+    ):
+        raise ValueError(f"Unsupported container flags: {flags:#x}")
+    if not 0 < segment_size <= MAX_SEGMENT_SIZE:
+        raise ValueError(f"Invalid segment size: {segment_size}")
+    return header, version, flags, segment_size, nonce_prefix
+
+
+def _split_plaintext(
+    src: BinaryIO, segment_size: int
+) -> Iterator[tuple[int, bytes, bool]]:
+    counter = 0
+    segment = read_exact(src, segment_size)
+    while True:
+        # Read one segment ahead to know whether the current one is the last
+        next_segment = read_exact(src, segment_size) if segment else b""
+        last = not next_segment
+        yield counter, segment, last
+
+        if last:
+            return
+        segment = next_segment
+        counter += 1
+
+
+def _split_sealed(
+    buffer: bytearray, chunks: Iterator[bytes], sealed_size: int
+) -> Iterator[tuple[int, bytes, bool]]:
+    counter = 0
+    for chunk in itertools.chain([b""], chunks):
+        buffer += chunk
+        offset = 0
+        # A full segment is only known not to be the last one once more data follows
+        while len(buffer) - offset > sealed_size:
+            end = offset + sealed_size
+            yield counter, bytes(memoryview(buffer)[offset:end]), False
+            offset = end
+            counter += 1
+        del buffer[:offset]
+
+    if len(buffer) < TAG_SIZE:
+        raise ValueError("Invalid encrypted data: truncated")
+
+    yield counter, bytes(buffer), True
+
+
+def _iter_decrypt_v2(
+    buffer: bytearray, chunks: Iterator[bytes], cipher: AESGCM, workers: int
+) -> Iterator[bytes]:
+    header, _, flags, segment_size, nonce_prefix = _parse_header(buffer)
+    del buffer[:HEADER_SIZE]
+
+    def open_segment(item: tuple[int, bytes, bool]) -> bytes:
+        counter, sealed, last = item
+        nonce = segment_nonce(nonce_prefix, counter, last)
+        return cipher.decrypt(nonce, sealed, header)
+
+    sealed_segments = _split_sealed(buffer, chunks, segment_size + TAG_SIZE)
+    segments = ordered_map(open_segment, sealed_segments, workers)
+
+    algorithm = flags & FLAG_COMPRESSION_MASK
+    if algorithm == compression.NONE:
+        yield from segments
+    elif flags & FLAG_SIZE_DECLARED:
+        yield from _iter_inflate_declared(segments, algorithm)
+    else:
+        # Written before sizes were declared: only the global cap applies
+        yield from compression.iter_decompress(segments, algorithm)
+
+
+def _iter_inflate_declared(
+    segments: Iterator[bytes], algorithm: int
+) -> Iterator[bytes]:
+    prefix = bytearray()
+    for segment in segments:
+        prefix += segment
+        if len(prefix) >= compression.SIZE_PREFIX.size:
+            break
+    if len(prefix) < compression.SIZE_PREFIX.size:
+        raise ValueError("Invalid encrypted data: truncated")
+
+    (declared,) = compression.SIZE_PREFIX.unpack_from(prefix)
+    if declared > compression.MAX_INFLATED_SIZE:
+        raise ValueError(f"Declared plaintext size too large: {declared}")
+
+    rest = bytes(prefix[compression.SIZE_PREFIX.size :])
+    inflated = 0
+    for out in compression.iter_decompress(
+        itertools.chain([rest], segments), algorithm, declared
+    ):
+        inflated += len(out)
+        yield out
+    if inflated != declared:
+        raise ValueError("Invalid compressed data: smaller than declared")
+
+
+def _iter_decrypt_v1(
+    buffer: bytearray, chunks: Iterator[bytes], aes_key: bytes
+) -> Iterator[bytes]:
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= IV_SIZE:
+            break
+
+    if len(buffer) < IV_SIZE:
+        raise ValueError("Invalid encrypted data: too short")
+
+    decryptor = Cipher(
+        algorithms.AES(aes_key), modes.GCM(bytes(buffer[:IV_SIZE]))
+    ).decryptor()
+    del buffer[:IV_SIZE]
+
+    # The trailing tag is held back until the input is exhausted
+    for chunk in itertools.chain([b""], chunks):
+        buffer += chunk
+        if len(buffer) > TAG_SIZE:
+            yield decryptor.update(memoryview(buffer)[:-TAG_SIZE])
+            del buffer[:-TAG_SIZE]
+
+    if len(buffer) < TAG_SIZE:
+        raise ValueError("Invalid encrypted data: too short")
+
+    yield decryptor.update(memoryview(buffer)[:-TAG_SIZE])
+    decryptor.finalize_with_tag(bytes(buffer[-TAG_SIZE:]))
@@ -1,22 +1,44 @@
+from result import Ok
+
 from ...shared.ui.catalog_screen import catalog_screen
-from .. import service
+from .. import async_service, service
+from ..prefetch import Prefetcher, PrefetchPolicy
 
 
-def submissions_catalog_screen(navigator):
-    data = (
-        service.list_submissions(navigator.session)
-        .map(
-            lambda submissions: [submission.model_dump() for submission in submissions]
-        )
-        .map_err(lambda err: f"Error loading submissions: {err}")
+async def submissions_catalog_screen(navigator):
+    policy = PrefetchPolicy.model_validate(navigator.prefetch_config)
+    prefetcher = Prefetcher(
+        navigator.session,
+        service.ciphertext_cache(navigator.app_paths, policy.max_bytes),
+        policy.bandwidth,
     )
+    navigator.on_leave(prefetcher.close)
+
+    async def refresh():
+        result = await async_service.sync_submissions(
+            navigator.session, navigator.store
+        )
+        if policy.enabled:
+            # Rows opened next are most likely among those shown first
+            submissions = result.unwrap_or(service.stored_submissions(navigator.store))
+            prefetcher.start(submissions[: policy.rows])
+
+        return result.map(
+            lambda submissions: [submission.model_dump() for submission in submissions]
+        ).map_err(lambda err: f"Error syncing submissions: {err}")
+
+    stored = [
+        submission.model_dump()
+        for submission in service.stored_submissions(navigator.store)
+    ]
 
     return catalog_screen(
         title="Submissions",
         headings=["ID", "Title", "Student Name", "Instructor Name", "Submitted At"],
-        data=data,
+        data=Ok(stored),
         on_back=lambda w: navigator.navigate("resource_catalog"),
         actions=[],
+        refresh=refresh,
         on_activate=lambda row: navigator.navigate(
             "submission_info", submission_id=row.id
         ),
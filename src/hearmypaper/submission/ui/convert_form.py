@@ -3,8 +3,8 @@ import asyncio
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 
-from ..service import convert_submission_to_audio, download_submission
-from ...auth.utils import get_user_credentials
+from ..async_service import convert_submission_to_audio, download_submission
+from ...auth.async_service import get_user_credentials
 
 
 def submission_convert_form_screen(navigator, submission_id: int):
@@ -72,8 +72,11 @@ def submission_convert_form_screen(navigator, submission_id: int):
             navigator.navigate("login")
             return
 
-        if not token_password_input.value:
-            await show_error("Please enter token password")
+        user_private_key_bytes = navigator.agent.private_key()
+
+        if user_private_key_bytes is None and not token_password_input.value:
+            await show_error("Session locked. Please enter token password")
+            navigator.navigate("submission_convert_form", submission_id=submission_id)
             return
 
         if not output_file_input.value:
@@ -81,13 +84,15 @@ def submission_convert_form_screen(navigator, submission_id: int):
             return
 
         try:
-            # Get user credentials
-            _, user_private_key_bytes = get_user_credentials(
-                navigator.credentials_path, token_password_input.value
-            )
+            if user_private_key_bytes is None:
+                # Get user credentials and keep them for the session
+                user_id, user_private_key_bytes = await get_user_credentials(
+                    navigator.credentials_path, token_password_input.value
+                )
+                navigator.agent.unlock(user_id, user_private_key_bytes)
 
             # First verify submission file exists and hash matches
-            file_result = download_submission(
+            file_result = await download_submission(
                 navigator.session,
                 navigator.app_paths,
                 submission_id,
@@ -105,7 +110,7 @@ def submission_convert_form_screen(navigator, submission_id: int):
                 return
 
             # Convert PDF to audio
-            result = convert_submission_to_audio(
+            result = await convert_submission_to_audio(
                 navigator.session,
                 navigator.app_paths,
                 submission_id,
@@ -131,10 +136,11 @@ def submission_convert_form_screen(navigator, submission_id: int):
     def on_cancel(widget):
         navigator.navigate("submission_info", submission_id=submission_id)
 
+    if not navigator.agent.is_unlocked:
+        children.extend([toga.Label("Token Password:"), token_password_input])
+
     children.extend(
         [
-            toga.Label("Token Password:"),
-            token_password_input,
             toga.Label("Speech Rate:"),
             toga.Box(
                 children=[
@@ -2,8 +2,8 @@ import asyncio
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
-from ..service import download_submission
-from ...auth.utils import get_user_credentials
+from ..async_service import download_submission
+from ...auth.async_service import get_user_credentials
 
 
 def submission_download_form_screen(navigator, submission_id):
@@ -57,11 +57,11 @@ def submission_download_form_screen(navigator, submission_id):
 
         try:
             # Get private key from credentials
-            _, private_key_bytes = get_user_credentials(
+            _, private_key_bytes = await get_user_credentials(
                 token_path_input.value, token_password_input.value
             )
 
-            result = download_submission(
+            result = await download_submission(
                 navigator.session, submission_id, private_key_bytes
             )
 
@@ -1,21 +1,11 @@
-from result import Ok
 from ...shared.ui.item_info_screen import item_info_screen
-from .. import service
+from .. import async_service
 
 
-def submission_info_screen(navigator, submission_id):
-    result = service.list_submissions(navigator.session)
-
-    if result.is_err():
-        data = result
-    else:
-        submissions = result.unwrap()
-        submission = next((s for s in submissions if s.id == submission_id), None)
-
-        if submission:
-            data = Ok(submission.model_dump())
-        else:
-            data = result.map_err(lambda _: "Submission not found")
+async def submission_info_screen(navigator, submission_id):
+    data = (await async_service.get_submission(navigator.session, submission_id)).map(
+        lambda submission: submission.model_dump()
+    )
 
     def on_open():
         navigator.navigate("submission_open_form", submission_id=submission_id)
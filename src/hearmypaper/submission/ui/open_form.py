@@ -3,8 +3,8 @@ import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 
-from ...auth.utils import get_user_credentials
-from .. import service
+from ...auth.async_service import get_user_credentials
+from .. import async_service
 
 
 def submission_open_form_screen(navigator, submission_id):
@@ -40,17 +40,22 @@ def submission_open_form_screen(navigator, submission_id):
             navigator.navigate("login")
             return
 
-        if not token_password_input.value:
-            await show_error("Please enter token password")
+        private_key_bytes = navigator.agent.private_key()
+
+        if private_key_bytes is None and not token_password_input.value:
+            await show_error("Session locked. Please enter token password")
+            navigator.navigate("submission_open_form", submission_id=submission_id)
             return
 
         try:
-            # Get private key from credentials
-            _, private_key_bytes = get_user_credentials(
-                navigator.credentials_path, token_password_input.value
-            )
+            if private_key_bytes is None:
+                # Get private key from credentials and keep it for the session
+                user_id, private_key_bytes = await get_user_credentials(
+                    navigator.credentials_path, token_password_input.value
+                )
+                navigator.agent.unlock(user_id, private_key_bytes)
 
-            result = service.open_submission(
+            result = await async_service.open_submission(
                 navigator.session, navigator.app_paths, submission_id, private_key_bytes
             )
 
@@ -65,10 +70,11 @@ def submission_open_form_screen(navigator, submission_id):
     def on_cancel(widget):
         navigator.navigate("submission_info", submission_id=submission_id)
 
+    if not navigator.agent.is_unlocked:
+        children.extend([toga.Label("Token Password:"), token_password_input])
+
     children.extend(
         [
-            toga.Label("Token Password:"),
-            token_password_input,
             toga.Box(
                 children=[
                     toga.Button(
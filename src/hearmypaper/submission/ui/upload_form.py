@@ -3,7 +3,7 @@ import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 
-from .. import service
+from .. import async_service
 
 
 def submission_upload_form_screen(navigator, project_id: int):
@@ -56,12 +56,28 @@ def submission_upload_form_screen(navigator, project_id: int):
             await show_error("Please choose a file to submit!")
             return
 
-        result = service.upload_submission(
-            navigator.session, project_id, title_input.value, file_input.value
+        result = await async_service.upload_submission(
+            navigator.session,
+            project_id,
+            title_input.value,
+            file_input.value,
+            journal_dir=navigator.app_paths.data / "uploads",
         )
 
         if result.is_ok():
-            await show_info("Submission uploaded successfully!")
+            summary = result.unwrap()
+            message = "Submission uploaded successfully!"
+            if summary.resumed_parts:
+                message += (
+                    f"\nResumed an interrupted upload "
+                    f"({summary.resumed_parts} of {summary.parts} parts were kept)."
+                )
+            if summary.compression != "none":
+                message += (
+                    f"\nCompressed with {summary.compression} to "
+                    f"{summary.ratio:.0%} of the original size."
+                )
+            await show_info(message)
             navigator.navigate("submissions_catalog")
         else:
             await show_error(result.unwrap_err())
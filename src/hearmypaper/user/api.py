@@ -1,6 +1,5 @@
 from ..shared.utils.session import ApiSession
 from result import Result, Err
-from pydantic import TypeAdapter
 
 from .dto import (
     UserCreateRequest,
@@ -9,25 +8,40 @@ from .dto import (
     UserResponse,
     UserListResponse,
 )
-from ..shared.utils.api import check_response
+from ..shared.utils.api import decode_response
+from ..shared.utils.local_store import Delta, decode_delta, delta_params
+from ..shared.utils.paging import get_page
 
 
-def get_users(session: ApiSession) -> Result[list[UserListResponse], str]:
+def get_users(
+    session: ApiSession, limit: int | None = None, offset: int = 0
+) -> Result[list[UserListResponse], str]:
     try:
-        r = session.get("/auth/users")
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(list[UserListResponse]).validate_python(data)
+        return get_page(
+            lambda paging: decode_response(
+                session.get("/auth/users", params=paging), list[UserListResponse]
+            ),
+            limit,
+            offset,
         )
     except Exception as e:
         return Err(f"Network error: {e}")
 
 
+def get_user_changes(
+    session: ApiSession, updated_since: str | None = None
+) -> Result[Delta[UserListResponse], str]:
+    try:
+        r = session.get("/auth/users", params=delta_params(updated_since))
+        return decode_delta(r, UserListResponse, updated_since)
+    except Exception as e:
+        return Err(f"Network error: {e}")
+
+
 def get_user(session: ApiSession, user_id: int) -> Result[UserResponse, str]:
     try:
         r = session.get(f"/auth/users/{user_id}")
-        result = check_response(r)
-        return result.map(lambda data: TypeAdapter(UserResponse).validate_python(data))
+        return decode_response(r, UserResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
@@ -37,10 +51,7 @@ def create_user(
 ) -> Result[UserCreateResponse, str]:
     try:
         r = session.post("/auth/users", json=req.model_dump())
-        result = check_response(r)
-        return result.map(
-            lambda data: TypeAdapter(UserCreateResponse).validate_python(data)
-        )
+        return decode_response(r, UserCreateResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
 
@@ -50,7 +61,6 @@ def update_user(
 ) -> Result[UserResponse, str]:
     try:
         r = session.put(f"/auth/users/{user_id}", json=req.model_dump())
-        result = check_response(r)
-        return result.map(lambda data: TypeAdapter(UserResponse).validate_python(data))
+        return decode_response(r, UserResponse)
     except Exception as e:
         return Err(f"Network error: {e}")
@@ -0,0 +1,9 @@
+"""Awaitable versions of service.py, run off the UI event loop."""
+
+from ..shared.utils.background import to_async
+from . import service
+
+get_user = to_async(service.get_user)
+get_users = to_async(service.get_users)
+update_user = to_async(service.update_user)
+sync_users = to_async(service.sync_users)
@@ -1,3 +1,5 @@
+from ..shared.utils import local_store
+from ..shared.utils.local_store import LocalStore
 from ..shared.utils.session import ApiSession
 from result import Result, Err
 
@@ -9,8 +11,26 @@ def get_user(session: ApiSession, user_id: int) -> Result[UserView, str]:
     return api.get_user(session, user_id).map(UserView.from_response)
 
 
-def get_users(session: ApiSession) -> Result[list[UserListResponse], str]:
-    return api.get_users(session)
+def get_users(
+    session: ApiSession, limit: int | None = None, offset: int = 0
+) -> Result[list[UserListResponse], str]:
+    return api.get_users(session, limit, offset)
+
+
+def stored_users(store: LocalStore) -> list[UserListResponse]:
+    return store.load("users", UserListResponse)
+
+
+def sync_users(
+    session: ApiSession, store: LocalStore
+) -> Result[list[UserListResponse], str]:
+    """Fetch the users changed since the last sync and return all of them."""
+    return local_store.sync(
+        store,
+        "users",
+        UserListResponse,
+        lambda since: api.get_user_changes(session, since),
+    )
 
 
 def update_user(
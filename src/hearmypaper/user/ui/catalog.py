@@ -1,25 +1,32 @@
+from result import Ok
+
 from hearmypaper.shared.ui.catalog_screen import catalog_screen
 
-from ..service import get_users
+from ..async_service import sync_users
+from ..service import stored_users
 
 
-def users_catalog_screen(navigator):
+async def users_catalog_screen(navigator):
     def on_row_activate(row):
         navigator.navigate("user_info", row.id)
 
-    data = (
-        get_users(navigator.session)
-        .map(lambda users: [user.model_dump() for user in users])
-        .map_err(lambda err: f"Error loading users: {err}")
-    )
+    async def refresh():
+        return (
+            (await sync_users(navigator.session, navigator.store))
+            .map(lambda users: [user.model_dump() for user in users])
+            .map_err(lambda err: f"Error syncing users: {err}")
+        )
+
+    stored = [user.model_dump() for user in stored_users(navigator.store)]
 
     actions = [("Create User", lambda w: navigator.navigate("user_create_form"))]
 
     return catalog_screen(
         title="Users",
         headings=["Full name"],
-        data=data,
+        data=Ok(stored),
         on_back=lambda w: navigator.navigate("resource_catalog"),
         actions=actions,
         on_activate=on_row_activate,
+        refresh=refresh,
     )
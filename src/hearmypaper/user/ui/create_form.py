@@ -1,7 +1,7 @@
 import toga
 from datetime import datetime, timedelta
 
-from ...auth.service import create_user_with_credentials
+from ...auth.async_service import create_user_with_credentials
 from ...auth.enums import AccessLevel
 from ...user.dto import UserCreateDto
 from ...shared.ui.components.datetime_picker import DateTimePicker
@@ -110,7 +110,7 @@ def user_create_form_screen(navigator):
                 credentials_password=password_input.value,
             )
 
-            result = create_user_with_credentials(navigator.session, user_dto)
+            result = await create_user_with_credentials(navigator.session, user_dto)
 
             if result.is_err():
                 dialog = toga.ErrorDialog(
@@ -1,9 +1,11 @@
 from hearmypaper.shared.ui.item_info_screen import item_info_screen
-from ..service import get_user
+from ..async_service import get_user
 
 
-def user_info_screen(navigator, user_id):
-    data = get_user(navigator.session, user_id).map(lambda user: user.model_dump())
+async def user_info_screen(navigator, user_id):
+    data = (await get_user(navigator.session, user_id)).map(
+        lambda user: user.model_dump()
+    )
 
     def on_edit_user():
         if data.is_ok():
@@ -1,7 +1,7 @@
 import toga
 from datetime import datetime
 
-from ..service import update_user
+from ..async_service import update_user
 from ...auth.enums import AccessLevel
 from ..dto import UserUpdateDto
 from ...shared.ui.components.datetime_picker import DateTimePicker
@@ -87,7 +87,7 @@ def user_edit_form_screen(navigator, user_data):
                 expires_at=expires_at,
             )
 
-            result = update_user(navigator.session, user_data["id"], dto)
+            result = await update_user(navigator.session, user_data["id"], dto)
 
             if result.is_err():
                 dialog = toga.ErrorDialog(
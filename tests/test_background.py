@@ -0,0 +1,19 @@
+import asyncio
+import threading
+
+from hearmypaper.shared.utils.background import to_async
+
+
+def test_to_async_runs_off_the_event_loop_thread():
+    def blocking(x, *, y):
+        return x + y, threading.current_thread().name
+
+    async def main():
+        return await asyncio.gather(
+            to_async(blocking)(1, y=2), to_async(blocking)(3, y=4)
+        )
+
+    results = asyncio.run(main())
+
+    assert [value for value, _ in results] == [3, 7]
+    assert all(name.startswith("hmp-service") for _, name in results)
@@ -0,0 +1,26 @@
+import io
+
+import cbor2
+import pytest
+
+from hearmypaper.shared.utils.cbor_stream import ByteStream, CborStreamBody
+
+
+def test_cbor_stream_body_matches_cbor2():
+    content = bytes(range(256)) * 2000
+    fields = {"project_id": "p1", "title": "Paper", "encrypted_content": content}
+
+    for source in (content, io.BytesIO(content), [content[:1000], content[1000:]]):
+        streamed = {**fields, "encrypted_content": ByteStream(source, len(content))}
+        body = CborStreamBody(streamed)
+        encoded = b"".join(bytes(chunk) for chunk in body)
+
+        assert encoded == cbor2.dumps(fields)
+        assert len(body) == len(encoded)
+
+
+def test_byte_stream_rejects_wrong_length():
+    with pytest.raises(ValueError, match="shorter"):
+        b"".join(ByteStream([b"abc"], length=4))
+    with pytest.raises(ValueError, match="longer"):
+        b"".join(ByteStream([b"abcde"], length=4))
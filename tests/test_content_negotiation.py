@@ -0,0 +1,23 @@
+from devserver import StandInServer
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.submission import api
+
+
+def test_cbor_and_json_responses_decode_to_the_same_dtos():
+    with StandInServer() as server:
+        submission_id = server.state.add_submission(1, "Paper", b"content")
+        cbor_session = ApiSession(server.url)
+        json_session = ApiSession(server.url, TransportPolicy(prefer_cbor=False))
+
+        response = cbor_session.get("/submission/")
+        assert response.headers["Content-Type"] == "application/cbor"
+
+        assert (
+            api.list_submissions(cbor_session).unwrap()
+            == api.list_submissions(json_session).unwrap()
+        )
+        assert api.get_submission_hash(cbor_session, 99).unwrap_err() == (
+            "Resource not found."
+        )
+        assert api.get_submission(cbor_session, submission_id).is_ok()
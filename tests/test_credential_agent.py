@@ -0,0 +1,25 @@
+import time
+
+from hearmypaper.shared.utils.credential_agent import CredentialAgent
+
+
+def test_unlock_returns_key_until_locked():
+    agent = CredentialAgent(idle_ttl_seconds=60)
+    agent.unlock("7", b"\x01" * 32)
+
+    assert agent.is_unlocked
+    assert agent.user_id == "7"
+    assert agent.private_key() == b"\x01" * 32
+
+    agent.lock()
+    assert not agent.is_unlocked
+    assert agent.private_key() is None
+
+
+def test_auto_lock_after_idle_ttl():
+    agent = CredentialAgent(idle_ttl_seconds=0.05)
+    agent.unlock("7", b"\x01" * 32)
+    time.sleep(0.1)
+
+    assert agent.private_key() is None
+    assert agent.user_id is None
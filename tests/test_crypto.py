@@ -0,0 +1,241 @@
+import io
+import secrets
+
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from hearmypaper.submission import compression, crypto, stream_crypto
+from hearmypaper.submission.key_cache import (
+    KeyCache,
+    derive_key_from_public_key,
+    key_cache,
+)
+
+
+@pytest.fixture
+def key_pair() -> tuple[bytes, bytes]:
+    private_key = Ed25519PrivateKey.generate()
+    return (
+        private_key.private_bytes_raw(),
+        private_key.public_key().public_bytes_raw(),
+    )
+
+
+def test_public_key_round_trip_uses_cache(key_pair):
+    private_key_bytes, public_key_bytes = key_pair
+    key_cache.clear()
+    key_cache.reset_stats()
+
+    encrypted = crypto.encrypt_file_with_public_key(b"paper", public_key_bytes)
+    decrypted = crypto.decrypt_file_with_private_key(encrypted, private_key_bytes)
+
+    assert decrypted == b"paper"
+    stats = key_cache.stats()
+    assert (stats.misses, stats.hits) == (1, 1)
+
+
+def test_matches_legacy_cipher_format(key_pair):
+    private_key_bytes, public_key_bytes = key_pair
+    aes_key = derive_key_from_public_key(public_key_bytes)
+    iv = secrets.token_bytes(12)
+    encryptor = Cipher(algorithms.AES(aes_key), modes.GCM(iv)).encryptor()
+    legacy = iv + encryptor.update(b"legacy") + encryptor.finalize() + encryptor.tag
+
+    assert crypto.decrypt_file_with_private_key(legacy, private_key_bytes) == b"legacy"
+
+
+def test_key_cache_evicts_lru_and_expired_entries():
+    cache = KeyCache(max_entries=1, ttl_seconds=60)
+    first = cache.get(b"a" * 32)
+    cache.get(b"b" * 32)
+
+    # Eviction leaves the key the caller is using intact
+    assert first.key == derive_key_from_public_key(b"a" * 32)
+    assert cache.stats().size == 1
+    assert cache.stats().evictions == 1
+
+    cache.ttl_seconds = 0
+    cache.get(b"c" * 32)
+    cache.get(b"c" * 32)
+    assert cache.stats().misses == 4
+
+
+def chunked(data: bytes, size: int):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("length", [0, 1, 63, 64, 65, 640])
+def test_v2_stream_round_trip(key_pair, length):
+    private_key_bytes, public_key_bytes = key_pair
+    plaintext = secrets.token_bytes(length)
+
+    encrypted = b"".join(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(plaintext), public_key_bytes, segment_size=64
+        )
+    )
+
+    assert len(encrypted) == stream_crypto.encrypted_size(length, 64)
+    assert stream_crypto.is_v2(encrypted)
+    assert crypto.decrypt_file_with_private_key(encrypted, private_key_bytes) == (
+        plaintext
+    )
+    decrypted = stream_crypto.iter_decrypt_with_private_key(
+        chunked(encrypted, 7), private_key_bytes
+    )
+    assert b"".join(decrypted) == plaintext
+
+
+def test_v2_detects_truncation_and_reordering(key_pair):
+    private_key_bytes, public_key_bytes = key_pair
+    segments = list(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(secrets.token_bytes(200)), public_key_bytes, segment_size=64
+        )
+    )
+    header, body = segments[0], segments[1:]
+
+    truncated = header + b"".join(body[:-1])
+    reordered = header + body[1] + body[0] + b"".join(body[2:])
+
+    for tampered in (truncated, reordered):
+        with pytest.raises(InvalidTag):
+            crypto.decrypt_file_with_private_key(tampered, private_key_bytes)
+
+
+def test_stream_decrypts_v1_blobs(key_pair):
+    private_key_bytes, public_key_bytes = key_pair
+    plaintext = secrets.token_bytes(1000)
+    encrypted = crypto.encrypt_file_with_public_key(plaintext, public_key_bytes)
+
+    out = io.BytesIO()
+    stream_crypto.decrypt_stream_with_private_key(
+        io.BytesIO(encrypted), out, private_key_bytes
+    )
+
+    assert out.getvalue() == plaintext
+
+
+def test_parallel_segments_match_sequential_format(key_pair):
+    private_key_bytes, public_key_bytes = key_pair
+    plaintext = secrets.token_bytes(1000)
+
+    encrypted = b"".join(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(plaintext), public_key_bytes, segment_size=64, workers=4
+        )
+    )
+    sequential = stream_crypto.iter_decrypt_with_private_key(
+        [encrypted], private_key_bytes
+    )
+    parallel = stream_crypto.iter_decrypt_with_private_key(
+        chunked(encrypted, 100), private_key_bytes, workers=4
+    )
+
+    assert len(encrypted) == stream_crypto.encrypted_size(1000, 64)
+    assert b"".join(sequential) == b"".join(parallel) == plaintext
+
+
+def test_aes_into_encrypts_in_place_and_decrypts_into_buffer():
+    aes_key = secrets.token_bytes(32)
+    plaintext = secrets.token_bytes(1000)
+
+    buffer = bytearray(crypto.encrypted_size(len(plaintext)))
+    payload = memoryview(buffer)[12 : 12 + len(plaintext)]
+    payload[:] = plaintext
+    crypto.encrypt_file_with_aes_into(payload, aes_key, buffer)
+
+    assert crypto.decrypt_file_with_aes(bytes(buffer), aes_key) == plaintext
+
+    out = bytearray(crypto.decrypted_size(buffer))
+    assert crypto.decrypt_file_with_aes_into(buffer, aes_key, out) == len(plaintext)
+    assert out == plaintext
+
+
+@pytest.mark.parametrize("length", [0, 64, 200])
+def test_private_key_into_handles_v1_and_v2(key_pair, length):
+    private_key_bytes, public_key_bytes = key_pair
+    plaintext = secrets.token_bytes(length)
+    v1 = crypto.encrypt_file_with_public_key(plaintext, public_key_bytes)
+    v2 = b"".join(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(plaintext), public_key_bytes, segment_size=64
+        )
+    )
+
+    for encrypted in (v1, v2):
+        out = bytearray(crypto.decrypted_size(encrypted))
+        crypto.decrypt_file_with_private_key_into(encrypted, private_key_bytes, out)
+        assert out == plaintext
+
+
+@pytest.mark.parametrize("algorithm", [compression.ZLIB, compression.LZMA])
+def test_v2_compressed_round_trip(key_pair, algorithm):
+    private_key_bytes, public_key_bytes = key_pair
+    plaintext = b"lorem ipsum dolor sit amet " * 4000
+
+    encrypted = b"".join(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(plaintext),
+            public_key_bytes,
+            segment_size=1024,
+            compression_algorithm=algorithm,
+        )
+    )
+
+    assert len(encrypted) < len(plaintext) // 10
+    assert stream_crypto.is_compressed(encrypted)
+    decrypted = stream_crypto.iter_decrypt_with_private_key(
+        chunked(encrypted, 333), private_key_bytes
+    )
+    assert b"".join(decrypted) == plaintext
+
+
+@pytest.mark.parametrize("algorithm", [compression.ZLIB, compression.LZMA])
+def test_inflating_past_declared_size_is_rejected(key_pair, algorithm, monkeypatch):
+    private_key_bytes, public_key_bytes = key_pair
+    reader = compression.CompressingReader
+    # A crafted upload declaring 1000 bytes for 64 MiB of zeros
+    monkeypatch.setattr(
+        compression,
+        "CompressingReader",
+        lambda src, algorithm, prefix: reader(
+            src, algorithm, compression.SIZE_PREFIX.pack(1000)
+        ),
+    )
+    encrypted = b"".join(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(bytes(64 << 20)),
+            public_key_bytes,
+            compression_algorithm=algorithm,
+        )
+    )
+
+    inflated = 0
+    with pytest.raises(ValueError, match="larger than declared"):
+        for out in stream_crypto.iter_decrypt_with_private_key(
+            [encrypted], private_key_bytes
+        ):
+            inflated += len(out)
+    assert inflated <= 1000
+
+
+def test_compression_is_refused_past_the_inflate_limit(key_pair, monkeypatch):
+    _, public_key_bytes = key_pair
+    monkeypatch.setattr(compression, "MAX_INFLATED_SIZE", 4096)
+
+    with pytest.raises(ValueError, match="Too large to compress"):
+        next(
+            stream_crypto.iter_encrypt_with_public_key(
+                io.BytesIO(bytes(8192)),
+                public_key_bytes,
+                compression_algorithm=compression.ZLIB,
+            )
+        )
+
+
+def test_choose_compression_skips_incompressible_data():
+    assert compression.choose(secrets.token_bytes(64 << 10)) == compression.NONE
+    assert compression.choose(b"abc" * 20000) != compression.NONE
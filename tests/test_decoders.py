@@ -0,0 +1,24 @@
+import json
+
+from hearmypaper.shared.utils import decoders
+from hearmypaper.submission.dto import SubmissionResponse
+
+ROWS = [
+    {
+        "id": i,
+        "title": f"Paper {i}",
+        "student_name": "Student",
+        "instructor_name": "Instructor",
+        "submitted_at": "2025-09-17T12:00:00+00:00",
+        "content_hash": "00",
+    }
+    for i in range(3)
+]
+
+
+def test_trusted_and_validated_decoding_agree():
+    body = json.dumps(ROWS).encode()
+    tp = list[SubmissionResponse]
+
+    assert decoders.decode(body, tp) == decoders.decode(body, tp, trusted=True)
+    assert decoders.adapter(tp) is decoders.adapter(tp)
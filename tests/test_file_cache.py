@@ -0,0 +1,155 @@
+import os
+import sqlite3
+
+from hearmypaper.submission.file_cache import MIGRATIONS, FileCache
+
+A = "a" * 64
+B = "b" * 64
+C = "c" * 64
+
+
+def write(cache, submission_id, content_hash, size=100, content=None):
+    incoming = cache.path(content_hash)
+    incoming.write_bytes(content or content_hash[0].encode() * size)
+    return cache.add(submission_id, content_hash, incoming)
+
+
+def test_views_are_sharded_by_hash_prefix(tmp_path):
+    cache = FileCache(tmp_path)
+    view = write(cache, 1, A)
+
+    assert view == tmp_path / "aa" / f"submission_1_{A}.pdf"
+    assert cache.get(1, A) == view
+    assert cache.get(1, B) is None
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    cache = FileCache(tmp_path)
+    first = write(cache, 1, A)
+
+    second = cache.get(2, A)
+
+    assert second == tmp_path / "aa" / f"submission_2_{A}.pdf"
+    assert os.path.samefile(first, second)
+    stats = cache.stats()
+    assert (stats.objects, stats.views, stats.deduplicated) == (1, 2, 1)
+    assert stats.size == 100 and stats.saved_bytes == 100
+
+
+def test_same_content_under_new_hashes_is_stored_once(tmp_path):
+    cache = FileCache(tmp_path)
+    # Encryption is randomised: one file submitted twice has two hashes
+    first = write(cache, 1, A, content=b"pdf")
+    second = write(cache, 2, B, content=b"pdf")
+
+    assert os.path.samefile(first, second)
+    assert not list((tmp_path / "incoming").iterdir())
+    stats = cache.stats()
+    assert (stats.objects, stats.views, stats.deduplicated) == (1, 2, 1)
+    assert cache.get(3, B).read_bytes() == b"pdf"
+
+    # A new hash of the same content keeps the object
+    write(cache, 1, C, content=b"pdf")
+    assert cache.get(2, B).read_bytes() == b"pdf"
+
+    cache.discard(A)
+    assert cache.get(2, B) is None
+
+
+def test_overlapping_downloads_of_one_hash_do_not_collide(tmp_path):
+    cache = FileCache(tmp_path)
+    first, second = cache.path(A), cache.path(A)
+    first.write_bytes(b"pdf")
+    second.write_bytes(b"pdf")
+
+    assert first != second
+    assert cache.add(1, A, first).read_bytes() == b"pdf"
+    assert cache.add(2, A, second).read_bytes() == b"pdf"
+    assert not list((tmp_path / "incoming").iterdir())
+    assert cache.stats().objects == 1
+
+
+def test_new_hash_supersedes_old_view_and_unused_object(tmp_path):
+    cache = FileCache(tmp_path)
+    write(cache, 1, A)
+    cache.get(2, A)
+    write(cache, 1, B)
+
+    assert not (tmp_path / "aa" / f"submission_1_{A}.pdf").exists()
+    assert cache.get(2, A) is not None
+    write(cache, 2, C)
+
+    stats = cache.stats()
+    assert (stats.objects, stats.superseded) == (2, 2) and cache.size() == 200
+
+
+def test_least_recently_opened_content_is_evicted(tmp_path):
+    cache = FileCache(tmp_path, max_bytes=250)
+    write(cache, 1, A)
+    write(cache, 2, B)
+    cache.get(1, A)
+    write(cache, 3, C)
+
+    assert cache.get(2, B) is None
+    assert cache.get(1, A) is not None and cache.get(3, C) is not None
+    assert cache.size() == 200
+
+
+def test_flat_layout_files_are_adopted(tmp_path):
+    (tmp_path / f"submission_7_{A}.pdf").write_bytes(b"pdf")
+
+    cache = FileCache(tmp_path)
+
+    assert cache.get(7, A) == tmp_path / "aa" / f"submission_7_{A}.pdf"
+    assert cache.get(7, A).read_bytes() == b"pdf"
+    assert not list(tmp_path.glob("submission_*.pdf"))
+
+
+def test_index_is_rebuilt_from_views(tmp_path):
+    cache = FileCache(tmp_path)
+    write(cache, 1, A)
+    cache.get(2, A)
+    cache._db.close()
+    (tmp_path / "index.sqlite3").write_bytes(b"not a database")
+
+    cache = FileCache(tmp_path)
+
+    stats = cache.stats()
+    assert (stats.objects, stats.views) == (1, 2)
+
+
+def test_sharded_files_of_schema_1_become_views(tmp_path):
+    db = sqlite3.connect(tmp_path / "index.sqlite3")
+    db.executescript(MIGRATIONS[0] + "PRAGMA user_version = 1;")
+    for submission_id in (1, 2):
+        (tmp_path / "aa").mkdir(exist_ok=True)
+        (tmp_path / "aa" / f"submission_{submission_id}_{A}.pdf").write_bytes(b"pdf")
+        db.execute("INSERT INTO files VALUES (?, ?, 3, 0)", (submission_id, A))
+    db.commit()
+    db.close()
+
+    cache = FileCache(tmp_path)
+
+    stats = cache.stats()
+    assert (stats.objects, stats.views, stats.size) == (1, 2, 3)
+    assert cache.get(2, A).read_bytes() == b"pdf"
+
+
+def test_objects_of_schema_2_are_keyed_by_digest(tmp_path):
+    db = sqlite3.connect(tmp_path / "index.sqlite3")
+    db.executescript(MIGRATIONS[0] + MIGRATIONS[1] + "PRAGMA user_version = 2;")
+    old_object = tmp_path / "objects" / "aa" / f"{A}.pdf"
+    old_object.parent.mkdir(parents=True)
+    old_object.write_bytes(b"pdf")
+    (tmp_path / "aa").mkdir()
+    os.link(old_object, tmp_path / "aa" / f"submission_1_{A}.pdf")
+    db.execute("INSERT INTO files VALUES (1, ?, 0, 0)", (A,))
+    db.execute("INSERT INTO objects VALUES (?, 3, 1, 0)", (A,))
+    db.commit()
+    db.close()
+
+    cache = FileCache(tmp_path)
+
+    assert cache.get(1, A).read_bytes() == b"pdf"
+    assert not old_object.exists()
+    assert cache.stats().objects == 1
@@ -0,0 +1,42 @@
+from devserver import StandInServer
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.submission import api
+
+
+def test_not_modified_reuses_parsed_dtos_until_a_write():
+    with StandInServer() as server:
+        session = ApiSession(server.url)
+        server.state.add_submission(1, "First", b"content")
+
+        first = api.list_submissions(session).unwrap()
+        second = api.list_submissions(session).unwrap()
+
+        assert second is first
+        assert session.cache.stats().hits == 1
+
+        api.upload_submission(session, 1, "Second", b"content").unwrap()
+        third = api.list_submissions(session).unwrap()
+
+        assert [s.title for s in third] == ["First", "Second"]
+        assert session.cache.stats().invalidations == 1
+
+
+def test_not_modified_survives_a_concurrent_invalidation():
+    with StandInServer() as server:
+        session = ApiSession(server.url)
+        server.state.add_submission(1, "First", b"content")
+        first = api.list_submissions(session).unwrap()
+
+        send = session._send
+
+        def send_then_invalidate(method, url, *args, **kwargs):
+            # A write on another thread lands while the 304 is on its way
+            response = send(method, url, *args, **kwargs)
+            session.cache.invalidate(url)
+            return response
+
+        session._send = send_then_invalidate
+        second = api.list_submissions(session)
+
+    assert second.unwrap() == first
+    assert session.cache.stats().hits == 1
@@ -0,0 +1,124 @@
+import sqlite3
+
+from devserver import Dataset, StandInServer
+from hearmypaper.project import service as project_service
+from hearmypaper.project.dto import ProjectListResponse
+from result import Ok
+
+from hearmypaper.shared.utils.local_store import MIGRATIONS, Delta, LocalStore, sync
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.submission import repository
+from hearmypaper.submission import service as submission_service
+
+
+def project(i: int) -> ProjectListResponse:
+    return ProjectListResponse(
+        id=i, title=f"Project {i}", instructor_full_name="I", deadline="2030-01-01"
+    )
+
+
+def test_rows_and_watermark_survive_reopening(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    store = LocalStore(path)
+    store.apply("projects", Delta(rows=[project(1)], full=True, server_time="t1"))
+    store.close()
+
+    store = LocalStore(path)
+    assert store.schema_version == len(MIGRATIONS)
+    assert store.load("projects", ProjectListResponse) == [project(1)]
+    assert store.updated_since("projects") == "t1"
+
+
+def test_unknown_schema_version_starts_over(tmp_path):
+    path = tmp_path / "store.sqlite3"
+    with sqlite3.connect(path) as db:
+        db.execute(f"PRAGMA user_version = {len(MIGRATIONS) + 1}")
+
+    store = LocalStore(path)
+    assert store.schema_version == len(MIGRATIONS)
+    assert store.load("projects", ProjectListResponse) == []
+
+
+def test_size_cap_evicts_oldest_and_forces_full_sync(tmp_path):
+    store = LocalStore(tmp_path / "store.sqlite3", max_bytes=300)
+    store.apply("projects", Delta(rows=[project(1)], full=True, server_time="t1"))
+    store.apply(
+        "projects",
+        Delta(rows=[project(i) for i in range(2, 7)], full=False, server_time="t2"),
+    )
+
+    ids = [p.id for p in store.load("projects", ProjectListResponse)]
+    assert store.size() <= 300
+    assert 1 not in ids and 6 in ids
+    assert store.updated_since("projects") is None
+
+
+def test_sync_returns_every_row_when_the_cap_evicts_some(tmp_path):
+    store = LocalStore(tmp_path / "store.sqlite3", max_bytes=300)
+    store.apply("projects", Delta(rows=[project(1)], full=True, server_time="t1"))
+    requested = []
+
+    def fetch(since):
+        requested.append(since)
+        if since is None:
+            return Ok(Delta(rows=[project(i) for i in range(1, 7)], full=True))
+        return Ok(Delta(rows=[project(i) for i in range(2, 7)], full=False))
+
+    projects = sync(store, "projects", ProjectListResponse, fetch).unwrap()
+
+    assert [p.id for p in projects] == [1, 2, 3, 4, 5, 6]
+    assert requested == ["t1", None]
+    assert store.size() <= 300
+
+
+def test_sync_fails_cleanly_offline(tmp_path):
+    with StandInServer() as server:
+        session = ApiSession(
+            server.url, TransportPolicy(backoff_factor=0, backoff_jitter=0)
+        )
+    store = LocalStore(tmp_path / "store.sqlite3")
+
+    result = submission_service.sync_submissions(session, store)
+
+    assert result.unwrap_err().startswith("Network error")
+
+
+def test_sync_fetches_only_changes(tmp_path):
+    dataset = Dataset(users=0, projects=3, submissions=2, audit_logs=0)
+
+    with StandInServer(dataset=dataset) as server:
+        session = ApiSession(server.url)
+        store = LocalStore(tmp_path / "store.sqlite3")
+
+        assert len(project_service.sync_projects(session, store).unwrap()) == 3
+        project_service.update_project(
+            session,
+            2,
+            project_service.ProjectUpdateDto(
+                title="Renamed",
+                syllabus_summary="s",
+                description="d",
+                instructor_email="i@example.com",
+                deadline="2031-01-01",
+            ),
+        ).unwrap()
+        server.state.add_project({**server.state.projects[1], "title": "New"})
+
+        stats_before = session.transfer_stats()["GET /project/"].response_bytes
+        projects = project_service.sync_projects(session, store).unwrap()
+        delta_bytes = (
+            session.transfer_stats()["GET /project/"].response_bytes - stats_before
+        )
+
+        submission_service.sync_submissions(session, store).unwrap()
+        indexed = repository.for_session(session).get(2).unwrap()
+
+    assert [p.title for p in projects] == [
+        "Course project 0",
+        "Renamed",
+        "Course project 2",
+        "New",
+    ]
+    assert delta_bytes < stats_before
+    assert indexed.title == "Paper 1"
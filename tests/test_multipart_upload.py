@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from devserver import StandInServer
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.submission import compression, multipart, service, stream_crypto
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch):
+    monkeypatch.setattr(multipart, "PART_SIZE", 4 << 10)
+    monkeypatch.setattr(multipart, "MULTIPART_THRESHOLD", 16 << 10)
+
+
+@pytest.fixture
+def server():
+    with StandInServer() as server:
+        yield server
+
+
+def fast_session(server: StandInServer) -> ApiSession:
+    return ApiSession(server.url, TransportPolicy(backoff_factor=0, backoff_jitter=0))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(os.urandom(40 << 10))
+    return path
+
+
+def stored_plaintext(server: StandInServer, submission_id: int) -> bytes:
+    content = server.state.submissions[submission_id]["content"]
+    return b"".join(
+        stream_crypto.iter_decrypt_with_private_key(
+            [content], server.state.instructor_private_key
+        )
+    )
+
+
+def test_multipart_upload_round_trip(server, source, tmp_path):
+    session = fast_session(server)
+    journal_dir = tmp_path / "uploads"
+
+    summary = service.upload_submission(
+        session, 1, "Paper", str(source), journal_dir=journal_dir
+    ).unwrap()
+
+    assert summary.parts == 11
+    assert stored_plaintext(server, summary.id) == source.read_bytes()
+    assert list(journal_dir.iterdir()) == []
+
+
+def test_interrupted_upload_resumes_missing_parts(server, source, tmp_path):
+    session = fast_session(server)
+    journal_dir = tmp_path / "uploads"
+    server.state.failing_parts = {3, 7}
+
+    result = service.upload_submission(
+        session, 1, "Paper", str(source), journal_dir=journal_dir
+    )
+    assert result.is_err()
+    assert len(list(journal_dir.iterdir())) == 2
+
+    server.state.failing_parts = set()
+    server.state.part_requests = 0
+    summary = service.upload_submission(
+        session, 1, "Paper", str(source), journal_dir=journal_dir
+    ).unwrap()
+
+    assert server.state.part_requests == 2
+    assert summary.resumed_parts == 9
+    assert stored_plaintext(server, summary.id) == source.read_bytes()
+
+
+def test_falls_back_to_single_post(source, tmp_path):
+    with StandInServer(multipart=False) as server:
+        summary = service.upload_submission(
+            fast_session(server), 1, "Paper", str(source), journal_dir=tmp_path
+        ).unwrap()
+
+        assert summary.parts == 1
+        assert stored_plaintext(server, summary.id) == source.read_bytes()
+
+
+def test_stale_spools_are_removed(server, source, tmp_path):
+    journal_dir = tmp_path / "uploads"
+    journal_dir.mkdir()
+    orphan = journal_dir / "orphan.bin"
+    orphan.write_bytes(b"x")
+    expired = journal_dir / "expired.json"
+    expired.write_text("{}")
+    (journal_dir / "expired.bin").write_bytes(b"x")
+    os.utime(expired, (0, 0))
+
+    service.upload_submission(
+        fast_session(server), 1, "Paper", str(source), journal_dir=journal_dir
+    ).unwrap()
+
+    assert list(journal_dir.iterdir()) == []
+
+
+def test_files_past_the_inflate_limit_are_sent_uncompressed(
+    server, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(compression, "MAX_INFLATED_SIZE", 4096)
+    source = tmp_path / "large.pdf"
+    source.write_bytes(b"lorem ipsum " * 1000)
+
+    summary = service.upload_submission(
+        fast_session(server), 1, "Paper", str(source)
+    ).unwrap()
+
+    assert summary.compression == "none"
+    assert stored_plaintext(server, summary.id) == source.read_bytes()
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+from devserver import Dataset, StandInServer
+from hearmypaper.auth import service as auth_service
+from hearmypaper.auth.utils import save_user_credentials
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.submission import service as submission_service
+from hearmypaper.submission.blob_cache import BlobCache
+from hearmypaper.submission.prefetch import Prefetcher
+
+FAST = TransportPolicy(retries=1, backoff_factor=0, backoff_jitter=0)
+
+
+def login(server, tmp_path):
+    session = ApiSession(server.url, FAST)
+    credentials = tmp_path / "instructor.bin"
+    key = server.state.instructor_private_key
+    save_user_credentials("1", str(credentials), key, "secret")
+    auth_service.login(session, str(credentials), "secret").unwrap()
+    return session, key
+
+
+def content_requests(session):
+    return sum(
+        t.requests
+        for t in session.timings()
+        if t.endpoint == "GET /submission/{id}/content"
+    )
+
+
+def test_prefetched_submission_opens_without_downloading(tmp_path):
+    app_paths = SimpleNamespace(data=tmp_path)
+    dataset = Dataset(users=1, projects=1, submissions=3, submission_size=8192)
+
+    with StandInServer(dataset=dataset) as server:
+        session, key = login(server, tmp_path)
+        submissions = submission_service.list_submissions(session).unwrap()
+        cache = submission_service.ciphertext_cache(app_paths)
+
+        prefetcher = Prefetcher(session, cache)
+        prefetcher.start(submissions[:2])
+        prefetcher.join(10)
+        assert prefetcher.stats.fetched == 2
+        assert content_requests(session) == 2
+
+        path = submission_service.download_submission(
+            session, app_paths, submissions[0].id, key
+        ).unwrap()
+
+    assert path.stat().st_size == 8192
+    assert content_requests(session) == 2
+
+
+def test_failed_and_mismatched_blobs_are_skipped(tmp_path):
+    dataset = Dataset(users=1, projects=1, submissions=3, submission_size=8192)
+
+    with StandInServer(dataset=dataset) as server:
+        session, _ = login(server, tmp_path)
+        submissions = submission_service.list_submissions(session).unwrap()
+        cache = BlobCache(tmp_path / "ciphertext")
+        # Changed on the server since it was listed
+        server.state.submissions[submissions[0].id]["content"] += b"x"
+
+        prefetcher = Prefetcher(session, cache)
+        prefetcher.start(submissions)
+        prefetcher.join(10)
+
+    assert prefetcher.stats.failed == 1 and prefetcher.stats.fetched == 2
+    assert submissions[0].content_hash not in cache
+
+    # Offline: every blob fails, and the run still ends
+    offline = ApiSession(server.url, FAST)
+    prefetcher = Prefetcher(offline, BlobCache(tmp_path / "offline"))
+    prefetcher.start(submissions)
+    prefetcher.join(10)
+    assert prefetcher.stats.failed == 3
+
+
+def test_closing_discards_partial_blob(tmp_path):
+    dataset = Dataset(users=1, projects=1, submissions=1, submission_size=1 << 20)
+
+    with StandInServer(dataset=dataset) as server:
+        session, _ = login(server, tmp_path)
+        submissions = submission_service.list_submissions(session).unwrap()
+        cache = BlobCache(tmp_path / "ciphertext")
+
+        prefetcher = Prefetcher(session, cache, bandwidth=64 << 10)
+        prefetcher.start(submissions)
+        prefetcher.close()
+        prefetcher.join(10)
+
+    assert submissions[0].content_hash not in cache
+    assert not list((tmp_path / "ciphertext").glob("*/*"))
+
+
+def test_blob_cache_evicts_least_recently_used(tmp_path):
+    cache = BlobCache(tmp_path, max_bytes=250)
+    for content_hash in ("a" * 64, "b" * 64, "c" * 64):
+        with cache.writer(content_hash) as f:
+            f.write(b"x" * 100)
+        cache.get("a" * 64)
+
+    assert "a" * 64 in cache and "c" * 64 in cache
+    assert "b" * 64 not in cache
+    assert BlobCache(tmp_path).stats().entries == 2
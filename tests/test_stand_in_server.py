@@ -0,0 +1,121 @@
+import time
+from types import SimpleNamespace
+
+from devserver import Dataset, NetworkConditions, StandInServer
+from devserver import server as devserver_server, views
+from hearmypaper.audit import service as audit_service
+from hearmypaper.auth import service as auth_service
+from hearmypaper.auth.utils import save_user_credentials
+from hearmypaper.project import service as project_service
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.submission import repository as submission_repository
+from hearmypaper.submission import service as submission_service
+
+FAST = TransportPolicy(retries=1, backoff_factor=0, backoff_jitter=0)
+
+
+def test_login_and_pdf_to_audio_round_trip(tmp_path):
+    dataset = Dataset(users=2, projects=1, submissions=1, submission_size=4096)
+
+    with StandInServer(dataset=dataset) as server:
+        session = ApiSession(server.url, FAST)
+        key = server.state.instructor_private_key
+        credentials = tmp_path / "instructor.bin"
+        save_user_credentials("1", str(credentials), key, "secret")
+
+        assert auth_service.login(session, str(credentials), "secret").is_ok()
+        audio = submission_service.convert_submission_to_audio(
+            session, SimpleNamespace(data=tmp_path), 1, key
+        ).unwrap()
+
+    pdf = next((tmp_path / "submissions").glob("*/*.pdf")).read_bytes()
+    assert len(pdf) == 4096
+    assert audio.startswith(b"RIFF") and audio.endswith(pdf)
+
+
+def test_conversion_may_outlast_the_read_timeout(tmp_path, monkeypatch):
+    def slow_pdf_to_audio(*args):
+        time.sleep(0.5)
+        return views.pdf_to_audio(*args)
+
+    monkeypatch.setattr(
+        devserver_server,
+        "ROUTES",
+        [
+            (method, pattern, slow_pdf_to_audio if view is views.pdf_to_audio else view)
+            for method, pattern, view in devserver_server.ROUTES
+        ],
+    )
+    dataset = Dataset(users=1, projects=1, submissions=1, submission_size=4096)
+
+    with StandInServer(dataset=dataset) as server:
+        policy = FAST.model_copy(update={"read_timeout": 0.2})
+        session = ApiSession(server.url, policy)
+        key = server.state.instructor_private_key
+        credentials = tmp_path / "instructor.bin"
+        save_user_credentials("1", str(credentials), key, "secret")
+        auth_service.login(session, str(credentials), "secret").unwrap()
+
+        assert submission_service.convert_submission_to_audio(
+            session, SimpleNamespace(data=tmp_path), 1, key
+        ).is_ok()
+
+
+def test_seeded_dataset_is_paged():
+    dataset = Dataset(users=5, projects=12, submissions=0, audit_logs=30)
+
+    with StandInServer(dataset=dataset) as server:
+        session = ApiSession(server.url, FAST)
+        projects = project_service.get_projects(session, limit=10, offset=10)
+        logs = audit_service.get_audit_logs(session, "", "\uffff", limit=25)
+
+    assert [p.id for p in projects.unwrap()] == [11, 12]
+    assert len(logs.unwrap()) == 25
+
+
+def test_network_conditions_delay_and_fail_requests():
+    conditions = NetworkConditions(latency=0.05)
+    with StandInServer(conditions=conditions) as server:
+        session = ApiSession(server.url, FAST)
+        start = time.perf_counter()
+        assert project_service.get_projects(session).is_ok()
+        assert time.perf_counter() - start >= 0.05
+
+        server.conditions = NetworkConditions(error_rate=1.0)
+        assert project_service.get_projects(session).is_err()
+
+
+def test_cached_submission_opens_without_requests(tmp_path):
+    app_paths = SimpleNamespace(data=tmp_path)
+    dataset = Dataset(users=1, projects=1, submissions=1, submission_size=4096)
+
+    def requests(session):
+        return sum(t.requests for t in session.timings())
+
+    with StandInServer(dataset=dataset) as server:
+        key = server.state.instructor_private_key
+        first = ApiSession(server.url, FAST)
+        submission_service.list_submissions(first).unwrap()
+        path = submission_service.download_submission(first, app_paths, 1, key).unwrap()
+
+        # Verified when downloaded, so opening again costs nothing
+        before = requests(first)
+        assert (
+            submission_service.download_submission(first, app_paths, 1, key).unwrap()
+            == path
+        )
+        assert requests(first) == before
+
+        # A new session trusts the listed hash and confirms it afterwards
+        second = ApiSession(server.url, FAST)
+        submission_service.list_submissions(second).unwrap()
+        server.state.submissions[1]["content_hash"] = "f" * 64
+        assert (
+            submission_service.download_submission(second, app_paths, 1, key).unwrap()
+            == path
+        )
+        deadline = time.monotonic() + 5
+        while submission_repository.for_session(second).known_hash(1) != "f" * 64:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
@@ -0,0 +1,148 @@
+import threading
+import time
+
+from devserver import StandInServer, server as devserver_server, views
+from result import Ok
+
+from hearmypaper.shared.utils.paging import get_page, trim_page
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.shared.utils.single_flight import SingleFlight
+from hearmypaper.submission import api
+from hearmypaper.submission.repository import SubmissionRepository
+
+
+def test_listed_submissions_are_served_from_the_index():
+    with StandInServer() as server:
+        first = server.state.add_submission(1, "First", b"a")
+        session = ApiSession(server.url)
+        repository = SubmissionRepository(session)
+
+        repository.list().unwrap()
+        requests_after_list = session.pool_stats()[0].requests
+        assert repository.get(first).unwrap().title == "First"
+        assert session.pool_stats()[0].requests == requests_after_list
+
+        second = server.state.add_submission(1, "Second", b"b")
+        assert repository.get(second).unwrap().title == "Second"
+        assert repository.get(99).is_err()
+
+
+def serve_without(monkeypatch, view, replacement=None):
+    routes = [
+        (method, pattern, replacement if handler is view else handler)
+        for method, pattern, handler in devserver_server.ROUTES
+        if replacement is not None or handler is not view
+    ]
+    monkeypatch.setattr(devserver_server, "ROUTES", routes)
+
+
+def test_get_falls_back_to_the_list_only_without_the_route(monkeypatch):
+    with StandInServer() as server:
+        submission_id = server.state.add_submission(1, "First", b"a")
+        serve_without(monkeypatch, views.get_submission)
+
+        assert SubmissionRepository(ApiSession(server.url)).get(submission_id).is_ok()
+
+
+def test_get_returns_auth_errors_without_listing(monkeypatch):
+    def unauthorized(*args):
+        raise views.HttpError(401, "Not authenticated")
+
+    with StandInServer() as server:
+        submission_id = server.state.add_submission(1, "First", b"a")
+        serve_without(monkeypatch, views.get_submission, unauthorized)
+        session = ApiSession(server.url)
+
+        result = SubmissionRepository(session).get(submission_id)
+
+        assert result.unwrap_err() == "Authentication required. Please log in again."
+        assert session.pool_stats()[0].requests == 1
+
+
+def test_missing_ids_are_listed_only_until_the_route_is_known():
+    with StandInServer() as server:
+        server.state.add_submission(1, "First", b"a")
+        session = ApiSession(server.url)
+        repository = SubmissionRepository(session)
+
+        assert repository.get(99).is_err()
+        requests_before = session.pool_stats()[0].requests
+        assert repository.get(98).is_err()
+
+        assert session.pool_stats()[0].requests == requests_before + 1
+
+
+def test_get_does_not_list_when_offline(monkeypatch):
+    with StandInServer() as server:
+        session = ApiSession(
+            server.url, TransportPolicy(backoff_factor=0, backoff_jitter=0)
+        )
+    listed = []
+    monkeypatch.setattr(api, "list_submissions", lambda *args: listed.append(args))
+
+    result = SubmissionRepository(session).get(1)
+
+    assert result.unwrap_err().startswith("Network error")
+    assert listed == []
+
+
+def test_single_flight_collapses_concurrent_calls():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait()
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("key", slow)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    # Give every thread time to join the in-flight call
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+
+
+def test_pages_are_fetched_by_offset_and_indexed():
+    with StandInServer() as server:
+        ids = [server.state.add_submission(1, f"S{i}", b"x") for i in range(5)]
+        repository = SubmissionRepository(ApiSession(server.url))
+
+        first = repository.list(limit=2).unwrap()
+        last = repository.list(limit=2, offset=4).unwrap()
+
+        assert [s.id for s in first + last] == [ids[0], ids[1], ids[4]]
+        assert repository.get(ids[4]).unwrap().title == "S4"
+
+
+def test_trim_page_cuts_pages_from_unpaged_responses():
+    assert trim_page(list(range(10)), 3, 6) == [6, 7, 8]
+    assert trim_page([6, 7, 8], 3, 6) == [6, 7, 8]
+    assert trim_page(list(range(10)), None) == list(range(10))
+
+
+def test_get_page_ends_when_an_unpaged_server_repeats_itself():
+    rows = list(range(4))
+
+    def unpaged(params):
+        return Ok(rows)
+
+    assert get_page(unpaged, 4, 4).unwrap() == []
+    rows.append(4)
+    assert get_page(unpaged, 4, 4).unwrap() == [4]
+
+    def paged(params):
+        return Ok(rows[params["offset"] :][: params["limit"]])
+
+    assert get_page(paged, 2, 2).unwrap() == [2, 3]
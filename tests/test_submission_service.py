@@ -0,0 +1,45 @@
+import io
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from hearmypaper.shared.utils.streams import prefetch
+from hearmypaper.submission import service, stream_crypto
+
+
+@pytest.fixture
+def key_pair() -> tuple[bytes, bytes]:
+    private_key = Ed25519PrivateKey.generate()
+    return (
+        private_key.private_bytes_raw(),
+        private_key.public_key().public_bytes_raw(),
+    )
+
+
+def test_decrypt_to_file_only_publishes_verified_plaintext(tmp_path, key_pair):
+    private_key_bytes, public_key_bytes = key_pair
+    encrypted = b"".join(
+        stream_crypto.iter_encrypt_with_public_key(
+            io.BytesIO(b"x" * 1000), public_key_bytes, segment_size=100
+        )
+    )
+    target = tmp_path / "submission.pdf"
+
+    with pytest.raises(Exception):
+        service.decrypt_to_file(prefetch([encrypted[:-1]]), private_key_bytes, target)
+    assert list(tmp_path.iterdir()) == []
+
+    service.decrypt_to_file(prefetch([encrypted]), private_key_bytes, target)
+    assert target.read_bytes() == b"x" * 1000
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_prefetch_propagates_producer_errors():
+    def produce():
+        yield b"a"
+        raise OSError("connection reset")
+
+    chunks = prefetch(produce())
+    assert next(chunks) == b"a"
+    with pytest.raises(OSError, match="connection reset"):
+        next(chunks)
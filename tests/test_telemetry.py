@@ -0,0 +1,65 @@
+import io
+import json
+import socket
+
+from devserver import NetworkConditions, StandInServer
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils import telemetry
+from hearmypaper.shared.utils.telemetry import Histogram
+from hearmypaper.submission import api
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = Histogram()
+    for ms in [0, 0, 3, 40, 40, 40, 40, 40, 40, 900]:
+        histogram.add(ms / 1000)
+
+    assert histogram.percentile(20) == 0
+    assert histogram.percentile(50) == 50
+    assert histogram.percentile(99) == 900
+    assert histogram.summary().buckets["1000"] == 1
+
+
+def test_session_records_phases_per_endpoint():
+    with StandInServer(conditions=NetworkConditions(latency=0.03)) as server:
+        server.state.add_submission(1, "Paper", b"x")
+        session = ApiSession(server.url)
+        for _ in range(3):
+            api.get_submission(session, 1).unwrap()
+        api.get_submission(session, 99)
+
+        timings = {t.endpoint: t for t in session.timings()}
+        out = io.StringIO()
+        lines = session.telemetry.dump(out)
+
+    detail = timings["GET /submission/{id}"]
+    assert detail.requests == 4
+    assert detail.errors == 1
+    assert detail.statuses == {200: 1, 304: 2, 404: 1}
+    # Only the first request opened a connection
+    assert detail.phases["connect"].count == 4
+    assert detail.phases["connect"].p50_ms == 0
+    assert detail.phases["connect"].max_ms > 0
+    assert detail.phases["ttfb"].p50_ms >= 30
+    assert detail.response_bytes > 0
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert lines == len(records) == 5
+    assert [r["kind"] for r in records] == ["endpoint"] + ["request"] * 4
+
+
+def test_timed_connection_falls_back_to_later_addresses(monkeypatch):
+    with StandInServer() as server:
+        server.state.add_submission(1, "Paper", b"x")
+        session = ApiSession(server.url.replace("127.0.0.1", "paper.test"))
+
+        def getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+            # Nothing listens on the first address
+            addresses = ["127.0.0.2", "127.0.0.1"] if host == "paper.test" else [host]
+            return [
+                (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))
+                for address in addresses
+            ]
+
+        monkeypatch.setattr(telemetry.socket, "getaddrinfo", getaddrinfo)
+        assert api.get_submission(session, 1).unwrap().title == "Paper"
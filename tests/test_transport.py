@@ -0,0 +1,44 @@
+from devserver import StandInServer
+from hearmypaper.shared.utils.session import ApiSession
+from hearmypaper.shared.utils.transport import TransportPolicy
+from hearmypaper.submission import api
+
+
+def test_idempotent_requests_are_retried_on_reused_connections():
+    policy = TransportPolicy(retries=2, backoff_factor=0, backoff_jitter=0)
+
+    with StandInServer() as server:
+        session = ApiSession(server.url, policy)
+        upload_id = api.initiate_upload(session, 1, "Paper", 10, 1 << 10).unwrap()
+        server.state.failing_parts = {1}
+
+        result = api.upload_part(session, upload_id, 1, b"x" * 10, "0" * 64)
+
+        assert result.is_err()
+        # One attempt plus two retries; the POST that started it is never retried
+        assert server.state.part_requests == 3
+
+        [stats] = session.pool_stats()
+        assert stats.requests == 4
+        assert stats.connections_opened == 1
+
+
+def test_compressed_transfers_are_counted_per_endpoint():
+    policy = TransportPolicy(compress_requests=True, prefer_cbor=False)
+
+    with StandInServer() as server:
+        for i in range(50):
+            server.state.add_submission(1, f"Paper {i}", b"x")
+        session = ApiSession(server.url, policy)
+
+        assert len(api.list_submissions(session).unwrap()) == 50
+        title = "t" * 4000
+        upload_id = api.initiate_upload(session, 1, title, 10, 1 << 10).unwrap()
+        assert server.state.uploads[upload_id].title == title
+
+        stats = session.transfer_stats()
+        listing = stats["GET /submission/"]
+        assert listing.response_bytes_received < listing.response_bytes
+        initiate = stats["POST /submission/uploads"]
+        assert initiate.request_bytes_sent < initiate.request_bytes
+        assert initiate.bytes_saved > 3000